@@ -1,22 +1,33 @@
 from fastapi.routing import APIRouter
-from fastapi import Depends, UploadFile, File, HTTPException, status
+from fastapi.responses import StreamingResponse
+from fastapi import BackgroundTasks, Depends, HTTPException, Query, Request, status
 from pathlib import Path
 import uuid
 from app.core.security import verify_csrf
 from app.core.settings import settings
-from magika import Magika
 from app.utils.auth import get_admin_user
 from app.models.user import User as UserModel
-from app.db.db import get_session
+from app.db.db import get_read_session
 from app.db.user import get_users
-from app.api.schema.admin import UsersResponse, CSVFilesResponse, CSVFile, CSVDataResponse
+from app.api.schema.admin import UsersResponse, CSVFilesResponse, CSVFile, CSVDataResponse, MetricsResponse
+from app.core.file_detection import file_type_detector
+from app.core.hashing import password_hashing
+from app.core.principal_cache import principal_cache
+from app.core.login_recorder import login_attempt_recorder
+from app.core.maintenance import maintenance_scheduler
+from app.core.response_cache import response_cache
+from app.core.task_events import task_events
+from app.utils.columnar import SUPPORTED_SUFFIXES, ColumnarPage, UnknownColumnError, ensure_columnar_cache, open_columnar_page
+from app.utils.csv_index import CSVPage, ensure_csv_index, open_csv_page
+from app.utils.uploads import discard_upload, receive_upload, store_upload
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Annotated
-import csv
+from typing import Annotated, Iterator, List
+import asyncio
+import json
 import os
 from datetime import datetime
 router = APIRouter(tags=["Admin"])
-magika = Magika()
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 ALLOWED_TYPES = {
@@ -26,54 +37,112 @@ ALLOWED_TYPES = {
 }
 
 
+def dump_json(value) -> str:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def csv_page_json(csv_page: CSVPage | ColumnarPage, page: int, page_size: int) -> Iterator[bytes]:
+    """CSVDataResponse as JSON chunks, byte for byte what the model would render, one row chunk at a time."""
+    yield f'{{"success":true,"error":null,"headers":{dump_json(csv_page.headers)},"data":['.encode()
+    separator = ""
+    for rows in csv_page.chunks():
+        yield (separator + ",".join(dump_json(row) for row in rows)).encode()
+        separator = ","
+    yield f'],"total_rows":{csv_page.total_rows},"page":{page},"page_size":{page_size}}}'.encode()
+
+
+def ingest_upload(file_path: Path) -> None:
+    """Build the columnar cache of an upload; on failure the first read tries again"""
+    try:
+        ensure_columnar_cache(file_path)
+    except Exception as e:
+        logger.error(f"Could not build the columnar cache of {file_path.name}: {e}")
+
+
 def get_csrf_dependency():
     """Return CSRF dependency only in production"""
     if settings.ENV == "production":
         return Depends(verify_csrf)
     return None
 
-@router.post("/upload", dependencies=[dep for dep in [get_csrf_dependency(), Depends(get_admin_user)] if dep is not None])
-async def upload_excel(current_user: Annotated[UserModel, Depends(get_admin_user)], file: UploadFile = File(...)):
-    # Read file bytes
-    file_bytes = await file.read()
-
-    # Detect file type using Magika
-    result = magika.identify_bytes(file_bytes)
-
-    # Check if Magika analysis was successful
-    if not result.ok:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Failed to analyze file type: {result.status.message if hasattr(result.status, 'message') else 'Unknown error'}"
-        )
-
-    detected_type = result.output.mime_type
-    confidence = result.score  # Use result.score instead of result.output.confidence
-
-    # Validate type
-    if detected_type not in ALLOWED_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Only Excel and CSV files are allowed. Detected: {detected_type}"
-        )
+# The body is parsed by receive_upload, not declared as an UploadFile: document it by hand
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
 
-    # Optional: confidence check
-    if confidence < 0.9:
-        raise HTTPException(
-            status_code=400,
-            detail="Low confidence file type detection"
-        )
 
-    # Generate safe filename
-    suffix = Path(file.filename).suffix
-    safe_name = f"{uuid.uuid4()}{suffix}"
+@router.post(
+    "/upload",
+    dependencies=[dep for dep in [get_csrf_dependency(), Depends(get_admin_user)] if dep is not None],
+    openapi_extra=UPLOAD_REQUEST_BODY,
+)
+async def upload_excel(current_user: Annotated[UserModel, Depends(get_admin_user)], background_tasks: BackgroundTasks, request: Request):
+    """
+    Store an uploaded Excel or CSV file.
+
+    The file is streamed to a temporary file in UPLOAD_DIR in chunks of
+    UPLOAD_CHUNK_SIZE, written from a worker thread, and refused with 413 once
+    it passes UPLOAD_MAX_BYTES. Magika reads only the beginning and end of the
+    file, on the file type detector's pool. Accepted files are renamed into
+    place, others are deleted.
+    """
+    upload = await receive_upload(request, "file", UPLOAD_DIR, settings.UPLOAD_MAX_BYTES, settings.UPLOAD_CHUNK_SIZE)
+    try:
+        # Detect file type using Magika; it reads a bounded block at each end of the file
+        try:
+            result = await file_type_detector.identify_path(upload.path)
+        except Exception as e:
+            logger.error(f"File type detection failed for {upload.filename}: {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to analyze file type")
+
+        # Check if Magika analysis was successful
+        if not result.ok:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to analyze file type: {result.status.message if hasattr(result.status, 'message') else 'Unknown error'}"
+            )
 
-    file_path = UPLOAD_DIR / safe_name
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
+        detected_type = result.output.mime_type
+        confidence = result.score  # Use result.score instead of result.output.confidence
+
+        # Validate type
+        if detected_type not in ALLOWED_TYPES:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Only Excel and CSV files are allowed. Detected: {detected_type}")
+
+        # Optional: confidence check
+        if confidence < 0.9:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Low confidence file type detection")
+
+        # Generate safe filename
+        suffix = Path(upload.filename).suffix
+        safe_name = f"{uuid.uuid4()}{suffix}"
+
+        file_path = UPLOAD_DIR / safe_name
+        await store_upload(upload, file_path)
+    except BaseException:
+        # Rejected, failed or cancelled (client disconnect); shielded so the temporary file is not left behind
+        await asyncio.shield(discard_upload(upload))
+        raise
+    # Ready before the first page is requested; sync, so it runs in the threadpool
+    if settings.UPLOAD_COLUMNAR_CACHE and file_path.suffix.lower() in SUPPORTED_SUFFIXES:
+        background_tasks.add_task(ingest_upload, file_path)
+    elif file_path.suffix.lower() == ".csv":
+        background_tasks.add_task(ensure_csv_index, file_path)
 
     return {
-        "original_filename": file.filename,
+        "original_filename": upload.filename,
         "saved_as": safe_name,
         "mime_type": detected_type,
         "confidence": confidence,
@@ -81,7 +150,7 @@ async def upload_excel(current_user: Annotated[UserModel, Depends(get_admin_user
     }
 
 @router.get("/users", response_model=UsersResponse)
-async def get_all_users(current_user: Annotated[UserModel, Depends(get_admin_user)], db: AsyncSession = Depends(get_session)):
+async def get_all_users(current_user: Annotated[UserModel, Depends(get_admin_user)], db: AsyncSession = Depends(get_read_session)):
     try:
         users = await get_users(db)
     except Exception as e:
@@ -89,12 +158,31 @@ async def get_all_users(current_user: Annotated[UserModel, Depends(get_admin_use
     return UsersResponse(users=users, success=True)
 
 
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics(_: Annotated[UserModel, Depends(get_admin_user)]):
+    """Runtime metrics of the in-process services"""
+    return MetricsResponse(
+        metrics={
+            "password_hashing": password_hashing.metrics(),
+            "file_type_detection": file_type_detector.metrics(),
+            "principal_cache": principal_cache.metrics(),
+            "login_attempt_recorder": login_attempt_recorder.metrics(),
+            "maintenance": maintenance_scheduler.metrics(),
+            "response_cache": response_cache.metrics(),
+            "task_events": task_events.metrics(),
+        },
+        success=True
+    )
+
+
 @router.get("/csv-files", response_model=CSVFilesResponse)
 async def list_csv_files(_: Annotated[UserModel, Depends(get_admin_user)]):
-    """List all uploaded CSV files"""
+    """List all uploaded CSV and XLSX files"""
     try:
         files = []
-        for file_path in UPLOAD_DIR.glob("*.csv"):
+        for file_path in UPLOAD_DIR.iterdir():
+            if not file_path.is_file() or file_path.suffix.lower() not in SUPPORTED_SUFFIXES:
+                continue
             stat = file_path.stat()
             files.append(CSVFile(
                 filename=file_path.name,
@@ -112,10 +200,22 @@ async def list_csv_files(_: Annotated[UserModel, Depends(get_admin_user)]):
 async def get_csv_data(
     filename: str,
     _: Annotated[UserModel, Depends(get_admin_user)],
-    page: int = 1,
-    page_size: int = 100
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=100, ge=1, le=10000),
+    columns: List[str] | None = Query(default=None)
 ):
-    """Get CSV data with pagination for virtualization"""
+    """
+    Get CSV or XLSX data with pagination for virtualization.
+
+    Pages are read from the file's columnar cache (app.utils.columnar): only
+    the requested rows of the requested columns are decoded, and total_rows
+    comes from its manifest. The cache is built on upload, or on the first
+    read of older files. With UPLOAD_COLUMNAR_CACHE off, CSV files are read
+    through their row index (app.utils.csv_index) instead.
+
+    The rows are decoded from memory maps and streamed as they are encoded,
+    so memory per request stays bounded whatever the page size.
+    """
     file_path = UPLOAD_DIR / filename
 
     # Security: prevent directory traversal
@@ -125,29 +225,24 @@ async def get_csv_data(
     if not file_path.exists() or not file_path.is_file():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
 
+    suffix = file_path.suffix.lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only CSV and XLSX files can be read")
+    if not settings.UPLOAD_COLUMNAR_CACHE and (suffix != ".csv" or columns is not None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="XLSX files and column selection need the columnar cache"
+        )
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)
-
-            # Count total rows
-            all_rows = list(reader)
-            total_rows = len(all_rows)
-
-            # Calculate pagination
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-
-            # Get paginated data
-            paginated_rows = all_rows[start_idx:end_idx]
-
-            return CSVDataResponse(
-                headers=headers,
-                data=paginated_rows,
-                total_rows=total_rows,
-                page=page,
-                page_size=page_size,
-                success=True
-            )
+        # File I/O, and a full parse when the cache or index must be built: keep it off the event loop
+        if settings.UPLOAD_COLUMNAR_CACHE:
+            csv_page = await asyncio.to_thread(open_columnar_page, file_path, page, page_size, columns)
+        else:
+            csv_page = await asyncio.to_thread(open_csv_page, file_path, page, page_size)
+        # A sync iterator: Starlette runs each step in the threadpool
+        return StreamingResponse(csv_page_json(csv_page, page, page_size), media_type="application/json")
+    except UnknownColumnError as e:
+        raise HTTPException(detail=str(e), status_code=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         raise HTTPException(detail=str(e), status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
@@ -1,11 +1,13 @@
 from fastapi.routing import APIRouter
 from fastapi import Depends, HTTPException, status, Query, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from app.db.db import get_session
-from app.db.user import add_user, get_username
+from app.db.db import get_session, get_read_session
+from app.db.user import add_user, get_username, get_user_by_username
 from app.models.refresh_tokens import RefreshToken
 from app.models.user import User as UserModel
-from app.core.security import hash_token, create_refresh_token, create_csrf, verify_csrf, create_access_token, hash_password
+from app.core.security import hash_token, create_refresh_token, create_csrf, verify_csrf, create_access_token
+from app.core.hashing import password_hashing
+from app.core.principal_cache import principal_cache
 from app.core.lockout import (
     record_login_attempt,
     handle_failed_login,
@@ -15,11 +17,11 @@ from app.core.lockout import (
 from app.core.audit import AuditLogger
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 from app.api.schema.auth import User, RegisterRequest, ResponseBoolean
 from app.core.settings import settings
-from app.utils.auth import authenticate_user, get_current_user
+from app.utils.auth import get_current_user
 from datetime import timedelta, datetime, timezone
 from loguru import logger
 from slowapi import Limiter
@@ -38,7 +40,7 @@ async def register_user(request: Request, form_data: RegisterRequest = Depends(R
     if exist_user:
         raise HTTPException(detail="User already exists", status_code=400)
 
-    user = await add_user(db, form_data.username, hash_password(form_data.password))
+    user = await add_user(db, form_data.username, await password_hashing.hash(form_data.password))
 
     # Audit log registration
     AuditLogger.registration(user.username, client_ip)
@@ -47,7 +49,7 @@ async def register_user(request: Request, form_data: RegisterRequest = Depends(R
 
 
 @router.get("/check-user-exists", response_model=ResponseBoolean)
-async def check_user_exists(username: str = Query(..., description="Username for check"), db: AsyncSession = Depends(get_session)):
+async def check_user_exists(username: str = Query(..., description="Username for check"), db: AsyncSession = Depends(get_read_session)):
     try:
         user = await get_username(db, username)
         return ResponseBoolean(message=user is not None, success=True)
@@ -72,33 +74,35 @@ async def login_for_access_token(
     # Get client IP address
     client_ip = request.client.host if request.client else "unknown"
 
-    # First, check if user exists to determine lockout status
-    user_check = await get_username(db, form_data.username)
+    # The whole login is one unit of work: a single user lookup, staged
+    # writes and at most one commit per outcome.
+    user = await get_user_by_username(db, form_data.username)
 
     # Check if account is locked BEFORE attempting authentication
-    if user_check:
-        is_locked, lock_message = await check_account_locked(user_check)
+    if user:
+        is_locked, lock_message = await check_account_locked(user)
         if is_locked:
             # Record failed attempt due to lockout
-            await record_login_attempt(db, form_data.username, False, client_ip)
+            record_login_attempt(form_data.username, False, client_ip)
             AuditLogger.login_failure(form_data.username, client_ip, reason="account_locked")
             logger.warning(f"Login attempt for locked account: {form_data.username} from {client_ip}")
             raise HTTPException(status_code=423, detail=lock_message)  # 423 Locked
 
     # Attempt authentication
-    user = await authenticate_user(db, form_data.username, form_data.password)
-
-    if not user:
+    if not user or not await password_hashing.verify(form_data.password, user.hashed_password):
         # Record failed login attempt
-        await record_login_attempt(db, form_data.username, False, client_ip)
+        record_login_attempt(form_data.username, False, client_ip)
         AuditLogger.login_failure(form_data.username, client_ip, reason="invalid_credentials")
 
         # Handle failed login (increment counter, lock if needed)
-        if user_check:
-            await handle_failed_login(db, user_check, client_ip)
+        if user:
+            username = user.username
+            await handle_failed_login(db, user, client_ip, commit=False)
 
-            # Check if this failure caused a lockout
-            is_locked, lock_message = await check_account_locked(user_check)
+            # Check if this failure caused a lockout, before the commit expires the user
+            is_locked, lock_message = await check_account_locked(user)
+            await db.commit()
+            principal_cache.invalidate(username)
             if is_locked:
                 logger.warning(f"Account locked: {form_data.username} due to too many failed attempts")
                 raise HTTPException(status_code=423, detail=lock_message)
@@ -106,33 +110,14 @@ async def login_for_access_token(
         raise HTTPException(status_code=401, detail="Incorrect credentials")
 
     # Successful login - record it and reset failed attempts
-    await record_login_attempt(db, form_data.username, True, client_ip)
-    await handle_successful_login(db, user)
+    needs_reset = user.failed_login_attempts or user.locked_until is not None
+    username = user.username  # Expired by the commit
+    record_login_attempt(form_data.username, True, client_ip)
+    await handle_successful_login(db, user, commit=False)
     user_agent = request.headers.get("user-agent", "unknown")
     AuditLogger.login_success(user.username, client_ip, user_agent)
     logger.info(f"Successful login: {user.username} from {client_ip}")
 
-    # ---- CLEANUP OLD TOKENS ----
-    # Delete only expired tokens for this user (keep revoked for audit)
-    now = datetime.now(timezone.utc)
-    result = await db.execute(
-        select(RefreshToken).where(
-            RefreshToken.user_id == user.id,
-        )
-    )
-    old_tokens = result.scalars().all()
-
-    for token in old_tokens:
-        # Delete only if expired
-        expires_at = token.expires_at
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-        if expires_at < now:
-            await db.delete(token)
-
-    await db.commit()
-
     # ---- ACCESS TOKEN (JWT) ----
     access_token = create_access_token(
         data={"sub": user.username, "role": user.role},
@@ -152,6 +137,8 @@ async def login_for_access_token(
 
     db.add(refresh_token_db)
     await db.commit()
+    if needs_reset:
+        principal_cache.invalidate(username)
 
     # ---- COOKIES ----
     response.set_cookie(
@@ -226,16 +213,15 @@ async def refresh_token(
         if user_obj:
             AuditLogger.token_reuse_detected(user_obj.username, client_ip)
 
-        result = await db.execute(
-            select(RefreshToken).where(
+        # One statement whatever the number of sessions
+        await db.execute(
+            update(RefreshToken)
+            .where(
                 RefreshToken.user_id == stored_token.user_id,
                 RefreshToken.revoked_at.is_(None),
             )
+            .values(revoked_at=now)
         )
-        tokens = result.scalars().all()
-        for token in tokens:
-            token.revoked_at = now
-
         await db.commit()
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
@@ -264,34 +250,14 @@ async def refresh_token(
     stored_token.revoked_at = datetime.now(timezone.utc)
     stored_token.replaced_by_token_id = new_db_token.id
 
-    # Cleanup only expired tokens for this user (keep revoked for audit)
-    result = await db.execute(
-        select(RefreshToken).where(
-            RefreshToken.user_id == user.id,
-        )
-    )
-    all_tokens = result.scalars().all()
-
-    for token in all_tokens:
-        # Skip the new token we just created
-        if token.id == new_db_token.id:
-            continue
-
-        # Delete only if expired
-        expires_at = token.expires_at
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-        if expires_at < now:
-            await db.delete(token)
-
+    username, role = user.username, user.role  # Expired by the commit
     await db.commit()
 
     # 6️⃣ Issue new access token (JWT)
     access_token = create_access_token(
         data={
-            "sub": user.username,
-            "role": user.role,
+            "sub": username,
+            "role": role,
         },
         expires_delta=timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -321,7 +287,7 @@ async def refresh_token(
 
     # Audit log token refresh
     client_ip = request.client.host if request.client else "unknown"
-    AuditLogger.token_refresh(user.username, client_ip)
+    AuditLogger.token_refresh(username, client_ip)
 
     return {
         "access_token": access_token,
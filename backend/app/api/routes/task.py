@@ -1,36 +1,83 @@
-from fastapi import Depends, Path, Body, HTTPException, status, Query
+from fastapi import Depends, Path, Body, Header, HTTPException, Response, status, Query
 from fastapi.routing import APIRouter
+from fastapi.responses import StreamingResponse
 from app.db.task import get_task as get_task_db, put_task as put_task_db, delete_task as delete_task_db, add_task as add_task_db
+from app.db.task import add_tasks as add_tasks_db, put_tasks as put_tasks_db, delete_tasks as delete_tasks_db, get_task_owners, get_task_owner, stream_tasks, search_tasks as search_tasks_db, get_task_calendar, get_task_changes
 from app.db.user import get_tasks as get_tasks_db, get_tasks_count as get_tasks_count_db
-from app.db.db import get_session
-from app.api.schema.task import TaskPost, TaskResponse, TaskElement, TaskListResponse
+from app.db.task_stats import get_task_version, get_tombstone_floor
+from app.db.db import get_session, get_read_session
+from app.api.schema.task import TaskPost, TaskPut, TaskResponse, TaskElement, TaskListResponse, TaskBulkResult, TaskBulkResponse, TaskCalendarResponse, TaskChangesResponse
 from app.api.schema.auth import UserInDB
-from typing import Annotated
+from typing import Annotated, List, Literal
+from datetime import date
+import asyncio
+import csv
+import io
+import json
+from app.core.settings import settings
 from app.utils.auth import get_current_user
+from app.utils.pagination import encode_cursor, decode_cursor, encode_change_cursor, decode_change_cursor
+from app.utils.etag import make_etag, etag_matches
+from app.utils.search import to_fts_query
+from app.utils.fast_json import dump_task_list, dump_task
+from app.core.response_cache import response_cache
+from app.core.task_events import TaskEvent, task_events
 from loguru import logger
 router = APIRouter(tags=["Tasks"])
 
+# Clients may store task responses but must revalidate them on every use
+TASK_CACHE_CONTROL = "private, no-cache"
+
+
+async def conditional_etag(db, current_user, if_none_match: str | None) -> tuple[int, dict, Response | None]:
+    """
+    Read the task collection version and build the validator headers.
+
+    The version is read before the tasks, so a write landing in between can
+    only make the ETag older than the body, which costs a refetch, never a
+    stale 304.
+
+    Returns:
+        The version, the ETag/Cache-Control headers, and a 304 response if
+        the client already has the current version (None otherwise)
+    """
+    version = await get_task_version(db, current_user.id)
+    headers = {"ETag": make_etag(current_user.id, version), "Cache-Control": TASK_CACHE_CONTROL}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return version, headers, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return version, headers, None
 
-async def check_task_ownership(db, current_user, id):
-    # Log to verify that the ID is being passed correctly
-    task = await get_task_db(db, task_id=id)
 
+def raise_for_ownership(current_user, id, owner_id):
     # If no task is found, raise a 404 Not Found
-    if not task:
+    if owner_id is None:
         logger.error(f"Task with ID {id} does not exist.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="This item does not exist")
 
     # If the user doesn't own the task, raise a 403 Forbidden
-    if task.user_id != current_user.id:
+    if owner_id != current_user.id:
         logger.error(
-            f"User {current_user.id} is not authorized to delete task {id}.")
+            f"User {current_user.id} is not authorized to access task {id}.")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="This item does not belong to this user")
 
+
+async def check_task_ownership(db, current_user, id):
+    task = await get_task_db(db, task_id=id)
+    raise_for_ownership(current_user, id, task.user_id if task else None)
     return task
 
 
+async def raise_missing_or_forbidden(db, current_user, id):
+    """Explain why an ownership-scoped mutation matched no row (cold path only)."""
+    owner_id = await get_task_owner(db, id)
+    raise_for_ownership(current_user, id, owner_id)
+    # The task was created for this user after the statement ran
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                        detail="This item does not exist")
+
+
 @router.post("/", response_model=TaskResponse)
 async def add_task(current_user: Annotated[UserInDB, Depends(get_current_user)], task_in: TaskPost = Body(...), db=Depends(get_session)):
     try:
@@ -41,22 +88,49 @@ async def add_task(current_user: Annotated[UserInDB, Depends(get_current_user)],
             task_date=task_in.date
         )
 
-        return TaskResponse(
-            success=True,
-            task=TaskElement.model_validate(new_task)
-        )
+        return json_response(task_json(new_task))
     except ValueError as ve:
         return TaskResponse(success=False, task=None, error=str(ve))
     except Exception as e:
         return TaskResponse(success=False, task=None, error="Internal Server Error")
 
 
+def task_list_json(tasks, **page) -> bytes:
+    """Body of a successful TaskListResponse; validated models only when FAST_JSON_RESPONSES is off."""
+    if settings.FAST_JSON_RESPONSES:
+        return dump_task_list(tasks, **page)
+    return TaskListResponse(
+        success=True, tasks=[TaskElement.model_validate(task) for task in tasks], **page
+    ).model_dump_json().encode()
+
+
+def task_json(task) -> bytes:
+    """Body of a successful TaskResponse; validated models only when FAST_JSON_RESPONSES is off."""
+    if settings.FAST_JSON_RESPONSES:
+        return dump_task(task)
+    return TaskResponse(success=True, task=TaskElement.model_validate(task)).model_dump_json().encode()
+
+
+def json_response(body: bytes, headers: dict | None = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def check_date_range(date_from: date | None, date_to: date | None):
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="date_from must not be after date_to")
+
+
 @router.get("/", response_model=TaskListResponse)
 async def get_tasks(
     current_user: Annotated[UserInDB, Depends(get_current_user)],
-    db=Depends(get_session),
+    db=Depends(get_read_session),
     page: int = Query(default=1, ge=1, description="Page number (starts at 1)"),
-    page_size: int = Query(default=10, ge=1, le=100, description="Number of items per page")
+    page_size: int = Query(default=10, ge=1, le=100, description="Number of items per page"),
+    cursor: str | None = Query(default=None, description="Opaque cursor from next_cursor; takes precedence over page"),
+    date_from: date | None = Query(default=None, description="Only tasks on or after this date"),
+    date_to: date | None = Query(default=None, description="Only tasks on or before this date"),
+    if_none_match: Annotated[str | None, Header()] = None
 ):
     """
     Get paginated tasks for the current user.
@@ -64,30 +138,61 @@ async def get_tasks(
     Args:
         page: Page number (starts at 1)
         page_size: Number of items per page (1-100)
+        cursor: Keyset cursor returned as next_cursor by the previous page.
+            Seeks directly to the position, so deep pages cost the same as the first.
+        date_from: Only tasks on or after this date (inclusive)
+        date_to: Only tasks on or before this date (inclusive)
+        if_none_match: ETag from a previous response; answered with 304 if
+            none of the user's tasks changed since
 
     Returns:
         Paginated list of tasks with metadata
     """
+    check_date_range(date_from, date_to)
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as ve:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+    version, headers, not_modified = await conditional_etag(db, current_user, if_none_match)
+    if not_modified is not None:
+        return not_modified
+
+    # The version is part of the key, so a cached page is never older than the ETag
+    cache_key = (version, cursor, page, page_size, date_from, date_to)
+    body = response_cache.get(current_user.id, cache_key)
+    if body is not None:
+        return json_response(body, headers)
+
     try:
         # Calculate offset
         skip = (page - 1) * page_size
 
-        # Get total count and tasks
-        total = await get_tasks_count_db(db, current_user.id)
-        tasks = await get_tasks_db(db, current_user.id, skip=skip, limit=page_size)
+        # Get total count and tasks; one extra row tells whether a next page exists
+        total = await get_tasks_count_db(db, current_user.id, date_from=date_from, date_to=date_to)
+        tasks = await get_tasks_db(db, current_user.id, skip=skip, limit=page_size + 1, after=after,
+                                   date_from=date_from, date_to=date_to)
+
+        next_cursor = None
+        if len(tasks) > page_size:
+            tasks = tasks[:page_size]
+            next_cursor = encode_cursor(tasks[-1].date, tasks[-1].id)
 
         # Calculate total pages
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
 
-        task_response = TaskListResponse(
-            tasks=tasks,
-            success=True,
+        body = task_list_json(
+            tasks,
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
-        return task_response
+        response_cache.set(current_user.id, cache_key, body)
+        return json_response(body, headers)
     except ValueError as ve:
         return TaskListResponse(success=False, tasks=[], error=str(ve))
     except Exception as e:
@@ -95,13 +200,323 @@ async def get_tasks(
         return TaskListResponse(success=False, tasks=[], error="Internal Server Error")
 
 
+@router.get("/calendar", response_model=TaskCalendarResponse)
+async def get_calendar(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    response: Response,
+    db=Depends(get_read_session),
+    granularity: Literal["day", "week", "month"] = Query(default="day", description="Bucket size; weeks start on Monday"),
+    date_from: date | None = Query(default=None, description="Only tasks on or after this date"),
+    date_to: date | None = Query(default=None, description="Only tasks on or before this date"),
+    if_none_match: Annotated[str | None, Header()] = None
+):
+    """
+    Number of tasks per day, week or month, for calendar views.
+
+    Only non-empty buckets are returned, and no task bodies.
+
+    Args:
+        granularity: "day", "week" (ISO weeks, starting Monday) or "month"
+        date_from: Only tasks on or after this date (inclusive)
+        date_to: Only tasks on or before this date (inclusive)
+        if_none_match: ETag from a previous response; answered with 304 if
+            none of the user's tasks changed since
+    """
+    check_date_range(date_from, date_to)
+    _, headers, not_modified = await conditional_etag(db, current_user, if_none_match)
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(headers)
+    try:
+        buckets = await get_task_calendar(db, current_user.id, granularity, date_from, date_to)
+        return TaskCalendarResponse(
+            success=True,
+            granularity=granularity,
+            buckets=[{"start": start, "count": count} for start, count in buckets],
+        )
+    except Exception as e:
+        logger.error(f"Error building task calendar: {e}")
+        return TaskCalendarResponse(success=False, granularity=granularity, error="Internal Server Error")
+
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def get_changes(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    db=Depends(get_read_session),
+    since: int = Query(default=0, ge=0, description="version from the previous sync; 0 for a full sync"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page of this sync")
+):
+    """
+    Delta sync: the tasks written and deleted since a previous sync.
+
+    since=0 is a full sync: its pages hold every task, and they replace the
+    client's copy. Apply every page, following next_cursor with the same
+    since, then keep the version returned with the last page and pass it as
+    since next time.
+    Work and payload scale with the number of changes, not of tasks.
+
+    Returns 410 when the changes since ``since`` are no longer known (the
+    deletions were purged, or the version is from another database): the
+    client must drop its copy and sync again from 0.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_change_cursor(cursor)
+        except ValueError as ve:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+    version = await get_task_version(db, current_user.id)
+    if since and (since > version or since < await get_tombstone_floor(db, current_user.id)):
+        raise HTTPException(status_code=status.HTTP_410_GONE,
+                            detail="Changes since this version are no longer available, sync again from 0")
+
+    try:
+        changed, deleted, position = await get_task_changes(
+            db, current_user.id, since, after=after, limit=settings.TASK_CHANGES_MAX_ITEMS)
+        return TaskChangesResponse(
+            success=True,
+            tasks=[TaskElement(id=row.id, task=row.task, date=row.date) for row in changed],
+            deleted=[row.task_id for row in deleted],
+            version=version,
+            next_cursor=encode_change_cursor(*position) if position else None,
+        )
+    except Exception as e:
+        logger.error(f"Error fetching task changes: {e}")
+        return TaskChangesResponse(success=False, error="Internal Server Error")
+
+
+def format_sse(event: TaskEvent) -> bytes:
+    data = json.dumps({"type": event.type, "tasks": event.tasks}, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n".encode()
+
+
+async def sse_stream(user_id: int, last_event_id: int | None, current_version: int):
+    """Subscribe, then relay events and heartbeats until the stream's lifetime is over."""
+    # A fresh client is at the version read before subscribing; writes committed since are replayed
+    resume_from = last_event_id if last_event_id is not None else current_version
+    subscription = await task_events.subscribe(user_id, resume_from, current_id=current_version)
+    try:
+        # The id the client is at; the replay that follows carries the later ones
+        yield format_sse(TaskEvent(id=resume_from, type="ready"))
+        deadline = asyncio.get_running_loop().time() + settings.TASK_EVENTS_MAX_STREAM_SECONDS
+        async for event in task_events.events(subscription, settings.TASK_EVENTS_HEARTBEAT_SECONDS):
+            yield b": heartbeat\n\n" if event is None else format_sse(event)
+            if asyncio.get_running_loop().time() > deadline:
+                break
+    finally:
+        task_events.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def task_event_stream(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    db=Depends(get_session),
+    last_event_id: Annotated[int | None, Header(description="Id of the last event received; set by EventSource on reconnect")] = None,
+    since: int | None = Query(default=None, description="Same as Last-Event-ID, for the first connection")
+):
+    """
+    Server-Sent Events feed of changes to the current user's tasks.
+
+    Each event is named created, updated or deleted, and its id is the task
+    collection version after the change (the same version the ETags carry).
+    A client that reconnects with Last-Event-ID gets the events it missed. If
+    they are no longer available, or the client fell too far behind, it gets
+    a reset event instead: it should refetch GET /tasks. Comment lines are
+    sent as heartbeats, and streams are closed after
+    TASK_EVENTS_MAX_STREAM_SECONDS so that clients reconnect and
+    re-authenticate.
+    """
+    current_version = await get_task_version(db, current_user.id)
+    # Give the connection back to the pool: the stream stays open for minutes
+    await db.close()
+    return StreamingResponse(
+        sse_stream(current_user.id, last_event_id if last_event_id is not None else since, current_version),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/search", response_model=TaskListResponse)
+async def search_tasks(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Words to find; end a word with * to match it as a prefix")],
+    db=Depends(get_read_session),
+    page: int = Query(default=1, ge=1, description="Page number (starts at 1)"),
+    page_size: int = Query(default=10, ge=1, le=100, description="Number of items per page")
+):
+    """
+    Full-text search in the current user's task descriptions.
+
+    Args:
+        q: Search words, all of which must match; ``word*`` matches by prefix
+        page: Page number (starts at 1)
+        page_size: Number of items per page (1-100)
+
+    Returns:
+        Matching tasks, most relevant first
+    """
+    try:
+        terms = to_fts_query(q)
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+    try:
+        total, tasks = await search_tasks_db(db, current_user.id, terms, skip=(page - 1) * page_size, limit=page_size)
+        return json_response(task_list_json(
+            tasks,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=(total + page_size - 1) // page_size,
+        ))
+    except Exception as e:
+        logger.error(f"Error searching tasks: {e}")
+        return TaskListResponse(success=False, tasks=[], error="Internal Server Error")
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def export_chunks(db, user_id: int, format: str):
+    """Encode streamed task rows, one output chunk per fetched batch."""
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "task", "date"])
+        async for rows in stream_tasks(db, user_id, settings.TASK_EXPORT_BATCH_SIZE):
+            writer.writerows((task_id, task, task_date.isoformat()) for task_id, task, task_date in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    else:
+        async for rows in stream_tasks(db, user_id, settings.TASK_EXPORT_BATCH_SIZE):
+            yield "".join(
+                json.dumps({"id": task_id, "task": task, "date": task_date.isoformat()},
+                           ensure_ascii=False, separators=(",", ":")) + "\n"
+                for task_id, task, task_date in rows
+            ).encode()
+
+
+@router.get("/export")
+async def export_tasks(
+    current_user: Annotated[UserInDB, Depends(get_current_user)],
+    db=Depends(get_read_session),
+    format: Literal["ndjson", "csv"] = Query(default="ndjson", description="ndjson: one JSON object per line; csv: with a header row")
+):
+    """
+    Stream all tasks of the current user, ordered by date.
+
+    Rows are read with a server-side cursor and written as they arrive, so
+    memory use does not depend on the number of tasks. The session stays open
+    until the response is sent (request-scoped dependency).
+    """
+    return StreamingResponse(
+        export_chunks(db, current_user.id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+def check_bulk_size(items: list):
+    if len(items) > settings.TASK_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"At most {settings.TASK_BULK_MAX_ITEMS} items per request")
+
+
+def check_bulk_ownership(current_user, ids: List[int], owners: dict[int, int]) -> tuple[List[TaskBulkResult], set[int]]:
+    """
+    Per-item ownership results for a bulk request.
+
+    Returns:
+        Error results for items that cannot be applied, and the ids that can
+    """
+    errors = []
+    allowed = set()
+    seen = set()
+    for index, task_id in enumerate(ids):
+        if task_id in seen:
+            errors.append(TaskBulkResult(index=index, id=task_id, success=False, error="Duplicate id in request"))
+        elif task_id not in owners:
+            errors.append(TaskBulkResult(index=index, id=task_id, success=False, error="This item does not exist"))
+        elif owners[task_id] != current_user.id:
+            errors.append(TaskBulkResult(index=index, id=task_id, success=False, error="This item does not belong to this user"))
+        else:
+            allowed.add(task_id)
+        seen.add(task_id)
+    return errors, allowed
+
+
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def add_tasks(current_user: Annotated[UserInDB, Depends(get_current_user)], tasks_in: Annotated[List[TaskPost], Body(min_length=1)], db=Depends(get_session)):
+    """Create many tasks in one transaction"""
+    check_bulk_size(tasks_in)
+    try:
+        new_tasks = await add_tasks_db(db, current_user.id, tasks_in)
+        return TaskBulkResponse(
+            success=True,
+            results=[
+                TaskBulkResult(index=index, id=row.id, success=True, task=TaskElement(id=row.id, task=row.task, date=row.date))
+                for index, row in enumerate(new_tasks)
+            ]
+        )
+    except Exception as e:
+        return TaskBulkResponse(success=False, error="Internal Server Error")
+
+
+@router.put("/bulk", response_model=TaskBulkResponse)
+async def put_tasks(current_user: Annotated[UserInDB, Depends(get_current_user)], tasks_in: Annotated[List[TaskPut], Body(min_length=1)], db=Depends(get_session)):
+    """Update many tasks in one transaction; items the user does not own are reported, not applied"""
+    check_bulk_size(tasks_in)
+    try:
+        ids = [task.id for task in tasks_in]
+        owners = await get_task_owners(db, ids)
+        errors, allowed = check_bulk_ownership(current_user, ids, owners)
+        rejected = {result.index for result in errors}
+        to_update = [task for index, task in enumerate(tasks_in) if index not in rejected]
+        updated = {row.id: row for row in await put_tasks_db(db, current_user.id, to_update)} if to_update else {}
+        results = {result.index: result for result in errors}
+        for index, task in enumerate(tasks_in):
+            if index not in results:
+                row = updated.get(task.id)
+                results[index] = TaskBulkResult(
+                    index=index, id=task.id, success=row is not None,
+                    task=TaskElement(id=row.id, task=row.task, date=row.date) if row is not None else None,
+                    error=None if row is not None else "This item does not exist")
+        return TaskBulkResponse(success=True, results=[results[i] for i in range(len(tasks_in))])
+    except Exception as e:
+        return TaskBulkResponse(success=False, error="Internal Server Error")
+
+
+@router.post("/bulk/delete", response_model=TaskBulkResponse)
+async def delete_tasks(current_user: Annotated[UserInDB, Depends(get_current_user)], ids: Annotated[List[int], Body(min_length=1)], db=Depends(get_session)):
+    """Delete many tasks in one statement; items the user does not own are reported, not deleted"""
+    check_bulk_size(ids)
+    try:
+        owners = await get_task_owners(db, ids)
+        errors, allowed = check_bulk_ownership(current_user, ids, owners)
+        deleted = set(await delete_tasks_db(db, current_user.id, list(allowed))) if allowed else set()
+        results = {result.index: result for result in errors}
+        for index, task_id in enumerate(ids):
+            if index not in results:
+                results[index] = TaskBulkResult(
+                    index=index, id=task_id, success=task_id in deleted,
+                    error=None if task_id in deleted else "This item does not exist")
+        return TaskBulkResponse(success=True, results=[results[i] for i in range(len(ids))])
+    except Exception as e:
+        return TaskBulkResponse(success=False, error="Internal Server Error")
+
+
 @router.get("/{id}", response_model=TaskResponse)
-async def get_task(current_user: Annotated[UserInDB, Depends(get_current_user)], id: Annotated[int, Path(title="The ID of the item to get", description="The ID must be number")], db=Depends(get_session)):
+async def get_task(current_user: Annotated[UserInDB, Depends(get_current_user)], id: Annotated[int, Path(title="The ID of the item to get", description="The ID must be number")], db=Depends(get_session), if_none_match: Annotated[str | None, Header()] = None):
+    _, headers, not_modified = await conditional_etag(db, current_user, if_none_match)
+    if not_modified is not None:
+        return not_modified
     task = await check_task_ownership(db, current_user, id)
     try:
-        task_response = TaskResponse(task=TaskElement.model_validate(
-            task), success=True)
-        return task_response
+        return json_response(task_json(task), headers)
     except ValueError as ve:
         logger.critical(ve)
         return TaskResponse(success=False, task=None, error=str(ve))
@@ -111,30 +526,21 @@ async def get_task(current_user: Annotated[UserInDB, Depends(get_current_user)],
 
 @router.put("/{id}", response_model=TaskResponse)
 async def put_task(current_user: Annotated[UserInDB, Depends(get_current_user)], id: Annotated[int, Path(title="The ID of the item to update", description="The ID must be number")], task: TaskPost = Body(...), db=Depends(get_session)):
-    await check_task_ownership(db, current_user, id)
     try:
-        task = await put_task_db(db, task_id=id, task=task)
-        task_response = TaskResponse(
-            task=TaskElement.model_validate(task), success=True)
-        return task_response
-    except ValueError as ve:
-        return TaskResponse(success=False, task=None, error=str(ve))
+        updated = await put_task_db(db, user_id=current_user.id, task_id=id, task=task)
     except Exception as e:
         return TaskResponse(success=False, task=None, error="Internal Server Error")
+    if updated is None:
+        await raise_missing_or_forbidden(db, current_user, id)
+    return json_response(task_json(updated))
 
 
 @router.delete("/{id}", response_model=TaskResponse)
 async def delete_task(current_user: Annotated[UserInDB, Depends(get_current_user)], id: Annotated[int, Path(title="The ID of the item to delete", description="The ID must be number")], db=Depends(get_session)):
-    task = await check_task_ownership(db, current_user, id)
     try:
-        result = await delete_task_db(db, task_id=id)
-        if not result:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Task not deleted with success")
-        task_response = TaskResponse(
-            task=TaskElement.model_validate(task), success=True)
-        return task_response
-    except ValueError as ve:
-        return TaskResponse(success=False, task=None, error=str(ve))
+        deleted = await delete_task_db(db, user_id=current_user.id, task_id=id)
     except Exception as e:
         return TaskResponse(success=False, task=None, error="Internal Server Error")
+    if deleted is None:
+        await raise_missing_or_forbidden(db, current_user, id)
+    return json_response(task_json(deleted))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List
+from typing import Any, Dict, List
 
 
 class UserOut(BaseModel):
@@ -36,3 +36,9 @@ class CSVDataResponse(BaseModel):
     total_rows: int
     page: int
     page_size: int
+
+
+class MetricsResponse(BaseModel):
+    success: bool
+    error: str | None = None
+    metrics: Dict[str, Dict[str, Any]]
@@ -17,6 +17,7 @@ class TaskListResponse(BaseModel):
     page: int = 1  # Current page number
     page_size: int = 10  # Number of items per page
     total_pages: int = 0  # Total number of pages
+    next_cursor: str | None = None  # Cursor of the next page, None on the last page
     error: str | None = None
 
 
@@ -29,3 +30,42 @@ class TaskResponse(BaseModel):
 class TaskPost(BaseModel):
     desc: Annotated[str, Field(description="Task description", min_length=1)]
     date: Annotated[date, Field(description="Due date")]
+
+
+class TaskPut(TaskPost):
+    id: Annotated[int, Field(description="ID of the task to update")]
+
+
+class TaskBulkResult(BaseModel):
+    index: int  # Position of the item in the request
+    success: bool
+    task: TaskElement | None = None
+    id: int | None = None
+    error: str | None = None
+
+
+class TaskBulkResponse(BaseModel):
+    success: bool
+    results: List[TaskBulkResult] = []
+    error: str | None = None
+
+
+class CalendarBucket(BaseModel):
+    start: date  # First day of the day, week (Monday) or month
+    count: int
+
+
+class TaskCalendarResponse(BaseModel):
+    success: bool
+    granularity: str
+    buckets: List[CalendarBucket] = []
+    error: str | None = None
+
+
+class TaskChangesResponse(BaseModel):
+    success: bool
+    tasks: List[TaskElement] = []  # Created or updated since the given version
+    deleted: List[int] = []  # Ids of tasks deleted since the given version
+    version: int = 0  # Pass as since on the next sync, once every page is applied
+    next_cursor: str | None = None  # Cursor of the next page, None on the last page
+    error: str | None = None
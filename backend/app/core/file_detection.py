@@ -0,0 +1,129 @@
+"""
+File Type Detection Service
+
+Identifies uploaded files with Magika without slowing down startup or the
+event loop.
+
+Importing magika pulls in onnxruntime and numpy, and constructing it loads the
+ONNX model: done at import time, every worker paid for it on cold start, even
+those that never see an upload. The model is now loaded on first use, or
+ahead of time by ``warm_up`` in the background when the app starts. Inference
+runs on a small dedicated thread pool, with at most ``max_concurrency``
+detections admitted at once; further uploads wait for a slot.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.core.worker_pool import BoundedPool
+
+
+class FileTypeDetector:
+    """
+    Lazily loaded Magika behind a bounded thread pool.
+
+    The model is loaded once, in a worker thread, by whichever of ``warm_up``
+    or the first ``identify_path`` comes first; concurrent callers wait for
+    that single load.
+    """
+
+    def __init__(self, max_concurrency: int = 2):
+        self.max_concurrency = max(1, max_concurrency)
+
+        self._magika: Any = None
+        self._load_lock = threading.Lock()
+        self._pool = BoundedPool(self._make_executor, self.max_concurrency)
+        self._warm_up_task: asyncio.Task | None = None
+        self._load_seconds: float | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._magika is not None
+
+    def _make_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="magika")
+
+    def _get_magika(self) -> Any:
+        """The Magika instance, loading the model on first call; runs in a worker thread."""
+        if self._magika is None:
+            with self._load_lock:
+                if self._magika is None:
+                    started = time.perf_counter()
+                    from magika import Magika
+
+                    self._magika = Magika()
+                    self._load_seconds = time.perf_counter() - started
+                    logger.info(f"Magika model loaded in {self._load_seconds * 1000:.0f} ms")
+        return self._magika
+
+    def _identify_path(self, path: Path) -> Any:
+        return self._get_magika().identify_path(path)
+
+    def warm_up(self) -> None:
+        """Start loading the model in the background; returns immediately."""
+        if self.loaded or self._warm_up_task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._warm_up_task = asyncio.create_task(self._warm_up(loop))
+
+    async def _warm_up(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            await loop.run_in_executor(self._pool.executor(), self._get_magika)
+        except Exception as e:
+            # The first detection will try again
+            logger.error(f"Magika warm-up failed: {e}")
+        finally:
+            self._warm_up_task = None
+
+    async def identify_path(self, path: Path) -> Any:
+        """
+        Identify a file with Magika on the detection pool.
+
+        Magika reads a bounded block at each end of the file, so the cost does
+        not grow with the file size.
+
+        Args:
+            path: The file to identify
+
+        Returns:
+            The MagikaResult
+        """
+        await self._pool.acquire()
+        return await self._pool.run(self._identify_path, path)
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of the detector's state.
+
+        Returns:
+            Dictionary with the model load time, current load and lifetime totals
+        """
+        pool = self._pool.metrics()
+        return {
+            "loaded": self.loaded,
+            "load_ms": None if self._load_seconds is None else round(self._load_seconds * 1000, 3),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": pool["in_flight"],
+            "waiting": pool["waiting"],
+            "completed": pool["completed"],
+            "avg_run_ms": pool["avg_run_ms"],
+        }
+
+    async def stop(self) -> None:
+        """Cancel a pending warm-up and stop the thread pool, waiting for running detections."""
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+            try:
+                await self._warm_up_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self._pool.shutdown)
+
+
+file_type_detector = FileTypeDetector(max_concurrency=settings.FILE_DETECTION_MAX_CONCURRENCY)
@@ -0,0 +1,124 @@
+"""
+Password Hashing Service
+
+Runs Argon2 hashing and verification on a bounded worker pool so that
+CPU-bound password work never blocks the event loop.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.core.security import hash_password, verify_password
+from app.core.settings import settings
+from app.core.worker_pool import BoundedPool
+
+BACKPRESSURE_WAIT = "wait"
+BACKPRESSURE_REJECT = "reject"
+
+
+class PasswordHashingService:
+    """
+    Async front-end for Argon2 running on a thread or process pool.
+
+    At most ``max_workers + max_queue`` jobs are admitted at once. When the
+    pool is full, callers either wait for a free slot (up to ``wait_timeout``
+    seconds) or are rejected immediately, depending on ``backpressure``.
+    Both outcomes surface as a 503 so clients can retry later.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 32,
+        backpressure: str = BACKPRESSURE_WAIT,
+        wait_timeout: float = 5.0,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing pool kind: {kind}")
+        if backpressure not in (BACKPRESSURE_WAIT, BACKPRESSURE_REJECT):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.capacity = self.max_workers + self.max_queue
+        self.backpressure = backpressure
+        self.wait_timeout = wait_timeout
+
+        self._pool = BoundedPool(self._make_executor, self.capacity)
+        self._rejected = 0
+
+    def _make_executor(self) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="argon2")
+
+    def _saturated(self) -> HTTPException:
+        self._rejected += 1
+        logger.warning(
+            f"Password hashing pool saturated ({self._pool.in_flight}/{self.capacity} in flight)")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    async def _acquire(self) -> None:
+        if self.backpressure == BACKPRESSURE_REJECT:
+            if self._pool.slots().locked():
+                raise self._saturated()
+            await self._pool.acquire()
+            return
+
+        try:
+            await self._pool.acquire(timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise self._saturated()
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        await self._acquire()
+        return await self._pool.run(fn, *args)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool."""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against an Argon2 hash on the worker pool."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of pool saturation counters.
+
+        Returns:
+            Dictionary with capacity, current load and lifetime totals
+        """
+        pool = self._pool.metrics()
+        return {
+            "kind": self.kind,
+            "backpressure": self.backpressure,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            **pool,
+            "queued": max(0, pool["in_flight"] - self.max_workers),
+            "saturation": round(pool["in_flight"] / self.capacity, 3),
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for running jobs to finish."""
+        self._pool.shutdown()
+
+
+password_hashing = PasswordHashingService(
+    kind=settings.PASSWORD_HASH_POOL,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    backpressure=settings.PASSWORD_HASH_BACKPRESSURE,
+    wait_timeout=settings.PASSWORD_HASH_WAIT_TIMEOUT_SECONDS,
+)
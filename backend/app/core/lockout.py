@@ -4,43 +4,40 @@ Account Lockout Management
 Handles failed login attempt tracking and account locking.
 """
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.models.login_attempts import LoginAttempt
 from app.core.audit import AuditLogger
+from app.core.principal_cache import principal_cache
+from app.core.login_recorder import login_attempt_recorder
 from loguru import logger
-from app.api.schema.auth import UserInDB
 # Configuration
 MAX_FAILED_ATTEMPTS = 5
 LOCKOUT_DURATION_MINUTES = 30
 
 
-async def record_login_attempt(
-    db: AsyncSession,
+def record_login_attempt(
     username: str,
     success: bool,
     ip_address: str = None
 ) -> None:
     """
-    Record a login attempt in the database.
+    Record a login attempt.
+
+    The attempt is queued and written in a batch by the background
+    LoginAttemptRecorder, so the login request does not wait on the insert.
 
     Args:
-        db: Database session
         username: Username attempted
         success: Whether the login succeeded
         ip_address: IP address of the attempt
     """
-    attempt = LoginAttempt(
-        username=username,
-        success=1 if success else 0,
-        ip_address=ip_address,
-        attempted_at=datetime.now(timezone.utc)
-    )
-    db.add(attempt)
-    await db.commit()
+    if not login_attempt_recorder.record(username, success, ip_address):
+        logger.warning(f"Login attempt queue full, dropped attempt for {username}")
 
 
-async def handle_failed_login(db: AsyncSession, user: User, ip_address: str = "unknown") -> None:
+async def handle_failed_login(db: AsyncSession, user: User, ip_address: str = "unknown", commit: bool = True) -> None:
     """
     Handle a failed login attempt. Increment counter and lock if needed.
 
@@ -48,7 +45,10 @@ async def handle_failed_login(db: AsyncSession, user: User, ip_address: str = "u
         db: Database session
         user: User model instance
         ip_address: IP address of the failed attempt
+        commit: Commit immediately; when False the caller must commit and
+            invalidate the principal cache
     """
+    username = user.username  # Expired by the commit
     user.failed_login_attempts += 1
 
     if user.failed_login_attempts >= MAX_FAILED_ATTEMPTS:
@@ -62,17 +62,22 @@ async def handle_failed_login(db: AsyncSession, user: User, ip_address: str = "u
         AuditLogger.account_locked(
             user.username, ip_address, user.failed_login_attempts)
 
-    await db.commit()
+    if commit:
+        await db.commit()
+        principal_cache.invalidate(username)
 
 
-async def handle_successful_login(db: AsyncSession, user: User) -> None:
+async def handle_successful_login(db: AsyncSession, user: User, commit: bool = True) -> None:
     """
     Handle a successful login. Reset failed attempt counter.
 
     Args:
         db: Database session
         user: User model instance
+        commit: Commit immediately; when False the caller must commit and
+            invalidate the principal cache
     """
+    username = user.username  # Expired by the commit
     was_locked = user.locked_until is not None
     user.failed_login_attempts = 0
     user.locked_until = None
@@ -81,10 +86,12 @@ async def handle_successful_login(db: AsyncSession, user: User) -> None:
         # Audit log account unlock
         AuditLogger.account_unlocked(user.username, method="successful_login")
 
-    await db.commit()
+    if commit:
+        await db.commit()
+        principal_cache.invalidate(username)
 
 
-async def check_account_locked(user: UserInDB) -> tuple[bool, str]:
+async def check_account_locked(user: User) -> tuple[bool, str]:
     """
     Check if an account is locked.
 
@@ -94,7 +101,7 @@ async def check_account_locked(user: UserInDB) -> tuple[bool, str]:
     Returns:
         Tuple of (is_locked, message)
     """
-    if user.is_locked:
+    if user.is_locked():
         locked_until = user.locked_until
         if locked_until.tzinfo is None:
             locked_until = locked_until.replace(tzinfo=timezone.utc)
@@ -111,26 +118,41 @@ async def check_account_locked(user: UserInDB) -> tuple[bool, str]:
     return False, ""
 
 
-async def cleanup_old_login_attempts(db: AsyncSession, days: int = 30) -> int:
+async def cleanup_old_login_attempts(db: AsyncSession, days: int = 30, chunk_size: int = 1000) -> int:
     """
     Clean up old login attempt records.
 
+    Rows are deleted in chunks of ``chunk_size`` (one transaction each),
+    seeking on the attempted_at index.
+
     Args:
         db: Database session
         days: Delete records older than this many days
+        chunk_size: Maximum rows deleted per transaction
 
     Returns:
         Number of records deleted
     """
-    from sqlalchemy import delete
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
 
-    result = await db.execute(
-        delete(LoginAttempt).where(LoginAttempt.attempted_at < cutoff_date)
-    )
-    await db.commit()
+    deleted_count = 0
+    while True:
+        chunk = (
+            select(LoginAttempt.id)
+            .where(LoginAttempt.attempted_at < cutoff_date)
+            .limit(chunk_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(LoginAttempt)
+            .where(LoginAttempt.id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted_count += result.rowcount
+        if result.rowcount < chunk_size:
+            break
 
-    deleted_count = result.rowcount
     if deleted_count > 0:
         logger.info(f"Cleaned up {deleted_count} old login attempt records")
 
@@ -0,0 +1,176 @@
+"""
+Login Attempt Recorder
+
+Write-behind buffer for LoginAttempt rows. Requests only enqueue attempts;
+a background task writes them in batched multi-row INSERTs so that a burst
+of logins (or a brute-force storm) does not add a write per request.
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.db.db import AsyncSessionLocal
+from app.models.login_attempts import LoginAttempt
+
+
+class LoginAttemptRecorder:
+    """
+    Bounded in-memory queue of login attempts flushed in batches.
+
+    A flush is triggered when ``batch_size`` attempts are pending or every
+    ``flush_interval`` seconds, whichever comes first. When the queue holds
+    ``max_queue`` attempts, new ones are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self._pending: deque[dict] = deque()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+        # Metrics
+        self._enqueued = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+        self._last_flush_ms = 0.0
+
+    def record(self, username: str, success: bool, ip_address: str | None = None) -> bool:
+        """
+        Queue a login attempt without touching the database.
+
+        Returns:
+            False if the queue was full and the attempt was dropped
+        """
+        if len(self._pending) >= self.max_queue:
+            self._dropped += 1
+            return False
+
+        self._pending.append({
+            "username": username,
+            "success": 1 if success else 0,
+            "ip_address": ip_address,
+            "attempted_at": datetime.now(timezone.utc),
+        })
+        self._enqueued += 1
+
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self, db: AsyncSession | None = None) -> int:
+        """
+        Write every pending attempt, one multi-row INSERT per batch.
+
+        Args:
+            db: Session to write with; a new one is opened when omitted
+
+        Returns:
+            Number of attempts written
+        """
+        if not self._pending:
+            return 0
+
+        if db is None:
+            async with self.session_factory() as session:
+                return await self._flush(session)
+        return await self._flush(db)
+
+    async def _flush(self, db: AsyncSession) -> int:
+        written = 0
+        while self._pending:
+            batch = [self._pending.popleft()
+                     for _ in range(min(self.batch_size, len(self._pending)))]
+            started = time.perf_counter()
+            try:
+                await db.execute(insert(LoginAttempt).values(batch))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                self._failed += len(batch)
+                logger.error(f"Failed to write {len(batch)} login attempts: {e}")
+                continue
+            self._last_flush_ms = (time.perf_counter() - started) * 1000
+            self._batches += 1
+            self._flushed += len(batch)
+            written += len(batch)
+        return written
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Login attempt flush failed: {e}")
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="login-attempt-recorder")
+        logger.info("Login attempt recorder started")
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still queued."""
+        if self._task is not None:
+            # Not cancelled: a flush in progress has already taken its batch off the queue
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+
+        written = await self.flush()
+        logger.info(
+            f"Login attempt recorder stopped (final flush: {written}, "
+            f"flushed: {self._flushed}, dropped: {self._dropped})"
+        )
+
+    def clear(self) -> None:
+        """Discard pending attempts without writing them."""
+        self._pending.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "max_queue": self.max_queue,
+            "enqueued": self._enqueued,
+            "flushed": self._flushed,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "batches": self._batches,
+            "last_flush_ms": round(self._last_flush_ms, 3),
+        }
+
+
+login_attempt_recorder = LoginAttemptRecorder(
+    max_queue=settings.LOGIN_ATTEMPT_QUEUE_SIZE,
+    batch_size=settings.LOGIN_ATTEMPT_BATCH_SIZE,
+    flush_interval=settings.LOGIN_ATTEMPT_FLUSH_INTERVAL_SECONDS,
+)
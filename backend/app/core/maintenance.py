@@ -0,0 +1,219 @@
+"""
+Background Maintenance
+
+Lifespan-managed scheduler for periodic database housekeeping: purging
+expired refresh tokens, old login attempts and old task tombstones. Deletes run in bounded
+chunks so each transaction holds the write lock only briefly.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.lockout import cleanup_old_login_attempts
+from app.core.settings import settings
+from app.db.db import AsyncSessionLocal
+from app.models.refresh_tokens import RefreshToken
+from app.models.task import TaskTombstone
+from app.models.task_stats import UserTaskStats
+
+
+async def purge_expired_refresh_tokens(db: AsyncSession, chunk_size: int = 1000) -> int:
+    """
+    Delete expired refresh tokens in chunks.
+
+    Revoked but unexpired tokens are kept for audit, as before.
+
+    Args:
+        db: Database session
+        chunk_size: Maximum rows deleted per transaction
+
+    Returns:
+        Number of tokens deleted
+    """
+    now = datetime.now(timezone.utc)
+    deleted = 0
+    while True:
+        chunk = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < now)
+            .limit(chunk_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < chunk_size:
+            return deleted
+
+
+async def purge_task_tombstones(db: AsyncSession, days: int = 90, chunk_size: int = 1000) -> int:
+    """
+    Delete tombstones of tasks deleted more than ``days`` ago, in chunks.
+
+    Each user's tombstone_floor is raised to the highest purged change_seq in
+    the same transaction, so delta syncs from before it get a 410 instead of
+    silently missing deletions.
+
+    Returns:
+        Number of tombstones deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    deleted = 0
+    while True:
+        chunk = (await db.execute(
+            select(TaskTombstone.task_id, TaskTombstone.user_id, TaskTombstone.change_seq)
+            .where(TaskTombstone.deleted_at < cutoff)
+            .limit(chunk_size)
+        )).all()
+        if not chunk:
+            return deleted
+        floors: dict[int, int] = {}
+        for _, user_id, change_seq in chunk:
+            floors[user_id] = max(floors.get(user_id, 0), change_seq)
+        for user_id, change_seq in floors.items():
+            await db.execute(
+                update(UserTaskStats)
+                .where(UserTaskStats.user_id == user_id)
+                .values(tombstone_floor=func.max(UserTaskStats.tombstone_floor, change_seq))
+            )
+        await db.execute(
+            delete(TaskTombstone)
+            .where(TaskTombstone.task_id.in_([task_id for task_id, _, _ in chunk]))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        deleted += len(chunk)
+        if len(chunk) < chunk_size:
+            return deleted
+
+
+@dataclass
+class JobRun:
+    job: str
+    rows_removed: int = 0
+    duration_ms: float = 0.0
+    finished_at: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class MaintenanceJob:
+    name: str
+    func: Callable[[AsyncSession], Awaitable[int]]
+    interval_seconds: float
+    runs: int = 0
+    total_rows_removed: int = 0
+    last_run: JobRun | None = field(default=None)
+
+
+class MaintenanceScheduler:
+    """Runs each registered job on its own interval while the app is up."""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.jobs: dict[str, MaintenanceJob] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[AsyncSession], Awaitable[int]], interval_seconds: float) -> None:
+        self.jobs[name] = MaintenanceJob(name=name, func=func, interval_seconds=interval_seconds)
+
+    async def run_job(self, name: str, db: AsyncSession | None = None) -> JobRun:
+        """
+        Run a job once and record the outcome.
+
+        Args:
+            name: Registered job name
+            db: Session to run with; a new one is opened when omitted
+
+        Returns:
+            The recorded JobRun
+        """
+        job = self.jobs[name]
+        run = JobRun(job=name)
+        started = time.perf_counter()
+        try:
+            if db is None:
+                async with self.session_factory() as session:
+                    run.rows_removed = await job.func(session)
+            else:
+                run.rows_removed = await job.func(db)
+        except Exception as e:
+            run.error = str(e)
+            logger.error(f"[MAINTENANCE] {name} failed: {e}")
+        run.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        run.finished_at = datetime.now(timezone.utc).isoformat()
+
+        job.runs += 1
+        job.total_rows_removed += run.rows_removed
+        job.last_run = run
+        if run.error is None:
+            logger.info(
+                f"[MAINTENANCE] {name} | "
+                f"rows_removed={run.rows_removed} | "
+                f"duration_ms={run.duration_ms}"
+            )
+        return run
+
+    async def _loop(self, job: MaintenanceJob) -> None:
+        while True:
+            await self.run_job(job.name)
+            await asyncio.sleep(job.interval_seconds)
+
+    async def start(self) -> None:
+        """Start one background task per job; each job runs once right away."""
+        if self._tasks:
+            return
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"maintenance-{job.name}"))
+        logger.info(f"Maintenance scheduler started with jobs: {', '.join(self.jobs)}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def metrics(self) -> dict:
+        return {
+            name: {
+                "interval_seconds": job.interval_seconds,
+                "runs": job.runs,
+                "total_rows_removed": job.total_rows_removed,
+                "last_run": vars(job.last_run) if job.last_run else None,
+            }
+            for name, job in self.jobs.items()
+        }
+
+
+maintenance_scheduler = MaintenanceScheduler()
+maintenance_scheduler.add_job(
+    "purge_expired_refresh_tokens",
+    lambda db: purge_expired_refresh_tokens(db, chunk_size=settings.MAINTENANCE_CHUNK_SIZE),
+    settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+)
+maintenance_scheduler.add_job(
+    "cleanup_old_login_attempts",
+    lambda db: cleanup_old_login_attempts(
+        db, days=settings.LOGIN_ATTEMPT_RETENTION_DAYS, chunk_size=settings.MAINTENANCE_CHUNK_SIZE),
+    settings.LOGIN_ATTEMPT_PURGE_INTERVAL_SECONDS,
+)
+maintenance_scheduler.add_job(
+    "purge_task_tombstones",
+    lambda db: purge_task_tombstones(
+        db, days=settings.TASK_TOMBSTONE_RETENTION_DAYS, chunk_size=settings.MAINTENANCE_CHUNK_SIZE),
+    settings.TASK_TOMBSTONE_PURGE_INTERVAL_SECONDS,
+)
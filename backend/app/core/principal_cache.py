@@ -0,0 +1,112 @@
+"""
+Authenticated Principal Cache
+
+Short-lived in-process cache of the users resolved from access tokens, so
+that authenticated requests do not hit the users table every time.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from app.api.schema.auth import UserInDB
+from app.core.settings import settings
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of UserInDB keyed by username.
+
+    Entries expire after ``ttl_seconds`` and the least recently used entry is
+    evicted once ``max_size`` is reached. Any change to a user's lockout
+    state, role, status or password must call ``invalidate``.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, UserInDB]] = OrderedDict()
+        self._lock = Lock()
+        # Bumped on every invalidation so a lookup that raced with it is not cached
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def generation(self) -> int:
+        """Token to pass to ``set`` after loading a user from the database."""
+        return self._generation
+
+    def get(self, username: str) -> UserInDB | None:
+        """Return the cached user, or None on miss or expiry."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[username]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self._hits += 1
+            return user
+
+    def set(self, username: str, user: UserInDB, generation: int | None = None) -> None:
+        """
+        Cache a user loaded from the database.
+
+        Args:
+            username: Cache key
+            user: User to cache
+            generation: Value of ``generation()`` taken before the lookup; the
+                entry is dropped if an invalidation happened in between
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[username] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, username: str) -> None:
+        """Drop a user so the next request reloads it from the database."""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+)
@@ -0,0 +1,130 @@
+"""
+Task Response Cache
+
+Cache of serialized GET /tasks pages. Entries hold the exact JSON bytes sent
+to the client and are keyed by user, collection version and the page
+parameters, so an entry can never be served after a write, even one made by
+another process. Writes through app/db/task.py also drop the user's entries
+right away so their memory is reclaimed without waiting for LRU eviction.
+
+The backend is chosen with RESPONSE_CACHE_BACKEND ("memory" or "none").
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable
+
+from app.core.settings import settings
+
+CacheKey = tuple[int, Hashable]
+
+
+class ResponseCache:
+    """Interface of response cache backends; this base class caches nothing."""
+
+    def get(self, user_id: int, key: Hashable) -> bytes | None:
+        return None
+
+    def set(self, user_id: int, key: Hashable, body: bytes) -> None:
+        pass
+
+    def invalidate_user(self, user_id: int) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def metrics(self) -> dict:
+        return {"backend": "none"}
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-process LRU bounded by the total size of the cached bodies.
+
+    A per-user index of keys makes ``invalidate_user`` proportional to the
+    number of pages cached for that user, not to the size of the cache.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._keys_by_user: dict[int, set[CacheKey]] = {}
+        self._lock = Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, user_id: int, key: Hashable) -> bytes | None:
+        with self._lock:
+            body = self._entries.get((user_id, key))
+            if body is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self._hits += 1
+            return body
+
+    def set(self, user_id: int, key: Hashable, body: bytes) -> None:
+        # A body larger than the whole cache would only evict everything else
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove((user_id, key))
+            self._entries[(user_id, key)] = body
+            self._keys_by_user.setdefault(user_id, set()).add((user_id, key))
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def _remove(self, cache_key: CacheKey) -> None:
+        body = self._entries.pop(cache_key, None)
+        if body is None:
+            return
+        self._bytes -= len(body)
+        user_keys = self._keys_by_user[cache_key[0]]
+        user_keys.discard(cache_key)
+        if not user_keys:
+            del self._keys_by_user[cache_key[0]]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached page of a user."""
+        with self._lock:
+            self._invalidations += 1
+            for cache_key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(cache_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self._bytes = 0
+
+    def metrics(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "users": len(self._keys_by_user),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
+
+def create_response_cache(backend: str, max_bytes: int) -> ResponseCache:
+    if backend == "memory":
+        return MemoryResponseCache(max_bytes=max_bytes)
+    if backend == "none":
+        return ResponseCache()
+    raise ValueError(f"Unknown response cache backend: {backend}")
+
+
+response_cache = create_response_cache(settings.RESPONSE_CACHE_BACKEND, settings.RESPONSE_CACHE_MAX_BYTES)
@@ -4,6 +4,20 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./app/db/sqlite.db"
     DEBUG: bool = False
+    DATABASE_POOL_SIZE: int = 5  # Connections kept open; each aiosqlite connection is one thread
+    DATABASE_MAX_OVERFLOW: int = 10  # Extra connections under load (streams hold theirs until done)
+    DATABASE_POOL_TIMEOUT_SECONDS: float = 30
+    READ_DATABASE_URL: str | None = None  # Replica for read-only endpoints; None opens DATABASE_URL query_only
+    READ_DATABASE_POOL_SIZE: int = 5  # Connections kept open by the read engine
+    SQL_SLOW_QUERY_MS: float | None = 100  # Statements slower than this are logged; None disables
+    SQL_REQUEST_QUERY_WARNING: int = 50  # Requests issuing more statements are logged (N+1 loops)
+    SERVER_TIMING_ENABLED: bool = True  # Server-Timing header with each request's DB time
+    SQLITE_JOURNAL_MODE: str | None = "wal"  # Readers do not block the writer; None keeps SQLite's default
+    SQLITE_SYNCHRONOUS: str | None = "normal"  # Durable in WAL except for the last commits on power loss
+    SQLITE_BUSY_TIMEOUT_MS: int | None = 5000  # Wait this long for a lock before "database is locked"
+    SQLITE_MMAP_SIZE: int | None = 256 * 1024 * 1024  # Bytes of the file read through mmap
+    SQLITE_CACHE_SIZE: int | None = -64 * 1024  # Page cache per connection; negative is in KiB
+    SQLITE_TEMP_STORE: str | None = "memory"  # Temporary tables and sort spills
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     SECRET_KEY: str = ""
@@ -11,6 +25,42 @@ class Settings(BaseSettings):
     ENV: str = "test"
     COOKIE_SECURE: bool = True  # Set to False for local development without HTTPS
     COOKIE_SAMESITE: str = "lax"  # "strict", "lax", or "none"
+    PASSWORD_HASH_POOL: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Jobs allowed to wait for a worker
+    PASSWORD_HASH_BACKPRESSURE: str = "wait"  # "wait" or "reject" when the queue is full
+    PASSWORD_HASH_WAIT_TIMEOUT_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # 0 disables the cache
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+    LOGIN_ATTEMPT_QUEUE_SIZE: int = 10000  # Attempts beyond this are dropped
+    LOGIN_ATTEMPT_BATCH_SIZE: int = 500
+    LOGIN_ATTEMPT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    LOGIN_ATTEMPT_RETENTION_DAYS: int = 30
+    MAINTENANCE_ENABLED: bool = True
+    MAINTENANCE_CHUNK_SIZE: int = 1000  # Rows deleted per transaction
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: float = 3600
+    LOGIN_ATTEMPT_PURGE_INTERVAL_SECONDS: float = 6 * 3600
+    TASK_BULK_MAX_ITEMS: int = 500  # Items accepted per bulk task request
+    TASK_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched and written per export chunk
+    TASK_EVENTS_BACKEND: str = "local"  # "local" is in-process only; "database" shares events between workers
+    TASK_EVENTS_POLL_INTERVAL_SECONDS: float = 0.5  # How often each worker reads new events with the database backend
+    TASK_EVENTS_RETENTION_SECONDS: float = 3600  # Rows of the database backend older than this are purged
+    TASK_EVENTS_HISTORY_SIZE: int = 100  # Events kept per user for Last-Event-ID resume
+    TASK_EVENTS_MAX_USERS: int = 10000  # Users whose event history is kept
+    TASK_EVENTS_QUEUE_SIZE: int = 100  # Events buffered per connection before it is reset
+    TASK_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    TASK_EVENTS_MAX_STREAM_SECONDS: float = 600  # Streams end after this; clients reconnect and re-authenticate
+    TASK_CHANGES_MAX_ITEMS: int = 1000  # Changes returned per delta sync page
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 90  # Clients that did not sync for longer must resync fully
+    TASK_TOMBSTONE_PURGE_INTERVAL_SECONDS: float = 24 * 3600
+    FAST_JSON_RESPONSES: bool = True  # Serialize task responses from rows without re-validating them
+    RESPONSE_CACHE_BACKEND: str = "memory"  # "memory" or "none"
+    RESPONSE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # Total size of cached task list pages
+    UPLOAD_MAX_BYTES: int = 100 * 1024 * 1024  # Larger uploads are rejected with 413
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Upload bytes buffered between two disk writes
+    FILE_DETECTION_MAX_CONCURRENCY: int = 2  # Magika detections running at once; others wait
+    UPLOAD_COLUMNAR_CACHE: bool = True  # Serve /admin/csv-data from a columnar cache of each upload; off reads CSV files through the row index
+    FILE_DETECTION_WARM_UP: bool = True  # Load the Magika model in the background on startup instead of on first upload
     model_config = {
         "env_file": ".env",
         "case_sensitive": True
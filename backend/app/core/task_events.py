@@ -0,0 +1,358 @@
+"""
+Task Change Feed
+
+Per-user pub/sub of task changes, consumed by the GET /tasks/events stream.
+Every committed write in app/db/task.py publishes one event whose id is the
+user's new task collection version, so ids are ordered and identical across
+workers, and they double as the ETag version of the task routes.
+
+Events travel through a backend so that several uvicorn workers can share
+them. Whatever worker a write lands on, every worker's hub receives the event
+and fans it out to its own connections. The local backend delivers in-process
+and is only enough for a single worker (and for tests). The database backend
+shares events between the workers through a task_events table of the app
+database that each worker polls, at the cost of up to a poll interval of
+latency; another transport (Redis pub/sub, Postgres LISTEN/NOTIFY, ...) would
+implement the same methods.
+
+Each hub keeps the last events per user in a ring buffer so a reconnecting
+client can resume from Last-Event-ID. Each connection has a bounded queue: a
+consumer that falls behind is sent a reset and disconnected instead of
+buffering without limit, and it resumes (or refetches) when it reconnects.
+"""
+import asyncio
+import json
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable
+
+from loguru import logger
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.db.db import AsyncSessionLocal
+from app.models.task_event import TaskEventRecord
+
+
+@dataclass
+class TaskEvent:
+    id: int  # Collection version after the write
+    type: str  # "created", "updated", "deleted" or "reset"
+    tasks: list[dict[str, Any]] = field(default_factory=list)
+
+
+# Sent to a connection whose history cannot be replayed or that fell behind:
+# the client must refetch GET /tasks, then continue from the event id
+RESET = "reset"
+
+
+class TaskEventBackend:
+    """Transport between hubs. The local backend delivers to this process only."""
+
+    async def start(self, deliver: Callable[[int, TaskEvent], None]) -> None:
+        self._deliver = deliver
+
+    async def publish(self, user_id: int, event: TaskEvent) -> None:
+        self._deliver(user_id, event)
+
+    async def stop(self) -> None:
+        pass
+
+
+class DatabaseTaskEventBackend(TaskEventBackend):
+    """
+    Shares events between workers through the task_events table.
+
+    ``publish`` inserts a row; every worker polls for the rows after the last
+    one it delivered, every ``poll_interval`` seconds, and delivers them in id
+    order, its own included. Rows older than ``retention_seconds`` are purged
+    by the pollers.
+
+    Args:
+        session_factory: Sessions of the app database
+        poll_interval: Seconds between two polls; the delivery latency
+        retention_seconds: Age after which rows are purged
+        batch_size: Rows read per poll query
+    """
+
+    purge_interval = 60.0
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        poll_interval: float = 0.5,
+        retention_seconds: float = 3600,
+        batch_size: int = 500,
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.batch_size = max(1, batch_size)
+        self._last_id = 0
+        self._stopped: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self, deliver: Callable[[int, TaskEvent], None]) -> None:
+        self._deliver = deliver
+        # Only events published from now on; older ones are for the clients' resume history
+        async with self.session_factory() as db:
+            self._last_id = await db.scalar(select(func.max(TaskEventRecord.id))) or 0
+        self._stopped = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def publish(self, user_id: int, event: TaskEvent) -> None:
+        async with self.session_factory() as db:
+            await db.execute(insert(TaskEventRecord).values(
+                user_id=user_id,
+                version=event.id,
+                type=event.type,
+                tasks=json.dumps(event.tasks, ensure_ascii=False, separators=(",", ":")),
+            ))
+            await db.commit()
+
+    async def poll(self) -> int:
+        """Deliver the rows published since the last poll; returns how many."""
+        delivered = 0
+        async with self.session_factory() as db:
+            while True:
+                rows = (await db.execute(
+                    select(TaskEventRecord.id, TaskEventRecord.user_id, TaskEventRecord.version,
+                           TaskEventRecord.type, TaskEventRecord.tasks)
+                    .where(TaskEventRecord.id > self._last_id)
+                    .order_by(TaskEventRecord.id)
+                    .limit(self.batch_size)
+                )).all()
+                for row in rows:
+                    self._deliver(row.user_id, TaskEvent(id=row.version, type=row.type, tasks=json.loads(row.tasks)))
+                    self._last_id = row.id
+                delivered += len(rows)
+                if len(rows) < self.batch_size:
+                    return delivered
+
+    async def purge(self) -> int:
+        """Delete rows older than the retention; returns how many."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.retention_seconds)
+        async with self.session_factory() as db:
+            result = await db.execute(delete(TaskEventRecord).where(TaskEventRecord.created_at < cutoff))
+            await db.commit()
+            return result.rowcount
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_purge = loop.time()
+        while True:
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.poll_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.poll()
+                if loop.time() >= next_purge:
+                    next_purge = loop.time() + self.purge_interval
+                    await self.purge()
+            except Exception as e:
+                # Rows stay in the table, so the next poll picks them up
+                logger.error(f"Task event poll failed: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Not cancelled: a poll in progress finishes delivering its rows
+            self._stopped.set()
+            await self._task
+            self._task = None
+
+
+class Subscription:
+    """One connection's bounded queue of pending events."""
+
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[TaskEvent] = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def push(self, event: TaskEvent) -> bool:
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+
+
+class TaskEventHub:
+    """
+    Fans task events out to the subscriptions of this process.
+
+    Args:
+        backend: Transport shared by the workers
+        history_size: Events kept per user for Last-Event-ID resume
+        max_users: Users whose history is kept (least recently active dropped first)
+        max_queue: Events buffered per connection before it is reset
+    """
+
+    def __init__(
+        self,
+        backend: TaskEventBackend | None = None,
+        history_size: int = 100,
+        max_users: int = 10000,
+        max_queue: int = 100,
+    ):
+        self.backend = backend or TaskEventBackend()
+        self.history_size = history_size
+        self.max_users = max_users
+        self.max_queue = max_queue
+        self._history: OrderedDict[int, deque[TaskEvent]] = OrderedDict()
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._started = False
+
+        # Metrics
+        self._published = 0
+        self._delivered = 0
+        self._overflows = 0
+        self._resets = 0
+
+    async def start(self) -> None:
+        if not self._started:
+            await self.backend.start(self._dispatch)
+            self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.backend.stop()
+            self._started = False
+
+    async def publish(self, user_id: int, event: TaskEvent) -> None:
+        """Send an event to every worker; never raises, a lost event only costs a refetch."""
+        if not self._started:
+            await self.start()
+        self._published += 1
+        try:
+            await self.backend.publish(user_id, event)
+        except Exception as e:
+            logger.error(f"Failed to publish task event {event.id} for user {user_id}: {e}")
+
+    def _dispatch(self, user_id: int, event: TaskEvent) -> None:
+        history = self._history.get(user_id)
+        if history is None:
+            history = self._history[user_id] = deque(maxlen=self.history_size)
+            while len(self._history) > self.max_users:
+                self._history.popitem(last=False)
+        self._history.move_to_end(user_id)
+        history.append(event)
+
+        for subscription in self._subscriptions.get(user_id, ()):
+            if subscription.overflowed:
+                continue
+            if subscription.push(event):
+                self._delivered += 1
+            else:
+                self._overflows += 1
+
+    def _latest_id(self, user_id: int) -> int:
+        history = self._history.get(user_id)
+        return history[-1].id if history else 0
+
+    def _replay(self, subscription: Subscription, last_event_id: int, current_id: int | None) -> None:
+        history = self._history.get(subscription.user_id, ())
+        missed = [event for event in history if event.id > last_event_id]
+        behind = missed or (current_id is not None and current_id > last_event_id)
+        # Complete only if the history reaches back to the event after last_event_id
+        complete = bool(history) and history[0].id <= last_event_id + 1
+        if behind and not complete:
+            self._resets += 1
+            latest = max(current_id or 0, self._latest_id(subscription.user_id))
+            subscription.push(TaskEvent(id=latest, type=RESET))
+            return
+        for event in missed:
+            subscription.push(event)
+
+    async def subscribe(self, user_id: int, last_event_id: int | None = None, current_id: int | None = None) -> Subscription:
+        """
+        Register a connection, replaying what it missed since ``last_event_id``.
+
+        Args:
+            user_id: Owner of the feed
+            last_event_id: Id of the last event the client processed
+            current_id: The user's current collection version, if known; lets
+                a hub that has no history (e.g. just restarted) notice the
+                client is behind
+
+        If events after ``last_event_id`` are no longer in the history, a
+        single reset event is queued instead of the replay.
+        """
+        if not self._started:
+            await self.start()
+        subscription = Subscription(user_id, self.max_queue)
+        if last_event_id is not None:
+            self._replay(subscription, last_event_id, current_id)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    async def events(
+        self,
+        subscription: Subscription,
+        heartbeat_seconds: float,
+    ) -> AsyncIterator[TaskEvent | None]:
+        """
+        Yield the subscription's events, and None every ``heartbeat_seconds``
+        without one. Ends after a reset, sent when the queue overflowed.
+        """
+        while True:
+            if subscription.overflowed and subscription.queue.empty():
+                self._resets += 1
+                yield TaskEvent(id=self._latest_id(subscription.user_id), type=RESET)
+                return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            yield event
+            if event.type == RESET:
+                return
+
+    def clear(self) -> None:
+        """Drop histories; open subscriptions are kept."""
+        self._history.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "users_with_history": len(self._history),
+            "connections": sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+            "published": self._published,
+            "delivered": self._delivered,
+            "overflows": self._overflows,
+            "resets": self._resets,
+        }
+
+
+def create_task_event_backend(name: str) -> TaskEventBackend:
+    if name == "local":
+        return TaskEventBackend()
+    if name == "database":
+        return DatabaseTaskEventBackend(
+            poll_interval=settings.TASK_EVENTS_POLL_INTERVAL_SECONDS,
+            retention_seconds=settings.TASK_EVENTS_RETENTION_SECONDS,
+        )
+    raise ValueError(f"Unknown task event backend: {name}")
+
+
+task_events = TaskEventHub(
+    backend=create_task_event_backend(settings.TASK_EVENTS_BACKEND),
+    history_size=settings.TASK_EVENTS_HISTORY_SIZE,
+    max_users=settings.TASK_EVENTS_MAX_USERS,
+    max_queue=settings.TASK_EVENTS_QUEUE_SIZE,
+)
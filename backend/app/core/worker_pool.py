@@ -0,0 +1,110 @@
+"""
+Bounded Worker Pool
+
+Executor behind an admission semaphore, shared by the services that move
+blocking work (password hashing, file type detection) off the event loop.
+The executor is created on first use; at most ``capacity`` jobs are admitted
+at once, and the pool keeps the load counters the services report.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+
+class BoundedPool:
+    """
+    Lazily created executor with at most ``capacity`` admitted jobs.
+
+    Callers ``acquire`` a slot, then ``run`` one job, which releases it.
+
+    Args:
+        make_executor: Creates the executor on first use
+        capacity: Jobs admitted at once, running or queued in the executor
+    """
+
+    def __init__(self, make_executor: Callable[[], Executor], capacity: int):
+        self.make_executor = make_executor
+        self.capacity = max(1, capacity)
+
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+
+        # Metrics
+        self._in_flight = 0
+        self._waiting = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._total_wait_seconds = 0.0
+        self._total_run_seconds = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def executor(self) -> Executor:
+        """The executor, created on first call; jobs submitted to it directly bypass the slots."""
+        if self._executor is None:
+            self._executor = self.make_executor()
+        return self._executor
+
+    def slots(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they first wait on
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._slots_loop = loop
+        return self._slots
+
+    async def acquire(self, timeout: float | None = None) -> None:
+        """
+        Wait for a free slot.
+
+        Raises:
+            asyncio.TimeoutError: No slot was freed within ``timeout`` seconds
+        """
+        slots = self.slots()
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=timeout)
+        finally:
+            self._waiting -= 1
+            self._total_wait_seconds += time.perf_counter() - started
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the executor in an acquired slot, then release the slot."""
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor(), fn, *args)
+        finally:
+            self._total_run_seconds += time.perf_counter() - started
+            self._in_flight -= 1
+            self._completed += 1
+            self.slots().release()
+
+    def metrics(self) -> dict:
+        """
+        Snapshot of the pool's load.
+
+        Returns:
+            Dictionary with the current load and lifetime totals
+        """
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "peak_in_flight": self._peak_in_flight,
+            "completed": self._completed,
+            "avg_wait_ms": round(self._total_wait_seconds * 1000 / max(1, self._completed), 3),
+            "avg_run_ms": round(self._total_run_seconds * 1000 / max(1, self._completed), 3),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the executor, waiting for running jobs to finish; the next job starts a new one."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=True)
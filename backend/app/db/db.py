@@ -1,17 +1,145 @@
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect, text, make_url
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from app.core.settings import settings
+from app.db.instrumentation import instrument_engine
 
 from typing import AsyncGenerator
 from loguru import logger
 
-engine = create_async_engine(
-    url=settings.DATABASE_URL, echo=settings.DEBUG, future=True)
+# PRAGMA name -> setting; a setting of None keeps SQLite's default.
+# busy_timeout comes first so the journal mode switch waits for other connections.
+SQLITE_PRAGMAS = {
+    "busy_timeout": "SQLITE_BUSY_TIMEOUT_MS",
+    "journal_mode": "SQLITE_JOURNAL_MODE",
+    "synchronous": "SQLITE_SYNCHRONOUS",
+    "cache_size": "SQLITE_CACHE_SIZE",
+    "mmap_size": "SQLITE_MMAP_SIZE",
+    "temp_store": "SQLITE_TEMP_STORE",
+}
+
+
+def sqlite_pragmas() -> list[str]:
+    """PRAGMA statements of the SQLite connection profile configured in the settings."""
+    pragmas = []
+    for pragma, setting in SQLITE_PRAGMAS.items():
+        value = getattr(settings, setting)
+        if value is not None:
+            pragmas.append(f"PRAGMA {pragma} = {value}")
+    return pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Connect event: run the profile once on every new DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def set_query_only(dbapi_connection, connection_record):
+    """Connect event: refuse writes on a read-only SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only = ON")
+    finally:
+        cursor.close()
+
+
+def is_memory_db(url: str) -> bool:
+    database_url = make_url(url)
+    return database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:")
+
+
+def create_db_engine(url: str, read_only: bool = False, pool_size: int | None = None) -> AsyncEngine:
+    """
+    Create the async engine for a database URL.
+
+    Every engine is instrumented (app.db.instrumentation). SQLite connections
+    get the PRAGMA profile from the settings. A file
+    database uses a queue pool sized by DATABASE_POOL_SIZE; aiosqlite runs each
+    connection in its own thread, and SQLite has a single writer whatever the
+    pool size, so extra connections only help concurrent readers (in WAL mode).
+    In-memory databases keep their single shared connection.
+
+    Args:
+        url: SQLAlchemy database URL
+        read_only: Set query_only on SQLite connections, so writes fail
+        pool_size: Connections kept open, DATABASE_POOL_SIZE by default
+
+    Returns:
+        The configured engine
+    """
+    engine_args = {}
+    if not is_memory_db(url):
+        engine_args = {
+            "pool_size": pool_size or settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        }
+    new_engine = create_async_engine(url=url, echo=settings.DEBUG, future=True, **engine_args)
+    instrument_engine(new_engine)
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", apply_sqlite_pragmas)
+        if read_only:
+            event.listen(new_engine.sync_engine, "connect", set_query_only)
+    return new_engine
+
+
+def create_read_engine(url: str | None = None) -> AsyncEngine:
+    """
+    Engine of the read-only endpoints, with its own pool so reads never wait
+    for connections held by writes.
+
+    Without a replica URL, opens the primary SQLite file a second time with
+    query_only connections; in WAL mode they read the last committed state
+    without blocking or being blocked by the writer. An in-memory database
+    exists only in its own connection, so it is shared with the primary.
+
+    Args:
+        url: Replica URL (READ_DATABASE_URL); None reads the primary
+
+    Returns:
+        The read engine
+    """
+    if url:
+        return create_db_engine(url, read_only=True, pool_size=settings.READ_DATABASE_POOL_SIZE)
+    if is_memory_db(settings.DATABASE_URL):
+        return engine
+    return create_db_engine(settings.DATABASE_URL, read_only=True, pool_size=settings.READ_DATABASE_POOL_SIZE)
+
+
+engine = create_db_engine(settings.DATABASE_URL)
+read_engine = create_read_engine(settings.READ_DATABASE_URL)
 
 Base = declarative_base()
 
+def add_missing_columns(sync_conn):
+    """
+    Add columns and indexes introduced after a table was created.
+
+    New columns must be nullable or have a server default.
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            logger.info(f"Adding missing column {table.name}.{column.name}")
+            column_ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                logger.info(f"Creating missing index {index.name}")
+                index.create(sync_conn)
+
+
 async def create_db():
     try:
         async with engine.begin() as conn:
@@ -24,6 +152,18 @@ async def create_db():
                 logger.info("Database and tables created.")
             else:
                 logger.info("Database already exists.")
+                missing_tables = [
+                    table for table in Base.metadata.sorted_tables
+                    if table.name not in existing_tables
+                ]
+                if missing_tables:
+                    logger.info(f"Creating missing tables: {', '.join(t.name for t in missing_tables)}")
+                    await conn.run_sync(Base.metadata.create_all, tables=missing_tables)
+                await conn.run_sync(add_missing_columns)
+                # Not part of the metadata, so create_all does not see it
+                from app.models.task import ensure_task_autoincrement, ensure_task_fts
+                await conn.run_sync(ensure_task_fts)
+                await conn.run_sync(ensure_task_autoincrement)
     except OperationalError as e:
         logger.error(f"Error occurred while creating the database: {e}")
         raise
@@ -40,6 +180,20 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+AsyncReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    autocommit=False,
+)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as db:
         yield db
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session of the read engine, for endpoints that never write."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,92 @@
+"""
+SQL Instrumentation
+
+Cursor events on every engine count the statements a request issues and the
+time spent in the database. Figures accumulate in the QueryStats of the
+current context: ServerTimingMiddleware (app.core.server_timing) opens one per
+request and reports it in the Server-Timing header, so a regression such as an
+N+1 loop shows up as a jump in a route's statement count.
+
+Independently of any request, a statement slower than SQL_SLOW_QUERY_MS is
+logged with its normalized SQL (literals replaced by ?), so identical queries
+group together in the logs whatever their parameters.
+"""
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.settings import settings
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    slowest: float = 0.0
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """One-line SQL with literals as ? and placeholder lists collapsed to (?, ...)."""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(?, ...)", statement)
+
+
+def start_query_stats() -> tuple[QueryStats, object]:
+    """Collect the statements of the current context; returns the stats and the token to reset."""
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def stop_query_stats(token) -> None:
+    _query_stats.reset(token)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.slowest = max(stats.slowest, elapsed)
+    if settings.SQL_SLOW_QUERY_MS is not None and elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {normalize_sql(statement)}")
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach the statement counters and the slow-query log to an engine."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -1,14 +1,37 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.models.task import Task
-from sqlalchemy import update, delete
+from app.models.task import Task, TaskTombstone
+from app.db.task_stats import record_task_write, next_task_version
+from app.db.user import filter_task_dates
+from app.core.response_cache import response_cache
+from app.core.task_events import TaskEvent, task_events
+from sqlalchemy import update, delete, insert, bindparam, text, func, tuple_, type_coerce, Date, Row
 from sqlalchemy.future import select
-from app.api.schema.task import TaskPost
+from app.api.schema.task import TaskPost, TaskPut
 from loguru import logger
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Sequence
 from datetime import date
 
 
+def task_payload(task_id: int, task: str, task_date: date) -> dict:
+    return {"id": task_id, "task": task, "date": task_date.isoformat()}
+
+
+async def after_task_write(user_id: int, version: int, event_type: str, tasks: List[dict]) -> None:
+    """Run once a write to the user's tasks is committed: drop cached pages and publish the change."""
+    response_cache.invalidate_user(user_id)
+    await task_events.publish(user_id, TaskEvent(id=version, type=event_type, tasks=tasks))
+
+
+async def add_tombstones(db: AsyncSession, user_id: int, task_ids: List[int]) -> None:
+    """Record deleted tasks for delta sync, in the deleting transaction."""
+    change_seq = next_task_version(user_id)
+    # Task ids are never reused (AUTOINCREMENT), so each id is deleted at most once
+    await db.execute(insert(TaskTombstone).values(
+        [{"task_id": task_id, "user_id": user_id, "change_seq": change_seq} for task_id in task_ids]
+    ))
+
+
 async def get_task(db: AsyncSession, task_id: int) -> Optional[Task]:
     result = await db.execute(select(Task).filter(Task.id == task_id))
     return result.scalars().first()
@@ -20,9 +43,13 @@ async def add_task(db: AsyncSession, user_id: int, task_desc: str, task_date: da
         user = selected_user.scalars().first()
         if user is None:
             raise ValueError("User not found")
-        new_task = Task(task=task_desc, date=task_date, user_id=user.id)
+        new_task = Task(task=task_desc, date=task_date, user_id=user.id, change_seq=next_task_version(user.id))
         db.add(new_task)
+        await db.flush()
+        version = await record_task_write(db, user.id, 1)
+        payload = [task_payload(new_task.id, task_desc, task_date)]
         await db.commit()
+        await after_task_write(user_id, version, "created", payload)
         await db.refresh(new_task)
         return new_task
     except Exception as e:
@@ -31,20 +58,284 @@ async def add_task(db: AsyncSession, user_id: int, task_desc: str, task_date: da
         raise
 
 
-async def put_task(db: AsyncSession, task_id: int, task: TaskPost) -> bool:
-    task_db = await get_task(db, task_id)
+async def stream_tasks(db: AsyncSession, user_id: int, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+    """
+    Stream every task of a user as (id, task, date) rows, ordered by date then id.
+
+    Rows come from a server-side cursor over idx_tasks_user_date and are
+    yielded ``batch_size`` at a time, so memory does not grow with the number
+    of tasks.
+    """
+    result = await db.stream(
+        select(Task.id, Task.task, Task.date)
+        .where(Task.user_id == user_id)
+        .order_by(Task.date, Task.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for rows in result.partitions():
+        yield rows
+
+
+async def search_tasks(db: AsyncSession, user_id: int, terms: str, skip: int = 0, limit: int = 10) -> tuple[int, List[Row]]:
+    """
+    Full-text search of a user's tasks through the tasks_fts index.
+
+    Both the words and the owner are matched in the index, and only the
+    requested page is joined back to tasks.
+
+    Args:
+        terms: FTS5 expression for the task text (see app.utils.search.to_fts_query)
+
+    Returns:
+        Total number of matches, and the requested page of (id, task, date)
+        rows ordered by bm25 relevance of the task text
+    """
+    match = f'user_id:"{int(user_id)}" AND task:({terms})'
+    total = await db.scalar(text("SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH :match"), {"match": match})
+    if not total:
+        return 0, []
+    result = await db.execute(text(
+        "SELECT tasks.id, tasks.task, tasks.date FROM ("
+        "  SELECT rowid, bm25(tasks_fts, 1.0, 0.0) AS score FROM tasks_fts WHERE tasks_fts MATCH :match"
+        "  ORDER BY score, rowid LIMIT :limit OFFSET :skip"
+        ") AS hits CROSS JOIN tasks ON tasks.id = hits.rowid ORDER BY hits.score, hits.rowid"
+    ).columns(Task.id, Task.task, Task.date), {"match": match, "limit": limit, "skip": skip})
+    return total, result.all()
+
+
+# SQLite date() expressions giving the first day of the bucket of Task.date
+CALENDAR_BUCKETS = {
+    "day": lambda column: column,
+    # Forward to Sunday (no-op on Sundays), then back to that week's Monday
+    "week": lambda column: func.date(column, "weekday 0", "-6 days"),
+    "month": lambda column: func.date(column, "start of month"),
+}
+
+
+async def get_task_calendar(
+    db: AsyncSession,
+    user_id: int,
+    granularity: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> List[Row]:
+    """
+    Count a user's tasks per day, ISO week (starting Monday) or month.
+
+    One GROUP BY over idx_tasks_user_date, which covers the query: task
+    rows themselves are never read.
+
+    Returns:
+        (start, count) rows ordered by start, for non-empty buckets only
+    """
+    start = type_coerce(CALENDAR_BUCKETS[granularity](Task.date), Date).label("start")
+    query = select(start, func.count().label("count")).where(Task.user_id == user_id)
+    query = filter_task_dates(query, date_from, date_to)
+    result = await db.execute(query.group_by(start).order_by(start))
+    return result.all()
+
+
+async def get_task_changes(
+    db: AsyncSession,
+    user_id: int,
+    since: int,
+    after: Optional[tuple[int, int]] = None,
+    limit: int = 500,
+) -> tuple[List[Row], List[Row], Optional[tuple[int, int]]]:
+    """
+    Tasks written and deleted after version ``since``, in (change_seq, id) order.
+
+    Both tables are read with keyset seeks on their (user_id, change_seq)
+    index, so the cost depends on the number of changes, not of tasks.
+
+    Args:
+        since: Collection version of the client's last completed sync (0 for
+            a full sync; tasks written before change tracking have
+            change_seq 0 and are only returned then)
+        after: (change_seq, id) position returned for the previous page
+        limit: Maximum number of changes (writes and deletions together)
+
+    Returns:
+        (id, task, date, change_seq) rows of written tasks, (task_id,
+        change_seq) rows of deleted ones, and the position to pass as
+        ``after`` for the next page (None on the last page)
+    """
+    def page(query, seq_column, id_column):
+        if since:
+            query = query.where(seq_column > since)
+        if after is not None:
+            query = query.where(tuple_(seq_column, id_column) > tuple_(*after))
+        return query.order_by(seq_column, id_column).limit(limit + 1)
+
+    changed = (await db.execute(page(
+        select(Task.id, Task.task, Task.date, Task.change_seq).where(Task.user_id == user_id),
+        Task.change_seq, Task.id,
+    ))).all()
+    deleted = (await db.execute(page(
+        select(TaskTombstone.task_id, TaskTombstone.change_seq).where(TaskTombstone.user_id == user_id),
+        TaskTombstone.change_seq, TaskTombstone.task_id,
+    ))).all()
+
+    # Merge both keyset streams; an extra change means another page exists
+    merged = sorted(
+        [(row.change_seq, row.id, True) for row in changed] + [(row.change_seq, row.task_id, False) for row in deleted]
+    )
+    if len(merged) <= limit:
+        return changed, deleted, None
+    last_seq, last_id, _ = merged[limit - 1]
+    position = (last_seq, last_id)
+    return (
+        [row for row in changed if (row.change_seq, row.id) <= position],
+        [row for row in deleted if (row.change_seq, row.task_id) <= position],
+        position,
+    )
+
+
+async def get_task_owner(db: AsyncSession, task_id: int) -> Optional[int]:
+    """User id owning a task, or None if the task does not exist."""
+    return await db.scalar(select(Task.user_id).where(Task.id == task_id))
 
-    await db.execute(
+
+async def put_task(db: AsyncSession, user_id: int, task_id: int, task: TaskPost) -> Optional[Row]:
+    """
+    Update a task owned by ``user_id`` with a single UPDATE ... RETURNING.
+
+    Returns:
+        The updated (id, task, date) row, or None if no task with this id
+        belongs to the user
+    """
+    result = await db.execute(
         update(Task)
-        .where(Task.id == task_id)
-        .values(task=task.desc, date=task.date)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(task=task.desc, date=task.date, change_seq=next_task_version(user_id))
+        .returning(Task.id, Task.task, Task.date)
     )
+    row = result.first()
+    if row is None:
+        return None
+    version = await record_task_write(db, user_id)
     await db.commit()
-    await db.refresh(task_db)
-    return task_db
+    await after_task_write(user_id, version, "updated", [task_payload(*row)])
+    return row
 
 
-async def delete_task(db: AsyncSession, task_id: int) -> bool:
-    await db.execute(delete(Task).where(Task.id == task_id))
+async def delete_task(db: AsyncSession, user_id: int, task_id: int) -> Optional[Row]:
+    """
+    Delete a task owned by ``user_id`` with a single DELETE ... RETURNING.
+
+    Returns:
+        The deleted (id, task, date) row, or None if no task with this id
+        belongs to the user
+    """
+    result = await db.execute(
+        delete(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .returning(Task.id, Task.task, Task.date)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    await add_tombstones(db, user_id, [row.id])
+    version = await record_task_write(db, user_id, -1)
     await db.commit()
-    return True
+    await after_task_write(user_id, version, "deleted", [{"id": row.id}])
+    return row
+
+
+async def get_task_owners(db: AsyncSession, task_ids: List[int]) -> dict[int, int]:
+    """Map each existing task id to its owner's user id, in one query."""
+    result = await db.execute(select(Task.id, Task.user_id).where(Task.id.in_(task_ids)))
+    return {task_id: owner_id for task_id, owner_id in result.all()}
+
+
+async def add_tasks(db: AsyncSession, user_id: int, tasks: List[TaskPost]) -> List[Row]:
+    """
+    Insert many tasks for a user in one transaction.
+
+    Rows are written with multi-row INSERT ... RETURNING statements.
+
+    Returns:
+        The created (id, task, date) rows, in request order
+    """
+    try:
+        # Plain rows, not entities: the commit would expire those before the caller reads them
+        result = await db.execute(
+            insert(Task)
+            .values(change_seq=next_task_version(user_id))
+            .returning(Task.id, Task.task, Task.date, sort_by_parameter_order=True),
+            [{"task": task.desc, "date": task.date, "user_id": user_id} for task in tasks],
+        )
+        new_tasks = result.all()
+        version = await record_task_write(db, user_id, len(new_tasks))
+        await db.commit()
+        await after_task_write(user_id, version, "created", [task_payload(*row) for row in new_tasks])
+        return new_tasks
+    except Exception as e:
+        logger.error(f"Failed to add {len(tasks)} tasks for user_id {user_id}: {e}")
+        await db.rollback()
+        raise
+
+
+async def put_tasks(db: AsyncSession, user_id: int, tasks: List[TaskPut]) -> List[Row]:
+    """
+    Update many tasks of a user in one transaction with a single executemany.
+
+    Rows not owned by ``user_id`` are left untouched.
+
+    Returns:
+        The updated (id, task, date) rows; tasks deleted since the caller
+        checked them are missing
+    """
+    try:
+        await db.execute(
+            update(Task.__table__)
+            .where(Task.__table__.c.id == bindparam("b_id"), Task.__table__.c.user_id == user_id)
+            .values(task=bindparam("b_task"), date=bindparam("b_date"), change_seq=next_task_version(user_id)),
+            [{"b_id": task.id, "b_task": task.desc, "b_date": task.date} for task in tasks],
+        )
+        # No RETURNING with executemany: the rows just written carry the next version
+        updated = (await db.execute(
+            select(Task.id, Task.task, Task.date).where(
+                Task.user_id == user_id,
+                Task.id.in_([task.id for task in tasks]),
+                Task.change_seq == next_task_version(user_id),
+            )
+        )).all()
+        if not updated:
+            return []
+        version = await record_task_write(db, user_id)
+        await db.commit()
+        await after_task_write(user_id, version, "updated", [task_payload(*row) for row in updated])
+        return updated
+    except Exception as e:
+        logger.error(f"Failed to update {len(tasks)} tasks for user_id {user_id}: {e}")
+        await db.rollback()
+        raise
+
+
+async def delete_tasks(db: AsyncSession, user_id: int, task_ids: List[int]) -> List[int]:
+    """
+    Delete many tasks of a user in one statement.
+
+    Returns:
+        Ids that were actually deleted
+    """
+    try:
+        result = await db.execute(
+            delete(Task)
+            .where(Task.id.in_(task_ids), Task.user_id == user_id)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.scalars().all()
+        if not deleted:
+            return []
+        await add_tombstones(db, user_id, deleted)
+        version = await record_task_write(db, user_id, -len(deleted))
+        await db.commit()
+        await after_task_write(user_id, version, "deleted", [{"id": task_id} for task_id in deleted])
+        return deleted
+    except Exception as e:
+        logger.error(f"Failed to delete {len(task_ids)} tasks for user_id {user_id}: {e}")
+        await db.rollback()
+        raise
@@ -0,0 +1,169 @@
+"""
+Per-user task counters and collection versions.
+
+Every write path that touches a user's tasks records it here in the same
+transaction: the task counter is adjusted, so reading the total is a
+primary-key lookup instead of a COUNT(*) over the user's tasks, and the
+collection version is bumped, which backs the ETags of the task routes.
+
+Verify or repair counters from the command line:
+    python -m app.db.task_stats verify
+    python -m app.db.task_stats repair
+"""
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.task import Task
+from app.models.task_stats import UserTaskStats
+from app.models.user import User
+from typing import List
+
+
+def _count_tasks(user_id: int):
+    return select(func.count(Task.id)).where(Task.user_id == user_id)
+
+
+def next_task_version(user_id: int):
+    """
+    SQL expression for the version the next record_task_write will set.
+
+    Rows written in the same transaction store it as their change_seq, so it
+    equals the collection version after the write without an extra query.
+    """
+    current = select(UserTaskStats.version).where(UserTaskStats.user_id == user_id).scalar_subquery()
+    return func.coalesce(current, 0) + 1
+
+
+async def get_tombstone_floor(db: AsyncSession, user_id: int) -> int:
+    """Highest change_seq whose tombstones were purged; delta syncs from before it must start over."""
+    floor = await db.scalar(select(UserTaskStats.tombstone_floor).where(UserTaskStats.user_id == user_id))
+    return floor or 0
+
+
+async def record_task_write(db: AsyncSession, user_id: int, delta: int = 0) -> int:
+    """
+    Record a write to a user's tasks inside the caller's transaction.
+
+    Bumps the collection version and applies the task count change. The task
+    rows must already be flushed: if the user has no stats row yet, the
+    counter is seeded from the real count, which already includes this change.
+
+    Args:
+        db: Database session
+        user_id: Owner of the written tasks
+        delta: Number of tasks added (positive) or removed (negative)
+
+    Returns:
+        The new collection version
+    """
+    stmt = sqlite_insert(UserTaskStats).values(
+        user_id=user_id,
+        task_count=_count_tasks(user_id).scalar_subquery(),
+        version=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserTaskStats.user_id],
+        set_={
+            "task_count": UserTaskStats.task_count + delta,
+            "version": UserTaskStats.version + 1,
+        },
+    ).returning(UserTaskStats.version)
+    return await db.scalar(stmt)
+
+
+async def get_task_version(db: AsyncSession, user_id: int) -> int:
+    """Current collection version of a user's tasks (0 before the first write)."""
+    version = await db.scalar(select(UserTaskStats.version).where(UserTaskStats.user_id == user_id))
+    return version or 0
+
+
+async def get_task_count(db: AsyncSession, user_id: int) -> int:
+    """
+    Get the total number of tasks of a user from its counter.
+
+    Falls back to COUNT(*) for users whose counter has not been seeded yet.
+    """
+    count = await db.scalar(select(UserTaskStats.task_count).where(UserTaskStats.user_id == user_id))
+    if count is None:
+        count = await db.scalar(_count_tasks(user_id))
+    return count or 0
+
+
+def _actual_counts():
+    return (
+        select(User.id.label("user_id"), func.count(Task.id).label("task_count"))
+        .outerjoin(Task, Task.user_id == User.id)
+        .group_by(User.id)
+    )
+
+
+async def verify_task_counts(db: AsyncSession) -> List[tuple[int, int | None, int]]:
+    """
+    Compare stored counters with the real task counts.
+
+    Returns:
+        List of (user_id, stored_count, actual_count) for every mismatch;
+        stored_count is None when the user has no counter row
+    """
+    actual = _actual_counts().subquery()
+    result = await db.execute(
+        select(actual.c.user_id, UserTaskStats.task_count, actual.c.task_count)
+        .outerjoin(UserTaskStats, UserTaskStats.user_id == actual.c.user_id)
+        .where(func.coalesce(UserTaskStats.task_count, -1) != actual.c.task_count)
+        .order_by(actual.c.user_id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def repair_task_counts(db: AsyncSession) -> int:
+    """
+    Rebuild every counter from the tasks table in one transaction.
+
+    Versions are bumped rather than reset, so ETags handed out before the
+    repair can never match again.
+
+    Returns:
+        Number of counters written
+    """
+    await db.execute(delete(UserTaskStats).where(UserTaskStats.user_id.not_in(select(User.id))))
+    stmt = sqlite_insert(UserTaskStats).from_select(["user_id", "task_count"], _actual_counts())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserTaskStats.user_id],
+        set_={
+            "task_count": stmt.excluded.task_count,
+            "version": UserTaskStats.version + 1,
+        },
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    from app.db.db import AsyncSessionLocal, engine
+    import app.models.refresh_tokens  # noqa: F401  (needed to configure User relationships)
+
+    async def run(command: str) -> int:
+        async with AsyncSessionLocal() as db:
+            if command == "verify":
+                mismatches = await verify_task_counts(db)
+                for user_id, stored, actual in mismatches:
+                    print(f"user_id={user_id} stored={stored} actual={actual}")
+                print(f"{len(mismatches)} mismatched counter(s)")
+                return 1 if mismatches else 0
+            if command == "repair":
+                written = await repair_task_counts(db)
+                print(f"Rebuilt {written} counter(s)")
+                return 0
+        print("Usage: python -m app.db.task_stats [verify|repair]")
+        return 2
+
+    async def main(command: str) -> int:
+        try:
+            return await run(command)
+        finally:
+            await engine.dispose()
+
+    sys.exit(asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "")))
@@ -1,11 +1,15 @@
 from app.models.user import User
 from app.models.task import Task
+from app.db.task_stats import get_task_count
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import update, delete, func
+from sqlalchemy import update, delete, func, tuple_, Row
 from sqlalchemy.future import select
 from loguru import logger
 from typing import List
+from datetime import date
 from app.api.schema.auth import User as UserSchema, UserInDB
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import response_cache
 
 
 async def add_user(db: AsyncSession, username: str, hashed_password: str) -> User:
@@ -21,6 +25,11 @@ async def get_user(db: AsyncSession, user_id: int) -> User | None:
     return result.scalars().first()
 
 
+async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
+    result = await db.execute(select(User).filter(User.username == username))
+    return result.scalars().first()
+
+
 async def get_username(db: AsyncSession, username: str) -> UserInDB | None:
     result = await db.execute(select(User).filter(User.username == username))
     user_db = result.scalars().first()
@@ -32,13 +41,15 @@ async def get_username(db: AsyncSession, username: str) -> UserInDB | None:
 
 async def put_user_pw(db: AsyncSession, user_id: int, pw: str) -> bool:
     try:
-        db_user = get_user(db, user_id)
+        db_user = await get_user(db, user_id)
 
         if db_user:
+            username = db_user.username  # Expired by the commit
             await db.execute(
-                update(User).where(User.id == user_id).values(password=pw)
+                update(User).where(User.id == user_id).values(hashed_password=pw)
             )
             await db.commit()
+            principal_cache.invalidate(username)
             return True
         else:
             return False
@@ -47,12 +58,37 @@ async def put_user_pw(db: AsyncSession, user_id: int, pw: str) -> bool:
         return False
 
 
+async def put_user_role(db: AsyncSession, user_id: int, role: str) -> bool:
+    db_user = await get_user(db, user_id)
+    if not db_user:
+        return False
+    username = db_user.username  # Expired by the commit
+    await db.execute(update(User).where(User.id == user_id).values(role=role))
+    await db.commit()
+    principal_cache.invalidate(username)
+    return True
+
+
+async def put_user_disabled(db: AsyncSession, user_id: int, disabled: bool) -> bool:
+    db_user = await get_user(db, user_id)
+    if not db_user:
+        return False
+    username = db_user.username  # Expired by the commit
+    await db.execute(update(User).where(User.id == user_id).values(disabled=disabled))
+    await db.commit()
+    principal_cache.invalidate(username)
+    return True
+
+
 async def delete_user(db: AsyncSession, user_id: int):
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if db_user:
+        username = db_user.username  # Expired by the commit
         try:
             await db.execute(delete(User).where(User.id == user_id))
             await db.commit()
+            principal_cache.invalidate(username)
+            response_cache.invalidate_user(user_id)
             return True
         except Exception as e:
             return False
@@ -60,45 +96,77 @@ async def delete_user(db: AsyncSession, user_id: int):
         return False
 
 
-async def get_tasks(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 10) -> List[Task]:
+def filter_task_dates(query, date_from: date | None, date_to: date | None):
+    """Restrict a task query to a date range; with user_id it is a range seek on idx_tasks_user_date."""
+    if date_from is not None:
+        query = query.filter(Task.date >= date_from)
+    if date_to is not None:
+        query = query.filter(Task.date <= date_to)
+    return query
+
+
+async def get_tasks(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 10,
+    after: tuple[date, int] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> List[Row]:
     """
-    Get paginated tasks for a user, ordered by date ascending.
+    Get paginated tasks for a user, ordered by date then id ascending.
 
     Args:
         db: Database session
         user_id: User ID to filter tasks
-        skip: Number of records to skip (offset)
+        skip: Number of records to skip (offset), ignored when ``after`` is given
         limit: Maximum number of records to return
+        after: Keyset position (date, id); only tasks strictly after it are
+            returned, seeking on idx_tasks_user_date instead of scanning skipped rows
+        date_from: Only tasks on or after this date
+        date_to: Only tasks on or before this date
 
     Returns:
-        List of Task objects
+        List of (id, task, date) rows; plain rows skip loading ORM objects
     """
-    result = await db.execute(
-        select(Task)
+    query = (
+        select(Task.id, Task.task, Task.date)
         .filter(Task.user_id == user_id)
-        .order_by(Task.date.asc())
-        .offset(skip)
+        .order_by(Task.date.asc(), Task.id.asc())
         .limit(limit)
     )
-    return result.scalars().all()
+    query = filter_task_dates(query, date_from, date_to)
+    if after is not None:
+        query = query.filter(tuple_(Task.date, Task.id) > tuple_(*after))
+    else:
+        query = query.offset(skip)
 
+    result = await db.execute(query)
+    return result.all()
 
-async def get_tasks_count(db: AsyncSession, user_id: int) -> int:
+
+async def get_tasks_count(db: AsyncSession, user_id: int, date_from: date | None = None, date_to: date | None = None) -> int:
     """
     Get total count of tasks for a user.
 
+    Without a date range, reads the maintained per-user counter (see
+    app.db.task_stats) instead of counting the user's rows. With one, counts
+    the range on idx_tasks_user_date, which covers the query.
+
     Args:
         db: Database session
         user_id: User ID to filter tasks
+        date_from: Only count tasks on or after this date
+        date_to: Only count tasks on or before this date
 
     Returns:
         Total number of tasks
     """
-    result = await db.execute(
-        select(func.count(Task.id))
-        .filter(Task.user_id == user_id)
-    )
-    return result.scalar() or 0
+    if date_from is None and date_to is None:
+        return await get_task_count(db, user_id)
+    query = filter_task_dates(select(func.count()).select_from(Task).filter(Task.user_id == user_id), date_from, date_to)
+    return await db.scalar(query)
 
 async def get_users(db: AsyncSession) -> List[User]:
     result = await db.execute(select(User))
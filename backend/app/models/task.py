@@ -1,16 +1,106 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, event
 from app.db.db import Base
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 
 
 class Task(Base):
     __tablename__ = "tasks"
     __table_args__ = (
         Index('idx_tasks_user_date', 'user_id', 'date'),  # Composite index for pagination queries
+        Index('idx_tasks_user_change_seq', 'user_id', 'change_seq'),  # For delta sync
+        # Ids are never reused: a new task must not take over a deleted one's tombstone
+        {"sqlite_autoincrement": True},
     )
 
     id = Column(Integer, primary_key=True, index=True)
     task = Column(String, nullable=False)
     date = Column(Date, nullable=False, index=True)  # Index for date sorting
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Index for user filtering
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")  # User's collection version at the last write
     user = relationship("User", back_populates="tasks")
+
+
+class TaskTombstone(Base):
+    """Record of a deleted task, so delta sync can report the deletion."""
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index('idx_task_tombstones_user_change_seq', 'user_id', 'change_seq'),  # For delta sync
+    )
+
+    task_id = Column(Integer, primary_key=True)  # Id of the deleted task
+    user_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False)  # User's collection version at the deletion
+    deleted_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+# Full-text index over Task.task. It is an external-content FTS5 table: it
+# stores only the index and reads the text from tasks, and the triggers keep
+# it in sync on every insert, update and delete, whatever the code path.
+# user_id is indexed too, so a search scoped to one user is resolved entirely
+# inside the index instead of matching every user's tasks and filtering.
+TASK_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "task, user_id, content='tasks', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, task, user_id) VALUES (new.id, new.task, new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, task, user_id) VALUES ('delete', old.id, old.task, old.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF task, user_id ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, task, user_id) VALUES ('delete', old.id, old.task, old.user_id); "
+    "INSERT INTO tasks_fts(rowid, task, user_id) VALUES (new.id, new.task, new.user_id); END",
+]
+
+
+def ensure_task_fts(connection) -> None:
+    """Create the task full-text index if missing, indexing existing tasks."""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+    ).first()
+    for statement in TASK_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if not exists:
+        connection.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def ensure_task_autoincrement(connection) -> None:
+    """
+    Rebuild a tasks table created without AUTOINCREMENT.
+
+    Without it SQLite gives the id of a deleted newest task to the next one.
+    The rows are copied with their ids, and the id counter starts after every
+    id already used, deleted ones included.
+    """
+    ddl = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+    ).scalar()
+    if ddl is None or "AUTOINCREMENT" in ddl.upper():
+        return
+    for trigger in ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update"):
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    for index in Task.__table__.indexes:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    connection.exec_driver_sql("ALTER TABLE tasks RENAME TO tasks_old")
+    # Also recreates the indexes and the full-text triggers
+    Task.__table__.create(connection)
+    connection.exec_driver_sql(
+        "INSERT INTO tasks (id, task, date, user_id, change_seq) "
+        "SELECT id, task, date, user_id, change_seq FROM tasks_old"
+    )
+    connection.exec_driver_sql("DROP TABLE tasks_old")
+    connection.exec_driver_sql(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', 0 "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'tasks')"
+    )
+    connection.exec_driver_sql(
+        "UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT COALESCE(MAX(task_id), 0) FROM task_tombstones)) "
+        "WHERE name = 'tasks'"
+    )
+    # The copy went through the insert trigger of an index that already had the rows
+    connection.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+@event.listens_for(Task.__table__, "after_create")
+def _create_task_fts(target, connection, **kw):
+    ensure_task_fts(connection)
@@ -0,0 +1,22 @@
+"""
+Task Event Model
+
+Outbox of task change events shared between workers by the database task
+event backend.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.db.db import Base
+from datetime import datetime, timezone
+
+
+class TaskEventRecord(Base):
+    __tablename__ = "task_events"
+    # Ids are never reused, even once the newest rows are purged, so pollers can resume after the last one seen
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)  # Commit order: SQLite has a single writer
+    user_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)  # TaskEvent.id, the user's collection version
+    type = Column(String, nullable=False)
+    tasks = Column(Text, nullable=False)  # JSON list of task payloads
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)  # For the retention purge
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.db.db import Base
+
+
+class UserTaskStats(Base):
+    """Per-user task counters and collection version maintained alongside writes to tasks."""
+    __tablename__ = "user_task_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)  # Kept in sync with COUNT(tasks) per user
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every write to the user's tasks
+    tombstone_floor = Column(Integer, nullable=False, default=0, server_default="0")  # Highest change_seq of purged tombstones
@@ -3,39 +3,37 @@ from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import HTTPException, Depends, status, Request
 from app.db.user import get_username
-from app.db.db import get_session
+from app.db.db import get_read_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Annotated
 from app.core.settings import settings
-from app.api.schema.auth import TokenData, User
-from app.core.security import verify_password, create_access_token as security_create_access_token
+from app.api.schema.auth import TokenData, User, UserInDB
+from app.core.security import create_access_token as security_create_access_token
+from app.core.principal_cache import principal_cache
 from loguru import logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
 
 
-async def authenticate_user(db: AsyncSession, username: str, password: str):
-    """Authenticate user with username and password."""
-    user = await get_username(db, username)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    if not verify_password(password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect password"
-        )
-    return user
-
-
 def create_access_token(data: dict, expires_delta: timedelta) -> str:
     """Create JWT access token using the security module."""
     return security_create_access_token(data, expires_delta)
 
 
+async def get_principal(db: AsyncSession, username: str) -> UserInDB | None:
+    """Resolve a username to a user, going through the principal cache."""
+    user = principal_cache.get(username)
+    if user is not None:
+        return user
+
+    generation = principal_cache.generation()
+    user = await get_username(db, username)
+    if user is not None:
+        principal_cache.set(username, user, generation=generation)
+    return user
+
+
 def decode_jwt(token: str | bytes) -> dict:
     """Decode and validate JWT token."""
     try:
@@ -55,7 +53,7 @@ def decode_jwt(token: str | bytes) -> dict:
 async def get_current_user(
     request: Request,
     token: Annotated[str | None, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_session)]
+    db: Annotated[AsyncSession, Depends(get_read_session)]
 ):
     """
     Get current user from JWT token.
@@ -87,7 +85,7 @@ async def get_current_user(
         logger.debug(f"Token validation failed: {e}")
         raise credentials_exception
 
-    user = await get_username(db, username=token_data.username)
+    user = await get_principal(db, token_data.username)
     if user is None:
         raise credentials_exception
     return user
@@ -95,7 +93,7 @@ async def get_current_user(
 
 async def get_admin_user(request: Request,
                          token: Annotated[str | None, Depends(oauth2_scheme)],
-                         db: Annotated[AsyncSession, Depends(get_session)]):
+                         db: Annotated[AsyncSession, Depends(get_read_session)]):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -118,7 +116,7 @@ async def get_admin_user(request: Request,
         logger.debug(f"Token validation failed: {e}")
         raise credentials_exception
 
-    user = await get_username(db, username=token_data.username)
+    user = await get_principal(db, token_data.username)
     if user is None or user.role != "admin":
         raise credentials_exception
     return user
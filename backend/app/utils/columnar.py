@@ -0,0 +1,506 @@
+import csv
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+
+# Columnar cache of an uploaded CSV or XLSX file, built once in the background
+# so pages are read from memory-mapped NumPy arrays instead of re-parsing
+# text. Stored next to the upload as a <name>.cols directory:
+#
+#   manifest.json      source size and mtime_ns, row count, header row and
+#                      the name, type and slot of every column (and for text
+#                      columns, whether splitting is safe: no value contains
+#                      the separator)
+#   row_lengths.npy    fields of each data row (rows can be ragged)
+#   values.npy         typed columns, one int64 row per column at its slot;
+#                      float columns hold the bits of their float64 values
+#   offsets.npy        text columns, one row per column at its slot of row
+#                      count + 1 uint64 offsets into
+#   text.npy           the UTF-8 values of all text columns, each followed by
+#                      a unit separator (\x1f) so a page is decoded at once
+#                      and split
+#
+# However wide the file, a cache is the same few arrays: every memory map
+# holds a file descriptor, and a file with hundreds of columns must not need
+# hundreds of them.
+#
+# A column is typed only if every value in it is the exact text its number
+# prints back as ("12", "-3", "1.5"; not "007" or "1.50"), so pages read from
+# the cache are identical to a parse of the file. Reading a page slices the arrays
+# of the requested columns: cost depends on the page, not on the file.
+#
+# The cache is stale, and rebuilt, when the file's size or mtime no longer
+# match the manifest. Builds write a temporary directory that replaces the
+# previous cache once complete. The most recently read caches stay mapped
+# between requests, up to a number of mapped files.
+
+CACHE_SUFFIX = ".cols"
+SUPPORTED_SUFFIXES = (".csv", ".xlsx")
+_FORMAT = 2
+_BATCH = 65536  # Rows buffered per column between writes
+_INT = re.compile(r"-?[1-9][0-9]{0,18}|0")
+_TYPES = {"int": np.dtype("<i8"), "float": np.dtype("<f8")}
+_SEPARATOR = "\x1f"
+_ARRAYS = ("row_lengths.npy", "values.npy", "offsets.npy", "text.npy")
+_OPEN_FILES = 64  # Arrays kept mapped between reads, one file descriptor each
+
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+class UnknownColumnError(ValueError):
+    pass
+
+
+def cache_path(path: Path) -> Path:
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _source_stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_manifest(cache: Path) -> dict | None:
+    try:
+        with open(cache / "manifest.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return manifest if manifest.get("format") == _FORMAT else None
+
+
+def _csv_rows(path: Path) -> Iterator[List[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f)
+
+
+def _float_text(value: float) -> str:
+    # Whole numbers without ".0": Excel stores every number as a float
+    return str(int(value)) if value.is_integer() and abs(value) < 2**63 else repr(value)
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return _float_text(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _xlsx_rows(path: Path) -> Iterator[List[str]]:
+    """Rows of the workbook's active sheet as text, without trailing empty cells."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Reading XLSX files requires openpyxl")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            row = [_cell_text(value) for value in values]
+            while row and row[-1] == "":
+                row.pop()
+            yield row
+    finally:
+        workbook.close()
+
+
+def _columns_of(batch: List[List[str]], width: int, fill) -> List[list]:
+    """The first ``width`` columns of a batch of rows, ``fill`` where a row is too short."""
+    if batch and min(map(len, batch)) == width == max(map(len, batch)):
+        return [list(column) for column in zip(*batch)]
+    return [[row[i] if i < len(row) else fill for row in batch] for i in range(width)]
+
+
+class _ColumnStats:
+    """What the first pass learns about one column, a batch of values at a time."""
+
+    def __init__(self):
+        self.int = True
+        self.float = True
+        self.split = True
+        self.text_bytes = 0
+
+    def add(self, values: List[str | None]) -> None:
+        """Values of the batch's rows; None for rows too short to have the column, which do not count."""
+        if None in values:
+            values = [value for value in values if value is not None]
+        joined = "".join(values)
+        self.text_bytes += len(joined) if joined.isascii() else len(joined.encode("utf-8"))
+        if self.split and _SEPARATOR in joined:
+            self.split = False
+        if self.int:
+            self.int = all(map(_INT.fullmatch, values)) and all(-2**63 <= int(value) < 2**63 for value in values if len(value) >= 19)
+        # Whole numbers of up to 15 characters are exact floats: no need to check them
+        if self.float and not (self.int and max(map(len, values), default=0) <= 15):
+            try:
+                self.float = list(map(_float_text, map(float, values))) == values
+            except ValueError:
+                self.float = False
+
+    @property
+    def type(self) -> str:
+        return "int" if self.int else "float" if self.float else "str"
+
+
+def _new_array(path: Path, dtype, shape: tuple[int, ...]) -> np.memmap:
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+
+def _typed_row(values: np.ndarray, kind: str) -> np.ndarray:
+    """A column's row of the typed block, as its own type."""
+    return values if kind == "int" else values.view(_TYPES[kind])
+
+
+class _ColumnWriter:
+    """Fills one column's row of the shared arrays; text columns start at byte ``base`` of the text array."""
+
+    def __init__(self, kind: str, slot: int, values: np.ndarray, offsets: np.ndarray, text: np.ndarray, base: int):
+        self.kind = kind
+        if kind == "str":
+            self.offsets = offsets[slot]
+            self.data = text
+            self.offsets[0] = base
+            self.position = base
+        else:
+            self.values = _typed_row(values[slot], kind)
+
+    def write(self, first: int, values: List[str]) -> None:
+        if self.kind == "str":
+            joined = _SEPARATOR.join(values) + _SEPARATOR
+            encoded = joined.encode("utf-8")
+            if len(encoded) == len(joined):
+                lengths = np.fromiter(map(len, values), dtype="<u8", count=len(values)) + 1
+            else:
+                lengths = np.fromiter((len(value.encode("utf-8")) + 1 for value in values), dtype="<u8", count=len(values))
+            ends = self.position + np.cumsum(lengths)
+            self.offsets[first + 1:first + 1 + len(values)] = ends
+            end = self.position + len(encoded)
+            self.data[self.position:end] = np.frombuffer(encoded, dtype="u1")
+            self.position = end
+        else:
+            parse = int if self.kind == "int" else float
+            # "" only where a row is too short: never read back
+            self.values[first:first + len(values)] = [parse(value) if value else 0 for value in values]
+
+
+def _scan(rows: Iterator[List[str]], spool=None) -> tuple[List[str], List[_ColumnStats], int]:
+    """First pass: header row, column statistics and row count; rows are also written to ``spool``, a csv.writer, if given."""
+    headers = next(rows, [])
+    if spool is not None:
+        spool.writerow(headers)
+    columns: List[_ColumnStats] = []
+    count = 0
+    while batch := list(islice(rows, _BATCH)):
+        if spool is not None:
+            spool.writerows(batch)
+        width = max(map(len, batch))
+        while len(columns) < width:
+            columns.append(_ColumnStats())
+        for stats, values in zip(columns, _columns_of(batch, width, None)):
+            stats.add(values)
+        count += len(batch)
+    while len(columns) < len(headers):
+        columns.append(_ColumnStats())
+    return headers, columns, count
+
+
+def build_columnar_cache(path: Path) -> dict:
+    """
+    Convert a CSV or XLSX file into its columnar cache, replacing any previous one.
+
+    Reads the file twice, row by row: once to count rows and infer column
+    types, then to fill the arrays. XLSX rows are parsed once, and spooled as
+    CSV for the second pass. Memory is bounded by the write batch.
+
+    Args:
+        path: The uploaded file
+
+    Returns:
+        The manifest
+    """
+    suffix = path.suffix.lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+    size, mtime_ns = _source_stamp(path)
+
+    cache = cache_path(path)
+    tmp = cache.with_name(f"{cache.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir()
+    try:
+        if suffix == ".csv":
+            headers, stats, count = _scan(_csv_rows(path))
+            source = _csv_rows(path)
+        else:
+            spool = tmp / "rows.csv"
+            with open(spool, "w", newline="", encoding="utf-8") as f:
+                headers, stats, count = _scan(_xlsx_rows(path), csv.writer(f))
+            source = _csv_rows(spool)
+
+        kinds = [column.type for column in stats]
+        # Position of each column in its array: text columns and typed ones are numbered apart
+        slots, bases = [], []
+        text_columns = text_size = 0
+        for kind, column in zip(kinds, stats):
+            if kind == "str":
+                slots.append(text_columns)
+                bases.append(text_size)
+                text_columns += 1
+                text_size += column.text_bytes + count
+            else:
+                slots.append(len(slots) - text_columns)
+                bases.append(0)
+        row_lengths = _new_array(tmp / "row_lengths.npy", "<u4", (count,))
+        typed = _new_array(tmp / "values.npy", _TYPES["int"], (len(kinds) - text_columns, count))
+        offsets = _new_array(tmp / "offsets.npy", "<u8", (text_columns, count + 1))
+        text = _new_array(tmp / "text.npy", "u1", (text_size,))
+        writers = [
+            _ColumnWriter(kind, slot, typed, offsets, text, base) for kind, slot, base in zip(kinds, slots, bases)
+        ]
+
+        next(source, None)  # Header row
+        first = 0
+        while first < count:
+            batch = list(islice(source, _BATCH))
+            if not batch:
+                raise RuntimeError(f"{path.name} changed while its cache was built")
+            row_lengths[first:first + len(batch)] = list(map(len, batch))
+            for writer, values in zip(writers, _columns_of(batch, len(writers), "")):
+                writer.write(first, values)
+            first += len(batch)
+        source.close()
+        for array in (row_lengths, typed, offsets, text):
+            array.flush()
+        # Unmapped, closing their descriptors, before the directory is moved
+        del writers, row_lengths, typed, offsets, text
+        if suffix != ".csv":
+            spool.unlink()
+
+        manifest = {
+            "format": _FORMAT,
+            "source_size": size,
+            "source_mtime_ns": mtime_ns,
+            "rows": count,
+            "headers": headers,
+            "columns": [
+                {"name": headers[i] if i < len(headers) else "", "type": kind, "slot": slot, "split": column.split}
+                for i, (kind, slot, column) in enumerate(zip(kinds, slots, stats))
+            ],
+        }
+        with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        # A directory cannot replace a non-empty one: move the old cache aside first
+        old = cache.with_name(f"{cache.name}.{uuid.uuid4().hex}.old")
+        if cache.exists():
+            os.replace(cache, old)
+        os.replace(tmp, cache)
+        shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return manifest
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _build_locks_guard:
+        return _build_locks.setdefault(str(path), threading.Lock())
+
+
+def _ensure(path: Path) -> dict:
+    manifest = _read_manifest(cache_path(path))
+    if manifest is not None and (manifest["source_size"], manifest["source_mtime_ns"]) == _source_stamp(path):
+        return manifest
+    return build_columnar_cache(path)
+
+
+def ensure_columnar_cache(path: Path) -> int:
+    """
+    Build the columnar cache unless an up-to-date one exists.
+
+    Concurrent callers for the same file wait for a single build.
+
+    Returns:
+        Number of data rows
+    """
+    with _lock_for(path):
+        return _ensure(path)["rows"]
+
+
+def _load(cache: Path, name: str) -> np.ndarray:
+    return np.load(cache / name, mmap_mode="r")
+
+
+class _Column:
+    """One cached column, a view of the mapped arrays; ``text`` decodes a slice of it."""
+
+    def __init__(self, kind: str, slot: int, split: bool, values: np.ndarray, offsets: np.ndarray, text: np.ndarray):
+        self.kind = kind
+        self.split = split
+        if kind == "str":
+            self.offsets = offsets[slot]
+            self.data = text
+        else:
+            self.values = _typed_row(values[slot], kind)
+
+    def text(self, first: int, last: int) -> List[str]:
+        if self.kind == "int":
+            return list(map(str, self.values[first:last].tolist()))
+        if self.kind == "float":
+            return list(map(_float_text, self.values[first:last].tolist()))
+        if self.split:
+            start, end = self.offsets[first].item(), self.offsets[last].item()
+            values = self.data[start:end].tobytes().decode("utf-8").split(_SEPARATOR)
+            values.pop()  # After the last separator
+            return values
+        offsets = self.offsets[first:last + 1].tolist()
+        raw = self.data[offsets[0]:offsets[-1]].tobytes()
+        base = offsets[0]
+        return [raw[start - base:end - base - 1].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+
+class _Table:
+    """A cache with all its arrays mapped."""
+
+    files = len(_ARRAYS)
+
+    def __init__(self, cache: Path, manifest: dict):
+        self.manifest = manifest
+        self.stamp = (manifest["source_size"], manifest["source_mtime_ns"])
+        self.names = [column["name"] for column in manifest["columns"]]
+        self.row_lengths, values, offsets, text = (_load(cache, name) for name in _ARRAYS)
+        self.columns = [
+            _Column(column["type"], column["slot"], column["split"], values, offsets, text) for column in manifest["columns"]
+        ]
+
+
+_tables: OrderedDict[str, _Table] = OrderedDict()
+_tables_guard = threading.Lock()
+
+
+def _open_table(path: Path) -> _Table:
+    """The mapped cache of a file, reused while the file is unchanged."""
+    key = str(path)
+    stamp = _source_stamp(path)
+    with _tables_guard:
+        table = _tables.get(key)
+        if table is not None and table.stamp == stamp:
+            _tables.move_to_end(key)
+            return table
+    with _lock_for(path):
+        # Mapped under the lock, so a rebuild cannot swap the directory in between
+        table = _Table(cache_path(path), _ensure(path))
+    with _tables_guard:
+        _tables[key] = table
+        _tables.move_to_end(key)
+        # Evicted arrays are unmapped, closing their descriptors, once pages being read let go of them
+        while len(_tables) > 1 and sum(table.files for table in _tables.values()) > _OPEN_FILES:
+            _tables.popitem(last=False)
+    return table
+
+
+class ColumnarPage:
+    """
+    One page of a cached file, optionally restricted to some columns.
+
+    Has the interface of csv_index.CSVPage: ``headers``, ``total_rows`` and
+    ``chunks``, which decodes the page a few rows at a time. Without a
+    projection rows keep their own length, as in the file; projected rows
+    have one value per selected column, "" where a row is too short.
+    """
+
+    def __init__(
+        self,
+        headers: List[str],
+        columns: List[_Column],
+        indexes: List[int] | None,
+        row_lengths: np.ndarray,
+        first: int,
+        last: int,
+        total_rows: int,
+    ):
+        self.headers = headers
+        self.columns = columns
+        self.indexes = indexes  # Positions of the projected columns in the file; None without a projection
+        self.row_lengths = row_lengths
+        self.first = first
+        self.last = last
+        self.total_rows = total_rows
+
+    @property
+    def row_count(self) -> int:
+        return self.last - self.first
+
+    def chunks(self, rows_per_chunk: int = 250) -> Iterator[List[List[str]]]:
+        # Rows at least this long have every selected column
+        complete = len(self.columns) if self.indexes is None else max(self.indexes, default=-1) + 1
+        for first in range(self.first, self.last, rows_per_chunk):
+            last = min(first + rows_per_chunk, self.last)
+            values = [column.text(first, last) for column in self.columns]
+            lengths = self.row_lengths[first:last]
+            if not values:
+                yield [[] for _ in range(last - first)]
+            elif lengths.min() >= complete:
+                yield list(map(list, zip(*values)))
+            elif self.indexes is None:
+                yield [list(row[:length]) for row, length in zip(zip(*values), lengths.tolist())]
+            else:
+                yield [
+                    [value if index < length else "" for value, index in zip(row, self.indexes)]
+                    for row, length in zip(zip(*values), lengths.tolist())
+                ]
+
+
+def open_columnar_page(path: Path, page: int, page_size: int, columns: List[str] | None = None) -> ColumnarPage:
+    """
+    Locate one page of an uploaded file in its columnar cache, building it if needed.
+
+    Args:
+        path: The CSV or XLSX file
+        page: Page number (starts at 1)
+        page_size: Rows per page
+        columns: Names of the columns to return, in order; all of them when None
+
+    Returns:
+        The page
+
+    Raises:
+        UnknownColumnError: A requested column is not in the file
+    """
+    table = _open_table(path)
+    if columns is None:
+        selected = list(range(len(table.names)))
+        headers = table.manifest["headers"]
+    else:
+        missing = [name for name in columns if name not in table.names]
+        if missing:
+            raise UnknownColumnError(f"Unknown columns: {', '.join(missing)}")
+        selected = [table.names.index(name) for name in columns]
+        headers = list(columns)
+
+    total_rows = table.manifest["rows"]
+    first = min((page - 1) * page_size, total_rows)
+    last = min(first + page_size, total_rows)
+    return ColumnarPage(
+        headers,
+        [table.columns[i] for i in selected],
+        None if columns is None else selected,
+        table.row_lengths,
+        first,
+        last,
+        total_rows,
+    )
@@ -0,0 +1,227 @@
+import csv
+import io
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+from array import array
+from pathlib import Path
+from typing import Iterator, List
+
+# Sidecar row index of an uploaded CSV file, stored next to it as
+# <name>.csv.rowidx so a page is read by seeking instead of parsing the whole
+# file. Layout, little-endian:
+#
+#   header   magic, source size, source mtime_ns, row count
+#   offsets  row count + 1 unsigned 64-bit byte offsets: where each data row
+#            (after the header row) starts, then where the last one ends
+#
+# Offsets come from csv.reader itself, so quoted fields spanning several lines
+# are one row, exactly as a full parse sees them. The index is stale, and
+# rebuilt, when the file's size or mtime no longer match its header.
+
+INDEX_SUFFIX = ".rowidx"
+_MAGIC = b"CSVIDX01"
+_HEADER = struct.Struct("<8sQQQ")
+_OFFSET = struct.Struct("<Q")
+_WRITE_BATCH = 65536  # Offsets buffered between writes while building
+
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_guard = threading.Lock()
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _source_stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_header(index: Path) -> tuple[int, int, int] | None:
+    try:
+        with open(index, "rb") as f:
+            raw = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    magic, size, mtime_ns, rows = _HEADER.unpack(raw)
+    if magic != _MAGIC:
+        return None
+    return size, mtime_ns, rows
+
+
+def _lines_with_offsets(f, offsets: List[int]) -> Iterator[str]:
+    """Decoded physical lines for csv.reader; offsets[0] tracks the end of the last line consumed."""
+    for line in f:
+        offsets[0] += len(line)
+        yield line.decode("utf-8")
+
+
+def build_csv_index(path: Path) -> int:
+    """
+    Write the row index of a CSV file, replacing any previous one atomically.
+
+    Reads the file once, line by line, in constant memory.
+
+    Args:
+        path: The CSV file
+
+    Returns:
+        Number of data rows (the header row excluded)
+    """
+    size, mtime_ns = _source_stamp(path)
+    index = index_path(path)
+    tmp = index.with_name(f"{index.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(path, "rb") as source, open(tmp, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, size, mtime_ns, 0))
+            position = [0]
+            reader = csv.reader(_lines_with_offsets(source, position))
+            next(reader, None)  # Header row
+            rows = 0
+            batch = array("Q", [position[0]])
+            for _ in reader:
+                rows += 1
+                batch.append(position[0])
+                if len(batch) >= _WRITE_BATCH:
+                    _write_offsets(out, batch)
+                    batch = array("Q")
+            _write_offsets(out, batch)
+            out.seek(0)
+            out.write(_HEADER.pack(_MAGIC, size, mtime_ns, rows))
+        os.replace(tmp, index)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return rows
+
+
+def _write_offsets(out, batch: array) -> None:
+    if sys.byteorder != "little":
+        batch.byteswap()
+    out.write(batch.tobytes())
+
+
+def ensure_csv_index(path: Path) -> int:
+    """
+    Build the row index unless an up-to-date one exists.
+
+    Concurrent callers for the same file wait for a single build.
+
+    Returns:
+        Number of data rows
+    """
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(str(path), threading.Lock())
+    with lock:
+        header = _read_header(index_path(path))
+        if header is not None and header[:2] == _source_stamp(path):
+            return header[2]
+        return build_csv_index(path)
+
+
+def _read_offsets(index_file, first: int, last: int) -> array:
+    """Offsets of rows first..last, both included."""
+    index_file.seek(_HEADER.size + first * _OFFSET.size)
+    offsets = array("Q")
+    offsets.frombytes(index_file.read((last - first + 1) * _OFFSET.size))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+def _parse(raw) -> List[List[str]]:
+    """Rows of a UTF-8 buffer; a memoryview of the mapping is decoded without copying it first."""
+    return list(csv.reader(io.StringIO(str(raw, "utf-8"), newline="")))
+
+
+def _drop_mapped(mapping: mmap.mmap, start: int, end: int) -> None:
+    if hasattr(mapping, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+        aligned = start - start % mmap.PAGESIZE
+        mapping.madvise(mmap.MADV_DONTNEED, aligned, end - aligned)
+
+
+class CSVPage:
+    """
+    One page of a CSV file, located through its row index.
+
+    ``chunks`` maps the file and decodes the page a few rows at a time
+    straight from the mapping: the bytes are neither read into a buffer nor
+    copied, and only the page's rows are decoded. Mapped pages are dropped
+    from the process once decoded (they stay in the OS page cache), so memory
+    stays bounded by the chunk size however large the file or the page.
+    """
+
+    def __init__(self, path: Path, headers: List[str], offsets: array, total_rows: int):
+        self.path = path
+        self.headers = headers
+        self.offsets = offsets  # Start of each row of the page, then the end of the last one
+        self.total_rows = total_rows
+
+    @property
+    def row_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def chunks(self, rows_per_chunk: int = 250) -> Iterator[List[List[str]]]:
+        if self.row_count == 0:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            view = memoryview(mapping)
+            try:
+                for first in range(0, self.row_count, rows_per_chunk):
+                    last = min(first + rows_per_chunk, self.row_count)
+                    start, end = self.offsets[first], self.offsets[last]
+                    chunk = view[start:end]
+                    try:
+                        rows = _parse(chunk)
+                    finally:
+                        chunk.release()
+                    _drop_mapped(mapping, start, end)
+                    yield rows
+            finally:
+                # The mapping cannot close while a view of it is alive
+                view.release()
+
+
+def open_csv_page(path: Path, page: int, page_size: int) -> CSVPage:
+    """
+    Locate one page of a CSV file through its row index, building it if needed.
+
+    Reads the index entries of the page and parses the header row; the rows
+    themselves are decoded by CSVPage.chunks.
+
+    Args:
+        path: The CSV file
+        page: Page number (starts at 1)
+        page_size: Rows per page
+
+    Returns:
+        The page
+    """
+    total_rows = ensure_csv_index(path)
+    first = min((page - 1) * page_size, total_rows)
+    last = min(first + page_size, total_rows)
+
+    with open(index_path(path), "rb") as index_file:
+        header_end = _read_offsets(index_file, 0, 0)[0]
+        offsets = _read_offsets(index_file, first, last)
+    with open(path, "rb") as f:
+        header_rows = _parse(f.read(header_end))
+    return CSVPage(path, header_rows[0] if header_rows else [], offsets, total_rows)
+
+
+def read_csv_page(path: Path, page: int, page_size: int) -> tuple[List[str], List[List[str]], int]:
+    """
+    Read one page of a CSV file in memory.
+
+    Returns:
+        (header row, rows of the page, total number of data rows)
+    """
+    csv_page = open_csv_page(path, page, page_size)
+    rows = [row for chunk in csv_page.chunks() for row in chunk]
+    return csv_page.headers, rows, csv_page.total_rows
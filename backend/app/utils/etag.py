@@ -0,0 +1,23 @@
+def make_etag(user_id: int, version: int) -> str:
+    """Strong ETag for a user's task collection at a given version."""
+    return f'"{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the current ETag.
+
+    Handles ``*``, comma-separated lists and weak validators (If-None-Match
+    uses weak comparison, RFC 9110 13.1.2).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
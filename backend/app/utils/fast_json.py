@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Any, Iterable
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+# Serialization-only mirrors of the task response models (app.api.schema.task).
+# Dumping through these precompiled adapters turns trusted rows straight into
+# JSON bytes: no model instances, no validation. Field order and types must
+# match the models; tests/test_fast_json.py checks the output is byte-identical.
+
+
+class TaskElementJSON(TypedDict):
+    id: int
+    task: str
+    date: date
+
+
+class TaskListJSON(TypedDict):
+    success: bool
+    tasks: list[TaskElementJSON]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+    next_cursor: str | None
+    error: str | None
+
+
+class TaskJSON(TypedDict):
+    success: bool
+    task: TaskElementJSON | None
+    error: str | None
+
+
+_task_list_adapter = TypeAdapter(TaskListJSON)
+_task_adapter = TypeAdapter(TaskJSON)
+
+
+def task_element(task: Any) -> TaskElementJSON:
+    """Task object or (id, task, date) row as a TaskElement-shaped dict."""
+    return {"id": task.id, "task": task.task, "date": task.date}
+
+
+def dump_task_list(
+    tasks: Iterable[Any],
+    total: int = 0,
+    page: int = 1,
+    page_size: int = 10,
+    total_pages: int = 0,
+    next_cursor: str | None = None,
+) -> bytes:
+    """TaskListResponse(success=True, ...) as JSON bytes, without validation."""
+    return _task_list_adapter.dump_json({
+        "success": True,
+        "tasks": [task_element(task) for task in tasks],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+        "error": None,
+    })
+
+
+def dump_task(task: Any) -> bytes:
+    """TaskResponse(success=True, task=...) as JSON bytes, without validation."""
+    return _task_adapter.dump_json({"success": True, "task": task_element(task), "error": None})
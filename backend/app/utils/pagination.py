@@ -0,0 +1,56 @@
+import base64
+import binascii
+from datetime import date
+
+
+def _encode(first: str, second: int) -> str:
+    raw = f"{first}|{second}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        first, second = raw.split("|")
+        return first, int(second)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_cursor(task_date: date, task_id: int) -> str:
+    """Encode a (date, id) keyset position as an opaque URL-safe cursor."""
+    return _encode(task_date.isoformat(), task_id)
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    task_date, task_id = _decode(cursor)
+    try:
+        return date.fromisoformat(task_date), task_id
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_change_cursor(change_seq: int, task_id: int) -> str:
+    """Encode a (change_seq, id) delta sync position as an opaque cursor."""
+    return _encode(str(change_seq), task_id)
+
+
+def decode_change_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Decode a cursor produced by encode_change_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    change_seq, task_id = _decode(cursor)
+    try:
+        return int(change_seq), task_id
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
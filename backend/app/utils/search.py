@@ -0,0 +1,21 @@
+import re
+
+# Words (any script) optionally followed by * for a prefix match
+_TERM = re.compile(r"(\w+)(\*?)")
+
+
+def to_fts_query(text: str) -> str:
+    """
+    Turn user input into an FTS5 expression for the task text.
+
+    Every word must match (implicit AND); a trailing ``*`` makes it a prefix
+    match, e.g. ``"gro* list"`` finds "groceries list". Words are quoted, so
+    FTS5 operators and punctuation in the input are never interpreted.
+
+    Raises:
+        ValueError: If the input contains no searchable word
+    """
+    terms = [f'"{word}"{star}' for word, star in _TERM.findall(text)]
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return " ".join(terms)
@@ -0,0 +1,159 @@
+import asyncio
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import HTTPException, Request, status
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Streams one file field of a multipart/form-data request to disk.
+#
+# The body is parsed as it arrives rather than through request.form(), which
+# spools the whole upload (in memory up to 1 MB, then to a temporary file)
+# before the endpoint runs and has no size limit. Here the file's bytes are
+# buffered up to a chunk size and written to a temporary file in the target
+# directory from a worker thread, so memory per upload is bounded by the chunk
+# size and the event loop never waits on the disk. An upload over the size
+# limit is rejected as soon as it crosses it, without reading the rest of the
+# body. The caller moves the temporary file into place with os.replace (same
+# directory, so the rename is atomic) or discards it.
+
+TEMP_SUFFIX = ".upload"
+_FORM_OVERHEAD = 64 * 1024  # Allowance for the multipart framing and other fields in Content-Length
+
+
+@dataclass
+class ReceivedUpload:
+    path: Path  # Temporary file in the target directory
+    filename: str
+    size: int
+
+
+class _FilePartReader:
+    """python-multipart callbacks keeping the data of the first file part named ``field``."""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.filename: str | None = None
+        self.pending = bytearray()  # File data not written yet
+        self.size = 0
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_file = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._in_file = (
+            self.filename is None
+            and options.get(b"name") == self.field.encode()
+            and b"filename" in options
+        )
+        if self._in_file:
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.pending += data[start:end]
+            self.size += end - start
+
+    def on_part_end(self) -> None:
+        self._in_file = False
+
+
+def _open_temp(directory: Path) -> tuple[Path, object]:
+    path = directory / f".{uuid.uuid4().hex}{TEMP_SUFFIX}"
+    return path, open(path, "xb")
+
+
+def _discard(path: Path, out) -> None:
+    out.close()
+    path.unlink(missing_ok=True)
+
+
+async def receive_upload(request: Request, field: str, directory: Path, max_bytes: int, chunk_size: int) -> ReceivedUpload:
+    """
+    Stream the file field of a multipart request to a temporary file.
+
+    Args:
+        request: The multipart/form-data request, body not read yet
+        field: Name of the file field
+        directory: Where the temporary file is created (the final directory)
+        max_bytes: Largest accepted file
+        chunk_size: Bytes buffered between two writes
+
+    Returns:
+        The temporary file, the client's filename and the size
+
+    Raises:
+        HTTPException: 413 past max_bytes, 400 for a malformed body, 422 without the field;
+            the temporary file is removed
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data body")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes + _FORM_OVERHEAD:
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=f"File exceeds {max_bytes} bytes")
+
+    reader = _FilePartReader(field)
+    parser = MultipartParser(params[b"boundary"], reader.callbacks())
+    path, out = await asyncio.to_thread(_open_temp, directory)
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed multipart body: {e}")
+            if reader.size > max_bytes:
+                raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=f"File exceeds {max_bytes} bytes")
+            if len(reader.pending) >= chunk_size:
+                data, reader.pending = reader.pending, bytearray()
+                await asyncio.to_thread(out.write, data)
+        parser.finalize()
+        if reader.filename is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=f"Missing file field '{field}'")
+        if reader.pending:
+            await asyncio.to_thread(out.write, reader.pending)
+        await asyncio.to_thread(out.close)
+    except BaseException:
+        # Also on cancellation or a client disconnect; shielded so the file is not left behind
+        await asyncio.shield(asyncio.to_thread(_discard, path, out))
+        raise
+    return ReceivedUpload(path=path, filename=reader.filename, size=reader.size)
+
+
+async def discard_upload(upload: ReceivedUpload) -> None:
+    await asyncio.to_thread(upload.path.unlink, missing_ok=True)
+
+
+async def store_upload(upload: ReceivedUpload, destination: Path) -> None:
+    """Move the temporary file into place; atomic, as both are in the same directory."""
+    await asyncio.to_thread(os.replace, upload.path, destination)
@@ -0,0 +1,94 @@
+"""
+Compare task throughput of the single-item and bulk task endpoints.
+
+Creates, updates and deletes N tasks one request at a time and then with
+one bulk request each, against a throw-away SQLite file.
+
+Run from the backend directory:
+    python -m benchmarks.bench_bulk_tasks [N]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.db import Base, get_session
+from app.models.user import User
+from server.app import app
+
+
+async def timed(label: str, n: int, coro):
+    started = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - started
+    print(f"{label:<16} {n} tasks in {elapsed:.3f}s ({n / elapsed:,.0f} tasks/s)")
+
+
+async def main(n: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as db:
+        db.add(User(username="bench", hashed_password=get_password_hash("TestPassword123!")))
+        await db.commit()
+
+    async def _override():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_session] = _override
+    token = create_access_token({"sub": "bench", "role": "user"}, timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    items = [{"desc": f"task {i}", "date": "2025-01-01"} for i in range(n)]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        ids = []
+
+        async def single_create():
+            for item in items:
+                ids.append((await client.post("/tasks/", json=item)).json()["task"]["id"])
+
+        async def single_update():
+            for task_id in ids:
+                await client.put(f"/tasks/{task_id}", json={"desc": "edited", "date": "2025-01-02"})
+
+        async def single_delete():
+            for task_id in ids:
+                await client.delete(f"/tasks/{task_id}")
+
+        await timed("single create", n, single_create())
+        await timed("single update", n, single_update())
+        await timed("single delete", n, single_delete())
+
+        bulk_ids = []
+
+        async def bulk_create():
+            results = (await client.post("/tasks/bulk", json=items)).json()["results"]
+            bulk_ids.extend(r["id"] for r in results)
+
+        async def bulk_update():
+            await client.put("/tasks/bulk", json=[
+                {"id": task_id, "desc": "edited", "date": "2025-01-02"} for task_id in bulk_ids])
+
+        async def bulk_delete():
+            await client.post("/tasks/bulk/delete", json=bulk_ids)
+
+        await timed("bulk create", n, bulk_create())
+        await timed("bulk update", n, bulk_update())
+        await timed("bulk delete", n, bulk_delete())
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,93 @@
+"""
+Compare reading pages of a large upload through the CSV row index with
+reading them from the columnar cache, and time the one-time conversions.
+
+Writes N rows to a throw-away CSV file and builds both its row index and its
+columnar cache, then times pages of PAGE_SIZE rows at the start, middle and
+end of the file, all columns and one projected column. Then does the same
+for an XLSX workbook of N // 10 rows, which only the cache can read.
+
+Run from the backend directory:
+    python -m benchmarks.bench_columnar [N] [PAGE_SIZE]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils.columnar import build_columnar_cache, open_columnar_page
+from app.utils.csv_index import build_csv_index, read_csv_page
+
+HEADERS = ["id", "name", "notes", "amount"]
+REPEAT = 20
+
+
+def row(i: int) -> list:
+    return [i, f"customer {i}", f"a note for row {i}", i * 1.5]
+
+
+def write_csv(path: Path, n: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for i in range(n):
+            writer.writerow(row(i))
+
+
+def write_xlsx(path: Path, n: int) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADERS)
+    for i in range(n):
+        sheet.append(row(i))
+    workbook.save(path)
+
+
+def read_columnar(path: Path, page: int, page_size: int, columns=None):
+    csv_page = open_columnar_page(path, page, page_size, columns)
+    return csv_page.headers, [r for chunk in csv_page.chunks() for r in chunk], csv_page.total_rows
+
+
+def timed(label: str, function, *args, repeat: int = 1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args)
+    print(f"{label:<40} {(time.perf_counter() - started) * 1000 / repeat:10.2f} ms")
+    return result
+
+
+def pages(label: str, path: Path, n: int, page_size: int, reader) -> None:
+    last_page = (n + page_size - 1) // page_size
+    for where, page in (("first", 1), ("middle", last_page // 2), ("last", last_page)):
+        expected = timed(f"{label}, {where} page", reader, path, page, page_size, repeat=REPEAT)
+        if reader is read_columnar:
+            assert expected == read_csv_page(path, page, page_size) if path.suffix == ".csv" else expected[2] == n
+
+
+def main(n: int, page_size: int) -> None:
+    directory = Path(tempfile.mkdtemp())
+    path = directory / "bench.csv"
+    write_csv(path, n)
+    print(f"{n:,} rows, {os.path.getsize(path) / 1e6:.1f} MB CSV, pages of {page_size:,} rows")
+    timed("row index build (once)", build_csv_index, path)
+    timed("columnar cache build (once)", build_columnar_cache, path)
+    pages("row index", path, n, page_size, read_csv_page)
+    pages("columnar", path, n, page_size, read_columnar)
+    timed("columnar, middle page, 1 column", read_columnar, path, n // page_size // 2, page_size, ["amount"], repeat=REPEAT)
+
+    path = directory / "bench.xlsx"
+    write_xlsx(path, n // 10)
+    print(f"\n{n // 10:,} rows, {os.path.getsize(path) / 1e6:.1f} MB XLSX")
+    timed("columnar cache build (once)", build_columnar_cache, path)
+    pages("columnar", path, n // 10, page_size, read_columnar)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
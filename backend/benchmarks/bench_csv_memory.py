@@ -0,0 +1,149 @@
+"""
+Compare peak memory of concurrent GET /admin/csv-data requests when the page
+is built in memory (rows list, CSVDataResponse, JSON body: the former
+handler) and when it is streamed from a memory map (the current handler).
+
+Writes N rows to a throw-away upload directory and indexes the file, then,
+in a fresh process per mode, sends CONCURRENCY requests at a time for pages
+of PAGE_SIZE rows and reports how far peak RSS rose above the process's
+baseline, and the peak of the Python heap (tracemalloc; RSS also counts
+allocator fragmentation and per-thread arenas, and tracemalloc slows both
+modes down alike). Requests go straight to the ASGI app and response bodies are
+counted, not kept, so only server-side memory is measured.
+
+Run from the backend directory:
+    python -m benchmarks.bench_csv_memory [N] [PAGE_SIZE] [CONCURRENCY]
+"""
+import asyncio
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROUNDS = 3
+
+
+def write_csv(path: Path, n: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "notes", "amount"])
+        for i in range(n):
+            writer.writerow([i, f"customer {i}", f"a longer free-text note for row {i}, " * 3, f"{i * 1.5:.2f}"])
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def call(app, path: str, query: str) -> int:
+    """GET through the ASGI interface; returns the body size."""
+    done = asyncio.Event()
+    received = 0
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return received
+
+
+def buffered_app(upload_dir: Path):
+    """The former handler: the whole page in lists, then a validated model, then one JSON body."""
+    from fastapi import FastAPI
+
+    from app.api.schema.admin import CSVDataResponse
+    from app.utils.csv_index import read_csv_page
+
+    app = FastAPI()
+
+    @app.get("/admin/csv-data/{filename}", response_model=CSVDataResponse)
+    async def get_csv_data(filename: str, page: int = 1, page_size: int = 100):
+        headers, rows, total_rows = await asyncio.to_thread(read_csv_page, upload_dir / filename, page, page_size)
+        return CSVDataResponse(headers=headers, data=rows, total_rows=total_rows, page=page, page_size=page_size, success=True)
+
+    return app
+
+
+def streaming_app(upload_dir: Path):
+    from app.api.routes import admin
+    from app.utils.auth import get_admin_user
+    from server.app import app
+
+    admin.UPLOAD_DIR = upload_dir
+    app.dependency_overrides[get_admin_user] = lambda: None
+    return app
+
+
+async def run_mode(mode: str, path: Path, page_size: int, concurrency: int, total_rows: int) -> None:
+    app = (buffered_app if mode == "buffered" else streaming_app)(path.parent)
+    url = f"/admin/csv-data/{path.name}"
+    await call(app, url, "page=1&page_size=10")  # Warm-up: imports, threadpool
+    baseline = peak_rss_mb()
+    tracemalloc.start()
+
+    pages = max(1, total_rows // page_size)
+    started = time.perf_counter()
+    sent = 0
+    for round_number in range(ROUNDS):
+        sizes = await asyncio.gather(*(
+            call(app, url, f"page={1 + (round_number * concurrency + i) % pages}&page_size={page_size}")
+            for i in range(concurrency)
+        ))
+        sent += sum(sizes)
+    elapsed = time.perf_counter() - started
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{mode:<9} peak RSS +{peak_rss_mb() - baseline:7.1f} MB, Python heap peak {heap_peak / 1e6:7.1f} MB, "
+        f"{ROUNDS * concurrency} responses ({sent / 1e6:.0f} MB) in {elapsed:.2f}s"
+    )
+
+
+def main(n: int, page_size: int, concurrency: int) -> None:
+    from app.utils.csv_index import ensure_csv_index
+
+    path = Path(tempfile.mkdtemp()) / "bench.csv"
+    write_csv(path, n)
+    total_rows = ensure_csv_index(path)
+    print(f"{n:,} rows ({os.path.getsize(path) / 1e6:.0f} MB), pages of {page_size:,} rows, {concurrency} concurrent requests")
+    for mode in ("buffered", "streaming"):
+        # A fresh process per mode: peak RSS never goes down
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_csv_memory", "--mode", mode, str(path), str(page_size), str(concurrency), str(total_rows)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--mode":
+        asyncio.run(run_mode(args[1], Path(args[2]), int(args[3]), int(args[4]), int(args[5])))
+    else:
+        main(
+            int(args[0]) if len(args) > 0 else 500_000,
+            int(args[1]) if len(args) > 1 else 10_000,
+            int(args[2]) if len(args) > 2 else 8,
+        )
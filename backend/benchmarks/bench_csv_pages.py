@@ -0,0 +1,64 @@
+"""
+Compare reading one page of a large CSV upload by parsing the whole file (the
+former GET /admin/csv-data) with reading it through the row index.
+
+Writes N rows (every tenth one with a quoted multi-line field) to a throw-away
+file, then times the full parse, the one-time index build and page reads at
+the start, middle and end of the file.
+
+Run from the backend directory:
+    python -m benchmarks.bench_csv_pages [N]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.utils.csv_index import build_csv_index, index_path, read_csv_page
+
+PAGE_SIZE = 100
+
+
+def full_parse_page(path: Path, page: int, page_size: int):
+    with open(path, "r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        all_rows = list(reader)
+        start = (page - 1) * page_size
+        return headers, all_rows[start:start + page_size], len(all_rows)
+
+
+def write_csv(path: Path, n: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "notes", "amount"])
+        for i in range(n):
+            notes = f"line one\nline two of row {i}" if i % 10 == 0 else f"note {i}"
+            writer.writerow([i, f"customer {i}", notes, f"{i * 1.5:.2f}"])
+
+
+def timed(label: str, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    print(f"{label:<28} {(time.perf_counter() - started) * 1000:10.1f} ms")
+    return result
+
+
+def main(n: int) -> None:
+    path = Path(tempfile.mkdtemp()) / "bench.csv"
+    write_csv(path, n)
+    print(f"{n:,} rows, {os.path.getsize(path) / 1e6:.1f} MB")
+    last_page = (n + PAGE_SIZE - 1) // PAGE_SIZE
+
+    expected = timed("full parse, last page", full_parse_page, path, last_page, PAGE_SIZE)
+    timed("index build (once)", build_csv_index, path)
+    print(f"{'index size':<28} {index_path(path).stat().st_size / 1e6:10.1f} MB")
+    for label, page in (("first", 1), ("middle", last_page // 2), ("last", last_page)):
+        result = timed(f"indexed read, {label} page", read_csv_page, path, page, PAGE_SIZE)
+    assert result == expected
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
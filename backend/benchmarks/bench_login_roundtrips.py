@@ -0,0 +1,96 @@
+"""
+Count database round trips and commits issued by POST /auth/token.
+
+Runs successful, failed and unknown-user logins against a throw-away SQLite
+file, with a backlog of expired refresh tokens for the user, and counts the statements sent to the driver and the commits (each
+commit is an fsync barrier in SQLite) for every request.
+
+Run from the backend directory:
+    python -m benchmarks.bench_login_roundtrips
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.auth import limiter
+from app.core.security import get_password_hash
+from app.db.db import Base, get_session
+from app.models.refresh_tokens import RefreshToken
+from app.models.user import User
+from server.app import app
+
+PASSWORD = "TestPassword123!"
+EXPIRED_TOKENS = 20
+
+
+class Counter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine.sync_engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+async def main():
+    limiter.enabled = False
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as db:
+        user = User(username="bench", hashed_password=get_password_hash(PASSWORD))
+        db.add(user)
+        await db.flush()
+        expired = datetime.now(timezone.utc) - timedelta(days=1)
+        db.add_all(
+            RefreshToken(user_id=user.id, token_hash=f"expired-{i}", expires_at=expired)
+            for i in range(EXPIRED_TOKENS)
+        )
+        await db.commit()
+
+    async def _override():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_session] = _override
+    counter = Counter(engine)
+
+    cases = [
+        ("success", {"username": "bench", "password": PASSWORD}),
+        ("wrong password", {"username": "bench", "password": "WrongPassword1!"}),
+        ("unknown user", {"username": "nobody", "password": PASSWORD}),
+        ("success (after failure)", {"username": "bench", "password": PASSWORD}),
+    ]
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for label, form in cases:
+            counter.reset()
+            response = await client.post("/auth/token", data=form)
+            print(
+                f"{label:<24} status={response.status_code} "
+                f"statements={counter.statements} commits={counter.commits}"
+            )
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
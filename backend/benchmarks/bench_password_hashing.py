@@ -0,0 +1,65 @@
+"""
+Benchmark event-loop responsiveness during a burst of password hashing.
+
+Compares calling Argon2 inline in the event loop against the bounded
+worker pool from app.core.hashing. A probe coroutine sleeps for 1 ms in a
+loop and records how late it wakes up; that lag is what every other request
+on the worker would experience.
+
+Run from the backend directory:
+    python -m benchmarks.bench_password_hashing
+"""
+import asyncio
+import statistics
+import time
+
+from app.core.hashing import PasswordHashingService
+from app.core.security import hash_password
+
+BURST = 32
+PASSWORD = "TestPassword123!"
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - started - 0.001) * 1000)
+
+
+async def run(label: str, hash_many):
+    lags: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    started = time.perf_counter()
+    await hash_many()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    lags.sort()
+    print(
+        f"{label:<12} burst={BURST} total={elapsed:.2f}s "
+        f"loop lag p50={statistics.median(lags):.2f}ms "
+        f"p99={lags[int(len(lags) * 0.99) - 1]:.2f}ms max={lags[-1]:.2f}ms"
+    )
+
+
+async def main():
+    async def inline():
+        for _ in range(BURST):
+            hash_password(PASSWORD)
+            await asyncio.sleep(0)
+
+    service = PasswordHashingService(max_workers=2, max_queue=BURST)
+
+    async def pooled():
+        await asyncio.gather(*(service.hash(PASSWORD) for _ in range(BURST)))
+
+    await run("inline", inline)
+    await run("pooled", pooled)
+    print(f"pool metrics: {service.metrics()}")
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
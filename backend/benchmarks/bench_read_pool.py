@@ -0,0 +1,121 @@
+"""
+Compare read throughput under concurrent writes with one shared pool and
+with a separate read-only pool (app.db.db.create_read_engine).
+
+For SECONDS seconds, WRITERS coroutines create tasks (add_task, as POST
+/tasks does) while READERS coroutines read pages (get_tasks +
+get_tasks_count, as GET /tasks does), each operation in its own session like
+a request. SQLite lets one writer in at a time, so the other writers hold
+their pooled connections while they wait for the lock.
+
+    shared  readers and writers check out connections from the same engine
+    split   readers use a query_only engine with its own pool
+
+Run from the backend directory:
+    python -m benchmarks.bench_read_pool [SECONDS] [WRITERS] [READERS]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import get_password_hash
+from app.db.db import Base, create_db_engine
+from app.db.task import add_task
+from app.db.user import get_tasks, get_tasks_count
+from app.models.user import User
+from server.app import app  # noqa: F401  (imports every model)
+
+USERS = 8
+SEED_TASKS_PER_USER = 200
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(mode: str, seconds: float, writers: int, readers: int) -> None:
+    url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_db_engine(url)
+    read_engine = create_db_engine(url, read_only=True) if mode == "split" else engine
+    try:
+        write_sessions = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        read_sessions = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        hashed = get_password_hash("TestPassword123!")
+        async with write_sessions() as db:
+            db.add_all([User(username=f"bench{i}", hashed_password=hashed) for i in range(USERS)])
+            await db.commit()
+            for user_id in range(1, USERS + 1):
+                for i in range(SEED_TASKS_PER_USER):
+                    await add_task(db, user_id, f"seed {i}", date(2025, 1, 1 + i % 28))
+
+        latencies = {"write": [], "read": []}
+        errors = {"write": 0, "read": 0}
+        deadline = time.perf_counter() + seconds
+
+        async def writer(writer_id: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                i += 1
+                started = time.perf_counter()
+                try:
+                    async with write_sessions() as db:
+                        await add_task(db, 1 + writer_id % USERS, f"task {i}", date(2025, 1, 1))
+                except OperationalError:  # database is locked
+                    errors["write"] += 1
+                    continue
+                latencies["write"].append(time.perf_counter() - started)
+
+        async def reader(reader_id: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                i += 1
+                user_id = 1 + (reader_id + i) % USERS
+                started = time.perf_counter()
+                async with read_sessions() as db:
+                    await get_tasks(db, user_id, skip=(i % 10) * 20, limit=20)
+                    await get_tasks_count(db, user_id)
+                latencies["read"].append(time.perf_counter() - started)
+
+        await asyncio.gather(
+            *(writer(writer_id) for writer_id in range(writers)),
+            *(reader(reader_id) for reader_id in range(readers)),
+        )
+        for kind in ("read", "write"):
+            done = latencies[kind]
+            print(
+                f"{mode:<7} {kind:<5} {len(done) / seconds:8,.0f} ops/s"
+                f"  p50 {percentile(done, 0.5) * 1000:7.2f} ms"
+                f"  p99 {percentile(done, 0.99) * 1000:7.2f} ms"
+                f"  locked errors {errors[kind]}"
+            )
+    finally:
+        if read_engine is not engine:
+            await read_engine.dispose()
+        await engine.dispose()
+
+
+async def main(seconds: float, writers: int, readers: int) -> None:
+    print(f"{seconds:g}s per mode, {writers} writers, {readers} readers")
+    for mode in ("shared", "split"):
+        await run(mode, seconds, writers, readers)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(
+        float(args[0]) if len(args) > 0 else 10,
+        int(args[1]) if len(args) > 1 else 16,
+        int(args[2]) if len(args) > 2 else 4,
+    ))
@@ -0,0 +1,184 @@
+"""
+Compare database throughput under mixed concurrent load with and without the
+SQLite connection profile (app.db.db.SQLITE_PRAGMAS).
+
+Like uvicorn workers sharing one database file, WORKERS processes each open
+their own engine on a throw-away SQLite file and run, for SECONDS seconds,
+writers (add_task / put_task, as POST and PUT /tasks do) and readers
+(get_tasks + get_tasks_count, as GET /tasks does) concurrently. The task
+functions are called directly so that only the database is measured.
+
+    default  SQLite's defaults: rollback journal, synchronous=FULL, no mmap
+             (Python's sqlite3 still waits up to 5 s on a lock)
+    tuned    the profile configured in the settings (WAL, synchronous=NORMAL, ...)
+
+fsync cost depends on the filesystem; pass a directory on the production disk
+type to measure it (temp directories are often tmpfs).
+
+Run from the backend directory:
+    python -m benchmarks.bench_sqlite_profile [SECONDS] [WORKERS] [DIRECTORY]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.api.schema.task import TaskPost
+from app.core.security import get_password_hash
+from app.core.settings import settings
+from app.db.db import SQLITE_PRAGMAS, Base, create_db_engine
+from app.db.task import add_task, put_task
+from app.db.user import get_tasks, get_tasks_count
+from app.models.user import User
+from server.app import app  # noqa: F401  (imports every model)
+
+PROFILES = {
+    "default": {setting: None for setting in SQLITE_PRAGMAS.values()},
+    "tuned": {setting: getattr(settings, setting) for setting in SQLITE_PRAGMAS.values()},
+}
+WRITERS_PER_WORKER = 2
+READERS_PER_WORKER = 1
+USERS = 16
+SEED_TASKS_PER_USER = 200
+
+
+def use_profile(name: str) -> None:
+    for setting, value in PROFILES[name].items():
+        setattr(settings, setting, value)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def seed(url: str) -> None:
+    engine = create_db_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        hashed = get_password_hash("TestPassword123!")
+        async with session_factory() as db:
+            db.add_all([User(username=f"bench{i}", hashed_password=hashed) for i in range(USERS)])
+            await db.commit()
+        for user_id in range(1, USERS + 1):
+            async with session_factory() as db:
+                for i in range(SEED_TASKS_PER_USER):
+                    await add_task(db, user_id, f"seed {i}", date(2025, 1, 1 + i % 28))
+    finally:
+        await engine.dispose()
+
+
+async def run_worker(url: str, worker: int, seconds: float) -> dict:
+    deadline = time.perf_counter() + seconds
+    engine = create_db_engine(url)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    stats = {"write": [], "read": [], "write_errors": 0, "read_errors": 0}
+
+    async def timed(kind: str, operation):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            try:
+                await operation(db)
+            except OperationalError:  # database is locked
+                stats[f"{kind}_errors"] += 1
+                return
+            stats[kind].append(time.perf_counter() - started)
+
+    async def writer(writer_id: int):
+        user_id = 1 + (worker * WRITERS_PER_WORKER + writer_id) % USERS
+        task_ids = []
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            if task_ids and i % 2 == 0:
+                task_id = task_ids[i % len(task_ids)]
+                await timed("write", lambda db: put_task(
+                    db, user_id, task_id, TaskPost(desc=f"edit {i}", date=date(2025, 2, 1))))
+            else:
+                async def create(db):
+                    task_ids.append((await add_task(db, user_id, f"task {i}", date(2025, 1, 1))).id)
+                await timed("write", create)
+
+    async def reader(reader_id: int):
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            user_id = 1 + (worker + reader_id + i) % USERS
+
+            async def read(db):
+                await get_tasks(db, user_id, skip=(i % 10) * 20, limit=20)
+                await get_tasks_count(db, user_id)
+            await timed("read", read)
+
+    try:
+        await asyncio.gather(
+            *(writer(writer_id) for writer_id in range(WRITERS_PER_WORKER)),
+            *(reader(reader_id) for reader_id in range(READERS_PER_WORKER)),
+        )
+    finally:
+        await engine.dispose()
+    return stats
+
+
+def worker_main(profile: str, url: str, worker: int, seconds: float, ready, results) -> None:
+    use_profile(profile)
+    ready.wait()  # Every process has finished importing the app
+    results.put(asyncio.run(run_worker(url, worker, seconds)))
+
+
+def run_profile(profile: str, seconds: float, workers: int, directory: str | None) -> None:
+    use_profile(profile)
+    url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(dir=directory), 'bench.db')}"
+    asyncio.run(seed(url))
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    ready = context.Barrier(workers)
+    processes = [
+        context.Process(target=worker_main, args=(profile, url, worker, seconds, ready, results))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    for kind in ("write", "read"):
+        done = [latency for worker_stats in stats for latency in worker_stats[kind]]
+        errors = sum(worker_stats[f"{kind}_errors"] for worker_stats in stats)
+        print(
+            f"{profile:<8} {kind:<5} {len(done) / seconds:8,.0f} ops/s"
+            f"  p50 {percentile(done, 0.5) * 1000:7.2f} ms"
+            f"  p99 {percentile(done, 0.99) * 1000:7.2f} ms"
+            f"  locked errors {errors}"
+        )
+
+
+def main(seconds: float, workers: int, directory: str | None) -> None:
+    print(
+        f"{seconds:g}s per profile, {workers} processes x ({WRITERS_PER_WORKER} writers + "
+        f"{READERS_PER_WORKER} readers), files in {directory or tempfile.gettempdir()}"
+    )
+    for profile in PROFILES:
+        run_profile(profile, seconds, workers, directory)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        float(args[0]) if len(args) > 0 else 10,
+        int(args[1]) if len(args) > 1 else 2,
+        args[2] if len(args) > 2 else None,
+    )
@@ -0,0 +1,82 @@
+"""
+Measure what loading Magika at import time cost each worker on startup.
+
+In a fresh process per run, times importing the app (server.app) as it is
+now, with the model loaded lazily, then the former import-time load on top of
+it (importing magika and constructing Magika()), with peak RSS after each
+step: the second step is what every worker no longer pays on startup. Both
+are timed in the same process because import times vary more between
+processes than the load itself takes. Then times the first detection of an
+upload when the model is loaded on demand and when the background warm-up ran
+first.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup [RUNS]
+"""
+import asyncio
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_import() -> None:
+    started = time.perf_counter()
+    import server.app  # noqa: F401
+    imported = time.perf_counter()
+    app_rss = peak_rss_mb()
+    from magika import Magika
+
+    Magika()
+    print(f"{imported - started} {app_rss} {time.perf_counter() - imported} {peak_rss_mb()}")
+
+
+async def run_first_detection(mode: str, path: Path) -> None:
+    from app.core.file_detection import file_type_detector
+
+    if mode == "warm":
+        file_type_detector.warm_up()
+        while not file_type_detector.loaded:
+            await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    result = await file_type_detector.identify_path(path)
+    assert result.output.mime_type == "text/csv"
+    print(time.perf_counter() - started)
+    await file_type_detector.stop()
+
+
+def measure(*args: str) -> list[float]:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", *args], check=True, capture_output=True, text=True
+    ).stdout
+    return [float(value) for value in output.split()]
+
+
+def main(runs: int) -> None:
+    results = [measure("--import") for _ in range(runs)]
+    app_seconds, app_rss, load_seconds, loaded_rss = (statistics.median(r[i] for r in results) for i in range(4))
+    print(f"{'import server.app':<30} {app_seconds * 1000:7.0f} ms  peak RSS {app_rss:6.0f} MB  (median of {runs})")
+    print(f"{'+ import magika, Magika()':<30} {load_seconds * 1000:7.0f} ms  peak RSS {loaded_rss:6.0f} MB  (saved on startup)")
+
+    path = Path(tempfile.mkdtemp()) / "sample.csv"
+    path.write_text("id,name,amount\n" + "".join(f"{i},customer {i},{i * 1.5:.2f}\n" for i in range(500)))
+    for mode, label in (("cold", "first detection, on demand"), ("warm", "first detection, warmed up")):
+        seconds = statistics.median(measure("--detect", mode, str(path))[0] for _ in range(runs))
+        print(f"{label:<30} {seconds * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--import":
+        run_import()
+    elif args and args[0] == "--detect":
+        asyncio.run(run_first_detection(args[1], Path(args[2])))
+    else:
+        main(int(args[0]) if args else 5)
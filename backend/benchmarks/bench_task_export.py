@@ -0,0 +1,134 @@
+"""
+Measure GET /tasks/export throughput and memory against paging through GET /tasks.
+
+Seeds N tasks for one user in a throw-away SQLite file, streams the export in
+both formats, and reports rows/s and the growth of the process' peak RSS.
+The export is driven over raw ASGI with a send() that discards the body,
+because httpx's ASGITransport buffers whole responses. Cursor paging over
+/tasks is timed for comparison.
+
+Run from the backend directory:
+    python -m benchmarks.bench_task_export [N]
+"""
+import asyncio
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import create_access_token, get_password_hash
+from app.db.db import Base, get_session
+from app.models.user import User
+from server.app import app
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def stream_export(path: str, token: str) -> tuple[int, int]:
+    """Call the app directly; returns the status code and the number of body bytes sent."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path.split("?")[0], "raw_path": path.split("?")[0].encode(),
+        "query_string": path.partition("?")[2].encode(), "root_path": "",
+        "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234), "server": ("test", 80),
+    }
+    sent = {"status": 0, "bytes": 0}
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # StreamingResponse listens for a disconnect while it sends
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            sent["bytes"] += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    return sent["status"], sent["bytes"]
+
+
+def seed(path: str, user_id: int, n: int):
+    start = date(2020, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO tasks (task, date, user_id) VALUES (?, ?, ?)",
+        ((f"task number {i}", (start + timedelta(days=i % 3650)).isoformat(), user_id) for i in range(n)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def main(n: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as db:
+        user = User(username="bench", hashed_password=get_password_hash("TestPassword123!"))
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    started = time.perf_counter()
+    seed(path, user_id, n)
+    print(f"seeded {n:,} tasks in {time.perf_counter() - started:.1f}s")
+
+    async def _override():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_session] = _override
+    token = create_access_token({"sub": "bench", "role": "user"}, timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers, timeout=None) as client:
+        for format in ("ndjson", "csv"):
+            rss_before = peak_rss_mb()
+            started = time.perf_counter()
+            status, size = await stream_export(f"/tasks/export?format={format}", token)
+            assert status == 200, status
+            elapsed = time.perf_counter() - started
+            print(
+                f"export {format:<7} {n:,} rows in {elapsed:.2f}s ({n / elapsed:,.0f} rows/s), "
+                f"{size / 1e6:.1f} MB, peak RSS +{peak_rss_mb() - rss_before:.1f} MB"
+            )
+
+        # Paging is much slower; time a slice and extrapolate
+        pages = min(n, 50_000) // 100
+        started = time.perf_counter()
+        cursor = None
+        for _ in range(pages):
+            params = {"page_size": 100, **({"cursor": cursor} if cursor else {})}
+            cursor = (await client.get("/tasks/", params=params)).json()["next_cursor"]
+        elapsed = time.perf_counter() - started
+        rate = pages * 100 / elapsed
+        print(f"cursor paging  {pages * 100:,} rows in {elapsed:.2f}s ({rate:,.0f} rows/s, ~{n / rate:.0f}s for all)")
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
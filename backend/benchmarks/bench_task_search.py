@@ -0,0 +1,129 @@
+"""
+Compare the tasks_fts full-text index with a LIKE '%term%' scan.
+
+Seeds N six-word tasks (Zipf-distributed vocabulary of 5,000 words) spread
+over 100 users, one heavy user holding a tenth of them, in a throw-away
+SQLite file, then times the query run by GET /tasks/search
+against the equivalent LIKE query for a few terms.
+
+Run from the backend directory:
+    python -m benchmarks.bench_task_search [N]
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+
+from app.db.db import Base
+from app.db.task import search_tasks
+from app.models.user import User
+from app.utils.search import to_fts_query
+from server.app import app  # noqa: F401  (imports every model)
+
+VOCABULARY_SIZE = 5000
+
+
+def vocabulary(rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 9))))
+    return sorted(words)
+
+
+# Word frequencies follow a Zipf distribution, as in natural text
+RNG = random.Random(42)
+WORDS = vocabulary(RNG)
+WEIGHTS = [1 / rank for rank in range(1, VOCABULARY_SIZE + 1)]
+QUERIES = [
+    WORDS[9],  # very common word
+    WORDS[499],  # medium
+    WORDS[2999],  # rare
+    WORDS[99][:3] + "*",  # prefix
+    f"{WORDS[19]} {WORDS[199]}",  # two words
+]
+HEAVY_USER = 1
+
+
+def seed(path: str, n: int):
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO tasks (task, date, user_id) VALUES (?, '2025-01-01', ?)",
+        ((" ".join(rng.choices(WORDS, WEIGHTS, k=6)), HEAVY_USER if i % 10 == 0 else rng.randint(2, 100)) for i in range(n)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def like_pattern(query: str) -> list[str]:
+    return [f"%{word.rstrip('*')}%" for word in query.split()]
+
+
+async def best_of(repeat: int, coro_factory) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+async def main(n: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as db:
+            db.add_all(User(id=i, username=f"user{i}", hashed_password="x") for i in range(1, 101))
+            await db.commit()
+
+        started = time.perf_counter()
+        seed(path, n)
+        print(f"seeded {n:,} tasks in {time.perf_counter() - started:.1f}s (FTS index maintained by triggers)")
+
+        await run_queries(session_factory)
+    finally:
+        await engine.dispose()
+
+
+async def run_queries(session_factory):
+    async with session_factory() as db:
+        for query in QUERIES:
+            terms = to_fts_query(query)
+            patterns = like_pattern(query)
+            like_sql = text(
+                "SELECT id, task, date FROM tasks WHERE user_id = :user_id AND "
+                + " AND ".join(f"task LIKE :p{i}" for i in range(len(patterns)))
+                + " ORDER BY id LIMIT 10"
+            )
+            like_count_sql = text(
+                "SELECT count(*) FROM tasks WHERE user_id = :user_id AND "
+                + " AND ".join(f"task LIKE :p{i}" for i in range(len(patterns)))
+            )
+            params = {"user_id": HEAVY_USER, **{f"p{i}": p for i, p in enumerate(patterns)}}
+
+            async def fts():
+                return await search_tasks(db, HEAVY_USER, terms, limit=10)
+
+            async def like():
+                await db.scalar(like_count_sql, params)
+                return (await db.execute(like_sql, params)).all()
+
+            total, _ = await fts()
+            fts_ms = await best_of(5, fts)
+            like_ms = await best_of(5, like)
+            print(f"{query!r:<20} {total:>7,} matches  fts {fts_ms:8.2f} ms   like {like_ms:8.2f} ms   ({like_ms / fts_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,76 @@
+"""
+Compare the ways of turning a page of task rows into the GET /tasks body.
+
+    fastapi    validate into TaskListResponse, then what FastAPI does for a
+               returned model: jsonable_encoder + json.dumps
+    model      validate into TaskListResponse, then model_dump_json
+    construct  TaskListResponse.model_construct (no validation) + model_dump_json
+    fast_json  app.utils.fast_json.dump_task_list (precompiled TypeAdapter)
+
+All four produce the same bytes; this is checked before timing.
+
+Run from the backend directory:
+    python -m benchmarks.bench_task_serialization [PAGE_SIZE]
+"""
+import sys
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.schema.task import TaskElement, TaskListResponse
+from app.utils.fast_json import dump_task_list
+
+Row = namedtuple("Row", "id task date")
+PAGE = dict(total=10000, page=1, page_size=100, total_pages=100, next_cursor="MjAyNS0wMS0wMXwx")
+
+
+def fastapi_path(rows):
+    model = TaskListResponse(success=True, tasks=[TaskElement.model_validate(row) for row in rows], **PAGE)
+    return JSONResponse(content=jsonable_encoder(model)).body
+
+
+def model_path(rows):
+    model = TaskListResponse(success=True, tasks=[TaskElement.model_validate(row) for row in rows], **PAGE)
+    return model.model_dump_json().encode()
+
+
+def construct_path(rows):
+    tasks = [TaskElement.model_construct(id=row.id, task=row.task, date=row.date) for row in rows]
+    return TaskListResponse.model_construct(success=True, tasks=tasks, error=None, **PAGE).model_dump_json().encode()
+
+
+def fast_json_path(rows):
+    return dump_task_list(rows, **PAGE)
+
+
+def timed(function, rows, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(rows)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(page_size: int) -> None:
+    rows = [
+        Row(i, f"task number {i} with \"quotes\" and ünïcode", date(2025, 1, 1) + timedelta(days=i % 365))
+        for i in range(page_size)
+    ]
+    paths = [fastapi_path, model_path, construct_path, fast_json_path]
+    expected = fastapi_path(rows)
+    for path in paths:
+        assert path(rows) == expected, path.__name__
+
+    repeat = max(20, 20000 // max(page_size, 1))
+    print(f"{page_size} tasks per page, {len(expected)} bytes, {repeat} runs")
+    baseline = None
+    for path in paths:
+        seconds = timed(path, rows, repeat)
+        baseline = baseline or seconds
+        print(f"  {path.__name__:<16} {seconds * 1e6:9.1f} us/page  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,183 @@
+"""
+Compare peak memory of concurrent POST /admin/upload requests when the upload
+is read whole (await file.read(), Magika on the buffer, a blocking write: the
+former handler) and when it is streamed to disk (the current handler).
+
+Writes a CSV file of SIZE_MB, then, in a fresh process per mode, sends
+CONCURRENCY uploads of it at a time, each body delivered in 64 KiB messages as
+a server would, and reports how far peak RSS rose above the process's
+baseline and how long the event loop was stalled at most (a ticker measures
+how late it wakes up). Both handlers index the CSV file in the background
+before the request completes, as the upload route does.
+
+Run from the backend directory:
+    python -m benchmarks.bench_upload_memory [SIZE_MB] [CONCURRENCY]
+"""
+import asyncio
+import csv
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BOUNDARY = "benchboundary"
+MESSAGE_SIZE = 64 * 1024
+
+
+def write_csv(path: Path, size_mb: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "notes", "amount"])
+        i = 0
+        while f.tell() < size_mb * 1e6:
+            writer.writerow([i, f"customer {i}", f"a note for row {i}", f"{i * 1.5:.2f}"])
+            i += 1
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def post(app, path: Path) -> int:
+    """Upload through the ASGI interface, reading the file as the body goes out; returns the status."""
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"bench.csv\"\r\n"
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    length = len(head) + os.path.getsize(path) + len(tail)
+    f = open(path, "rb")
+    sent_head = sent_tail = False
+    status = 0
+
+    async def receive():
+        nonlocal sent_head, sent_tail
+        if not sent_head:
+            sent_head = True
+            return {"type": "http.request", "body": head, "more_body": True}
+        data = f.read(MESSAGE_SIZE)
+        if data:
+            return {"type": "http.request", "body": data, "more_body": True}
+        if not sent_tail:
+            sent_tail = True
+            return {"type": "http.request", "body": tail, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/admin/upload", "raw_path": b"/admin/upload", "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 1), "server": ("test", 80),
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            (b"content-length", str(length).encode()),
+        ],
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        f.close()
+    return status
+
+
+def buffered_app(upload_dir: Path):
+    """The former handler: the whole upload in memory, detected and written on the event loop."""
+    import uuid
+
+    from fastapi import BackgroundTasks, FastAPI, File, UploadFile
+    from magika import Magika
+
+    from app.utils.csv_index import ensure_csv_index
+
+    magika = Magika()
+    app = FastAPI()
+
+    @app.post("/admin/upload")
+    async def upload_excel(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+        file_bytes = await file.read()
+        result = magika.identify_bytes(file_bytes)
+        file_path = upload_dir / f"{uuid.uuid4()}{Path(file.filename).suffix}"
+        with open(file_path, "wb") as out:
+            out.write(file_bytes)
+        background_tasks.add_task(ensure_csv_index, file_path)
+        return {"saved_as": file_path.name, "mime_type": result.output.mime_type}
+
+    return app
+
+
+def streaming_app(upload_dir: Path):
+    from app.api.routes import admin
+    from app.utils.auth import get_admin_user
+    from server.app import app
+
+    admin.UPLOAD_DIR = upload_dir
+    app.dependency_overrides[get_admin_user] = lambda: None
+    return app
+
+
+async def run_mode(mode: str, path: Path, concurrency: int) -> None:
+    upload_dir = Path(tempfile.mkdtemp())
+    try:
+        app = (buffered_app if mode == "buffered" else streaming_app)(upload_dir)
+        small = upload_dir / "warmup.csv"
+        small.write_text("id,name\n" + "".join(f"{i},name {i}\n" for i in range(200)))
+        await post(app, small)  # Warm-up: imports, Magika session, threadpool
+        small.unlink()
+        for saved in upload_dir.iterdir():
+            saved.unlink()
+        baseline = peak_rss_mb()
+
+        stall = 0.0
+        running = True
+
+        async def ticker():
+            nonlocal stall
+            while running:
+                before = time.perf_counter()
+                await asyncio.sleep(0.005)
+                stall = max(stall, time.perf_counter() - before - 0.005)
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(post(app, path) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        running = False
+        await ticking
+        assert statuses == [200] * concurrency, statuses
+        print(
+            f"{mode:<9} peak RSS +{peak_rss_mb() - baseline:7.1f} MB, longest loop stall {stall * 1000:7.1f} ms, "
+            f"{concurrency} uploads in {elapsed:.2f}s"
+        )
+    finally:
+        shutil.rmtree(upload_dir)
+
+
+def main(size_mb: int, concurrency: int) -> None:
+    path = Path(tempfile.mkdtemp()) / "bench.csv"
+    write_csv(path, size_mb)
+    print(f"{os.path.getsize(path) / 1e6:.0f} MB CSV, {concurrency} concurrent uploads")
+    for mode in ("buffered", "streaming"):
+        # A fresh process per mode: peak RSS never goes down
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_upload_memory", "--mode", mode, str(path), str(concurrency)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--mode":
+        asyncio.run(run_mode(args[1], Path(args[2]), int(args[3])))
+    else:
+        main(
+            int(args[0]) if len(args) > 0 else 100,
+            int(args[1]) if len(args) > 1 else 4,
+        )
@@ -2,12 +2,18 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from loguru import logger
-from app.db.db import create_db, engine
+from app.db.db import create_db, engine, read_engine
 from app.api.routes.task import router as task_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.admin import router as admin_router
 from contextlib import asynccontextmanager
 from app.core.settings import settings
+from app.core.file_detection import file_type_detector
+from app.core.hashing import password_hashing
+from app.core.login_recorder import login_attempt_recorder
+from app.core.maintenance import maintenance_scheduler
+from app.core.task_events import task_events
+from app.core.server_timing import ServerTimingMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -18,9 +24,22 @@ async def lifespan(app: FastAPI):
     logger.info("Starting server")
     if settings.ENV != "test":
         await create_db()
+    await login_attempt_recorder.start()
+    await task_events.start()
+    if settings.MAINTENANCE_ENABLED:
+        await maintenance_scheduler.start()
+    if settings.FILE_DETECTION_WARM_UP:
+        file_type_detector.warm_up()
     yield
     logger.info("Stopping server")
+    await maintenance_scheduler.stop()
+    await task_events.stop()
+    await login_attempt_recorder.stop()
+    password_hashing.shutdown()
+    await file_type_detector.stop()
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 # Initialize rate limiter
@@ -33,6 +52,9 @@ app = FastAPI(title="User task management API",
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
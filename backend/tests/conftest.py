@@ -1,6 +1,7 @@
 from httpx import ASGITransport
 from sqlalchemy.orm import sessionmaker
 import pytest
+from sqlalchemy import event
 from httpx import AsyncClient
 import jwt
 from datetime import datetime, timezone, timedelta, date
@@ -10,10 +11,15 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from server.app import app
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, create_access_token
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import response_cache
+from app.api.routes.auth import limiter
+from app.core.login_recorder import login_attempt_recorder
 from app.models.user import User as UserModel
 from app.models.task import Task as TaskModel
-from app.db.db import Base, get_session
+from app.db.db import Base, get_session, get_read_session
+from app.db.instrumentation import instrument_engine
 from app.core.settings import settings
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -22,6 +28,7 @@ engine_test = create_async_engine(
     echo=False,
     future=True,
 )
+instrument_engine(engine_test)
 
 AsyncSessionLocal = sessionmaker(
     bind=engine_test,
@@ -43,6 +50,27 @@ async def create_test_db():
     await engine_test.dispose()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    limiter.reset()
+    login_attempt_recorder.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
 @pytest.fixture
 async def db_session():
     async with engine_test.connect() as connection:
@@ -66,6 +94,7 @@ async def override_get_session(db_session):
         yield db_session
 
     app.dependency_overrides[get_session] = _override
+    app.dependency_overrides[get_read_session] = _override
     yield
     app.dependency_overrides.clear()
 
@@ -81,6 +110,26 @@ async def async_client(override_get_session):
         yield client
 
 
+@pytest.fixture
+async def expiring_session(db_session):
+    """Session in the test transaction that expires objects on commit, as AsyncSessionLocal does"""
+    async with AsyncSession(bind=db_session.bind, expire_on_commit=True) as session:
+        yield session
+
+
+@pytest.fixture
+async def expiring_client(expiring_session):
+    """Client whose routes get expiring_session: attributes read after a commit must be reloaded"""
+    async def _override():
+        yield expiring_session
+
+    app.dependency_overrides[get_session] = _override
+    app.dependency_overrides[get_read_session] = _override
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
 @pytest.fixture
 async def auth_client_user(async_client, jwt_token_user):
     token = await jwt_token_user()
@@ -147,3 +196,28 @@ async def jwt_token_user():
         )
 
     return _create_token
+
+
+@pytest.fixture
+async def access_token_user():
+    """Access token as issued by /auth/token"""
+    async def _create_token(sub: str, role: str = "user"):
+        return create_access_token(
+            data={"sub": sub, "role": role},
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+
+    return _create_token
+
+
+@pytest.fixture
+def sql_statements():
+    """Statements sent to the test database while the fixture is active"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine_test.sync_engine, "before_cursor_execute", _record)
@@ -39,4 +39,232 @@ async def test_login_call(async_client: AsyncClient, create_user_with_task):
     assert "role" in payload
 
     # You can also check expiration exists
-    assert "exp" in payload
\ No newline at end of file
+    assert "exp" in payload
+
+async def test_me_uses_principal_cache(async_client: AsyncClient, create_user_with_task, access_token_user, db_session):
+    from app.core.principal_cache import principal_cache
+    from app.db.user import put_user_role
+
+    user, task = await create_user_with_task(role="user")
+    token = await access_token_user(user.username)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["role"] == "user"
+    misses = principal_cache.metrics()["misses"]
+
+    response = await async_client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert principal_cache.metrics()["misses"] == misses
+    assert principal_cache.metrics()["hits"] >= 1
+
+    # Role change must be visible on the next request
+    assert await put_user_role(db_session, user.id, "admin")
+    response = await async_client.get("/auth/me", headers=headers)
+    assert response.json()["role"] == "admin"
+
+
+async def test_user_updates_with_a_session_expiring_on_commit(expiring_client: AsyncClient, expiring_session, create_user_with_task, access_token_user):
+    from app.db.user import put_user_pw, put_user_role, put_user_disabled, delete_user
+
+    user, task = await create_user_with_task(role="user")
+    user_id = user.id
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    assert (await expiring_client.get("/auth/me", headers=headers)).json()["role"] == "user"
+
+    assert await put_user_role(expiring_session, user_id, "admin")
+    assert (await expiring_client.get("/auth/me", headers=headers)).json()["role"] == "admin"
+    assert await put_user_pw(expiring_session, user_id, "new-hash")
+    assert await put_user_disabled(expiring_session, user_id, True)
+    assert (await expiring_client.get("/auth/me", headers=headers)).json()["disabled"] is True
+    assert await delete_user(expiring_session, user_id)
+
+
+async def test_failed_login_is_recorded_and_counted(async_client: AsyncClient, create_user_with_task, db_session):
+    from sqlalchemy import select, func
+    from app.models.login_attempts import LoginAttempt
+    from app.core.login_recorder import login_attempt_recorder
+
+    user, task = await create_user_with_task()
+    response = await async_client.post(
+        "/auth/token",
+        data={"username": user.username, "password": "WrongPassword1!"}
+    )
+    assert response.status_code == 401
+
+    await db_session.refresh(user)
+    assert user.failed_login_attempts == 1
+    assert await login_attempt_recorder.flush(db_session) == 1
+    attempts = await db_session.scalar(
+        select(func.count(LoginAttempt.id)).where(LoginAttempt.username == user.username, LoginAttempt.success == 0)
+    )
+    assert attempts == 1
+
+
+async def test_login_is_single_commit_without_token_cleanup(async_client: AsyncClient, create_user_with_task, db_session):
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import select, event
+    from app.models.refresh_tokens import RefreshToken
+
+    user, task = await create_user_with_task()
+    expired = datetime.now(timezone.utc) - timedelta(days=1)
+    db_session.add_all(
+        RefreshToken(user_id=user.id, token_hash=f"expired-{i}", expires_at=expired) for i in range(3)
+    )
+    await db_session.flush()
+
+    commits = []
+    listener = lambda *args: commits.append(1)
+    event.listen(db_session.sync_session, "after_commit", listener)
+    try:
+        response = await async_client.post(
+            "/auth/token",
+            data={"username": user.username, "password": "password123!"}
+        )
+    finally:
+        event.remove(db_session.sync_session, "after_commit", listener)
+
+    assert response.status_code == 200
+    assert len(commits) == 1
+    # Expired tokens are left to the maintenance scheduler
+    tokens = (await db_session.scalars(select(RefreshToken).where(RefreshToken.user_id == user.id))).all()
+    assert len(tokens) == 4
+
+
+async def test_maintenance_purges_in_chunks(create_user_with_task, db_session):
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import select
+    from app.models.refresh_tokens import RefreshToken
+    from app.models.login_attempts import LoginAttempt
+    from app.core.lockout import cleanup_old_login_attempts
+    from app.core.maintenance import MaintenanceScheduler, purge_expired_refresh_tokens
+
+    user, task = await create_user_with_task()
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        RefreshToken(user_id=user.id, token_hash=f"expired-{i}", expires_at=now - timedelta(days=1)) for i in range(5)
+    )
+    db_session.add(RefreshToken(user_id=user.id, token_hash="live", expires_at=now + timedelta(days=1)))
+    db_session.add_all(
+        LoginAttempt(username=user.username, success=0, attempted_at=now - timedelta(days=40)) for _ in range(3)
+    )
+    db_session.add(LoginAttempt(username=user.username, success=1, attempted_at=now))
+    await db_session.flush()
+
+    scheduler = MaintenanceScheduler()
+    scheduler.add_job("tokens", lambda db: purge_expired_refresh_tokens(db, chunk_size=2), 3600)
+    scheduler.add_job("attempts", lambda db: cleanup_old_login_attempts(db, days=30, chunk_size=2), 3600)
+
+    run = await scheduler.run_job("tokens", db_session)
+    assert run.error is None
+    assert run.rows_removed == 5
+    run = await scheduler.run_job("attempts", db_session)
+    assert run.rows_removed == 3
+    assert scheduler.metrics()["tokens"]["last_run"]["rows_removed"] == 5
+
+    tokens = (await db_session.scalars(select(RefreshToken.token_hash).where(RefreshToken.user_id == user.id))).all()
+    assert tokens == ["live"]
+    attempts = (await db_session.scalars(select(LoginAttempt).where(LoginAttempt.username == user.username))).all()
+    assert len(attempts) == 1
+
+
+async def test_login_attempt_recorder_batches_and_drops(db_session):
+    from sqlalchemy import select, func
+    from app.models.login_attempts import LoginAttempt
+    from app.core.login_recorder import LoginAttemptRecorder
+
+    recorder = LoginAttemptRecorder(max_queue=5, batch_size=2)
+    for i in range(7):
+        recorder.record("storm", False, "10.0.0.1")
+
+    assert await recorder.flush(db_session) == 5
+    metrics = recorder.metrics()
+    assert metrics["dropped"] == 2
+    assert metrics["batches"] == 3
+    assert metrics["pending"] == 0
+    count = await db_session.scalar(select(func.count(LoginAttempt.id)).where(LoginAttempt.username == "storm"))
+    assert count == 5
+
+
+async def test_login_attempt_recorder_stop_waits_for_a_running_flush(db_session):
+    import asyncio
+    from contextlib import asynccontextmanager
+    from sqlalchemy import select, func
+    from app.models.login_attempts import LoginAttempt
+    from app.core.login_recorder import LoginAttemptRecorder
+
+    writing = asyncio.Event()
+
+    class SlowSession:
+        async def execute(self, statement):
+            writing.set()
+            await asyncio.sleep(0.05)
+            return await db_session.execute(statement)
+
+        async def commit(self):
+            await db_session.commit()
+
+        async def rollback(self):
+            await db_session.rollback()
+
+    @asynccontextmanager
+    async def slow_session():
+        yield SlowSession()
+
+    recorder = LoginAttemptRecorder(session_factory=slow_session, batch_size=5, flush_interval=60)
+    await recorder.start()
+    for i in range(5):
+        recorder.record("stopping", False, "10.0.0.1")
+    await writing.wait()
+    await recorder.stop()
+
+    metrics = recorder.metrics()
+    assert (metrics["flushed"], metrics["dropped"], metrics["failed"], metrics["pending"]) == (5, 0, 0, 0)
+    count = await db_session.scalar(select(func.count(LoginAttempt.id)).where(LoginAttempt.username == "stopping"))
+    assert count == 5
+
+
+async def test_refresh_token_reuse_revokes_all_sessions_in_one_statement(async_client: AsyncClient, create_user_with_task, db_session, sql_statements):
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import select
+    from app.core.security import hash_token
+    from app.models.refresh_tokens import RefreshToken
+
+    user, task = await create_user_with_task()
+    now = datetime.now(timezone.utc)
+    db_session.add(RefreshToken(user_id=user.id, token_hash=hash_token("reused"), expires_at=now + timedelta(days=1), revoked_at=now))
+    db_session.add_all(
+        RefreshToken(user_id=user.id, token_hash=f"active-{i}", expires_at=now + timedelta(days=1)) for i in range(5)
+    )
+    await db_session.flush()
+
+    async_client.cookies.update({"refresh_token": "reused", "csrf_token": "c"})
+    sql_statements.clear()
+    response = await async_client.post("/auth/refresh", headers={"X-CSRF-Token": "c"})
+    assert response.status_code == 401
+    assert sum(s.startswith("UPDATE refresh_tokens") for s in sql_statements) == 1
+    active = (await db_session.scalars(
+        select(RefreshToken).where(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None))
+    )).all()
+    assert active == []
+
+
+async def test_login_outcomes_with_a_session_expiring_on_commit(expiring_client: AsyncClient, create_user_with_task, db_session):
+    user, task = await create_user_with_task()
+
+    response = await expiring_client.post("/auth/token", data={"username": user.username, "password": "WrongPassword1!"})
+    assert response.status_code == 401
+    response = await expiring_client.post("/auth/token", data={"username": user.username, "password": "password123!"})
+    assert response.status_code == 200
+    assert "refresh_token" in response.cookies
+
+    expiring_client.cookies.update({"refresh_token": response.cookies["refresh_token"], "csrf_token": "c"})
+    response = await expiring_client.post("/auth/refresh", headers={"X-CSRF-Token": "c"})
+    assert response.status_code == 200
+    assert jwt.decode(response.json()["access_token"], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["sub"] == user.username
+
+    user.failed_login_attempts = 4
+    await db_session.flush()
+    response = await expiring_client.post("/auth/token", data={"username": user.username, "password": "WrongPassword1!"})
+    assert response.status_code == 423
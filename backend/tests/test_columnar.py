@@ -0,0 +1,127 @@
+import datetime
+import os
+
+import pytest
+
+from app.utils.columnar import UnknownColumnError, build_columnar_cache, cache_path, open_columnar_page
+from app.utils.csv_index import read_csv_page
+from tests.test_csv_index import TRICKY_CSV
+
+
+def read_page(path, page, page_size, columns=None):
+    csv_page = open_columnar_page(path, page, page_size, columns)
+    return csv_page.headers, [row for chunk in csv_page.chunks(rows_per_chunk=2) for row in chunk], csv_page.total_rows
+
+
+def test_pages_match_the_csv_parse(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes((TRICKY_CSV + "\r\n" + "".join(f'{i},"row\r\n{i}",{i * 0.5}\r\n' for i in range(50))).encode())
+
+    for page, page_size in ((1, 1), (1, 7), (3, 7), (8, 7), (100, 10)):
+        assert read_page(path, page, page_size) == read_csv_page(path, page, page_size)
+
+
+def test_columns_are_typed_only_when_the_text_round_trips(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,code,amount,ratio,label\n1,007,2.50,0.5,x\n-2,8,3,1e-05,\n30,9,4,2,z\n")
+    manifest = build_columnar_cache(path)
+    assert [column["type"] for column in manifest["columns"]] == ["int", "str", "str", "float", "str"]
+    assert read_page(path, 1, 10)[1] == [["1", "007", "2.50", "0.5", "x"], ["-2", "8", "3", "1e-05", ""], ["30", "9", "4", "2", "z"]]
+
+
+def test_values_containing_the_separator(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\nx\x1fy,plain\n,z\n", encoding="utf-8")
+    manifest = build_columnar_cache(path)
+    assert [column["split"] for column in manifest["columns"]] == [False, True]
+    assert read_page(path, 1, 10)[1] == [["x\x1fy", "plain"], ["", "z"]]
+
+
+def test_column_projection(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,name,amount\n1,a,10\n2\n3,c,30,extra\n")
+    assert read_page(path, 1, 10, ["amount", "id"]) == (["amount", "id"], [["10", "1"], ["", "2"], ["30", "3"]], 3)
+    # Unprojected rows keep their own length
+    assert read_page(path, 1, 10)[1] == [["1", "a", "10"], ["2"], ["3", "c", "30", "extra"]]
+    with pytest.raises(UnknownColumnError):
+        open_columnar_page(path, 1, 10, ["missing"])
+
+
+def test_cache_is_rebuilt_when_the_file_changes(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    assert read_page(path, 1, 10)[2] == 1
+    built_at = (cache_path(path) / "manifest.json").stat().st_mtime_ns
+
+    path.write_text("a,b\n1,2\nx,y\n")
+    os.utime(path, ns=(built_at + 10**9, built_at + 10**9))
+    assert read_page(path, 1, 10) == (["a", "b"], [["1", "2"], ["x", "y"]], 2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.csv", "data.csv.cols"]
+
+
+def test_wide_files_need_a_few_file_descriptors(tmp_path):
+    resource = pytest.importorskip("resource")
+    path = tmp_path / "wide.csv"
+    width = 600
+    header = ",".join(f"c{i}" for i in range(width))
+    rows = [",".join(str(r * i) if i % 3 == 0 else f"{r}.5" if i % 3 == 1 else f"v{r}-{i}" for i in range(width)) for r in range(20)]
+    path.write_text("\n".join([header] + rows) + "\n")
+
+    # Far fewer descriptors than columns; they would run out with one mapped file per column
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (len(os.listdir("/proc/self/fd")) + 32, hard))
+    try:
+        assert read_page(path, 2, 7) == read_csv_page(path, 2, 7)
+        assert read_page(path, 1, 5, ["c599", "c1", "c0"])[1][4] == ["v4-599", "4.5", "0"]
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert sorted(p.name for p in cache_path(path).iterdir()) == [
+        "manifest.json", "offsets.npy", "row_lengths.npy", "text.npy", "values.npy",
+    ]
+
+
+def write_xlsx(path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "name", "amount", "due"])
+    sheet.append([1, "first", 1.5, datetime.date(2024, 1, 2)])
+    sheet.append([2, None, 3.0, None])
+    workbook.save(path)
+
+
+def test_xlsx_pages(tmp_path):
+    path = tmp_path / "book.xlsx"
+    write_xlsx(path)
+    assert [column["type"] for column in build_columnar_cache(path)["columns"]] == ["int", "str", "float", "str"]
+    assert read_page(path, 1, 10) == (
+        ["id", "name", "amount", "due"],
+        [["1", "first", "1.5", "2024-01-02T00:00:00"], ["2", "", "3"]],
+        2,
+    )
+
+
+async def test_csv_data_route_reads_the_columnar_cache(async_client, create_user_with_task, access_token_user, tmp_path, monkeypatch):
+    from app.api.routes import admin
+
+    monkeypatch.setattr(admin, "UPLOAD_DIR", tmp_path)
+    write_xlsx(tmp_path / "book.xlsx")
+    (tmp_path / "data.csv").write_bytes(TRICKY_CSV.encode())
+    user, _ = await create_user_with_task(role="admin")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username, role='admin')}"}
+
+    response = await async_client.get("/admin/csv-data/book.xlsx?columns=name&columns=id", headers=headers)
+    data = response.json()
+    assert data["headers"] == ["name", "id"]
+    assert data["data"] == [["first", "1"], ["", "2"]]
+    assert data["total_rows"] == 2
+
+    response = await async_client.get("/admin/csv-data/data.csv?page=2&page_size=2", headers=headers)
+    assert response.json()["data"] == [['escaped "quotes"', "ünïcode 🚀", "3"], []]
+    assert cache_path(tmp_path / "data.csv").is_dir()
+
+    response = await async_client.get("/admin/csv-data/data.csv?columns=nope", headers=headers)
+    assert response.status_code == 400
+
+    response = await async_client.get("/admin/csv-files", headers=headers)
+    assert sorted(f["filename"] for f in response.json()["files"]) == ["book.xlsx", "data.csv"]
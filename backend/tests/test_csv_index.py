@@ -0,0 +1,95 @@
+import csv
+import io
+import os
+
+from app.utils.csv_index import ensure_csv_index, index_path, read_csv_page
+
+TRICKY_CSV = (
+    'name,notes,amount\r\n'
+    'plain,simple,1\r\n'
+    '"quoted, comma","multi\r\nline\r\nfield",2\r\n'
+    '"escaped ""quotes""","ünïcode 🚀",3\r\n'
+    '\r\n'
+    'lf only,"a\nb",4\n'
+    'last,"no newline at end",5'
+)
+
+
+def full_parse(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    return rows[0], rows[1:]
+
+
+def test_pages_match_a_full_parse(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(TRICKY_CSV.encode())
+    headers, rows = full_parse(path)
+
+    for page_size in (1, 2, 3, 10):
+        pages = []
+        page = 1
+        while True:
+            page_headers, page_rows, total = read_csv_page(path, page, page_size)
+            assert page_headers == headers
+            assert total == len(rows) == 6
+            if not page_rows:
+                break
+            pages.extend(page_rows)
+            page += 1
+        assert pages == rows
+
+    assert read_csv_page(path, 100, 10)[1] == []
+
+
+def test_index_is_rebuilt_when_the_file_changes(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    assert ensure_csv_index(path) == 1
+    built_at = index_path(path).stat().st_mtime_ns
+
+    # Up to date: not rebuilt
+    assert ensure_csv_index(path) == 1
+    assert index_path(path).stat().st_mtime_ns == built_at
+
+    path.write_text('a,b\n1,2\n3,"4\n5"\n')
+    os.utime(path, ns=(built_at + 10**9, built_at + 10**9))
+    assert read_csv_page(path, 1, 10)[1:] == ([["1", "2"], ["3", "4\n5"]], 2)
+
+
+async def test_csv_data_route_reads_pages_through_the_index(async_client, create_user_with_task, access_token_user, tmp_path, monkeypatch):
+    from app.api.routes import admin
+
+    monkeypatch.setattr(admin, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(admin.settings, "UPLOAD_COLUMNAR_CACHE", False)
+    (tmp_path / "data.csv").write_bytes(TRICKY_CSV.encode())
+    user, _ = await create_user_with_task(role="admin")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username, role='admin')}"}
+
+    response = await async_client.get("/admin/csv-data/data.csv?page=2&page_size=2", headers=headers)
+    data = response.json()
+    assert data["headers"] == ["name", "notes", "amount"]
+    assert data["total_rows"] == 6
+    assert data["data"] == [['escaped "quotes"', "ünïcode 🚀", "3"], []]
+    assert index_path(tmp_path / "data.csv").exists()
+
+    response = await async_client.get("/admin/csv-files", headers=headers)
+    assert [f["filename"] for f in response.json()["files"]] == ["data.csv"]
+
+
+def test_streamed_page_is_byte_identical_to_the_model(tmp_path):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.api.routes.admin import csv_page_json
+    from app.api.schema.admin import CSVDataResponse
+    from app.utils.csv_index import open_csv_page
+
+    path = tmp_path / "data.csv"
+    path.write_bytes((TRICKY_CSV + "\r\n" + "".join(f'{i},"row\r\n{i}",{i}\r\n' for i in range(1200))).encode())
+    for page, page_size in ((1, 1000), (2, 1000), (9, 1000)):
+        headers, rows, total = read_csv_page(path, page, page_size)
+        expected = JSONResponse(content=jsonable_encoder(CSVDataResponse(
+            headers=headers, data=rows, total_rows=total, page=page, page_size=page_size, success=True
+        ))).body
+        assert b"".join(csv_page_json(open_csv_page(path, page, page_size), page, page_size)) == expected
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.settings import settings
+from app.db import db as db_module
+from app.db.db import create_db_engine, create_read_engine, sqlite_pragmas
+
+
+async def test_sqlite_profile_is_applied_to_new_connections(tmp_path):
+    engine = create_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+    try:
+        async with engine.connect() as conn:
+            pragma = lambda name: conn.execute(text(f"PRAGMA {name}"))
+            assert (await pragma("journal_mode")).scalar() == "wal"
+            assert (await pragma("synchronous")).scalar() == 1  # NORMAL
+            assert (await pragma("busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert (await pragma("cache_size")).scalar() == settings.SQLITE_CACHE_SIZE
+            assert (await pragma("temp_store")).scalar() == 2  # MEMORY
+        assert engine.pool.size() == settings.DATABASE_POOL_SIZE
+    finally:
+        await engine.dispose()
+
+
+def test_unset_pragmas_keep_sqlite_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_JOURNAL_MODE", None)
+    monkeypatch.setattr(settings, "SQLITE_MMAP_SIZE", None)
+    pragmas = sqlite_pragmas()
+    assert pragmas[0].startswith("PRAGMA busy_timeout")
+    assert not any("journal_mode" in p or "mmap_size" in p for p in pragmas)
+
+
+async def test_read_engine_sees_commits_and_refuses_writes(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'read.db'}"
+    engine = create_db_engine(url)
+    read_engine = create_db_engine(url, read_only=True)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            await conn.execute(text("INSERT INTO items VALUES (1)"))
+        async with read_engine.connect() as conn:
+            assert (await conn.execute(text("SELECT count(*) FROM items"))).scalar() == 1
+            with pytest.raises(OperationalError, match="readonly"):
+                await conn.execute(text("INSERT INTO items VALUES (2)"))
+    finally:
+        await read_engine.dispose()
+        await engine.dispose()
+
+
+def test_in_memory_database_shares_the_primary_engine(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    assert create_read_engine(None) is db_module.engine
+
+
+def test_task_reads_use_the_read_pool():
+    from fastapi.routing import APIRoute
+    from server.app import app
+    from app.db.db import get_read_session, get_session
+
+    reads = {"/tasks/", "/tasks/calendar", "/tasks/changes", "/tasks/search", "/tasks/export"}
+    routes = [route for route in app.routes if isinstance(route, APIRoute) and route.path in reads and "GET" in route.methods]
+    assert {route.path for route in routes} == reads
+    for route in routes:
+        calls = {dependency.call for dependency in route.dependant.dependencies}
+        assert get_read_session in calls and get_session not in calls, route.path
@@ -0,0 +1,59 @@
+from collections import namedtuple
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.schema.task import TaskElement, TaskListResponse, TaskResponse
+from app.core.response_cache import response_cache
+from app.core.settings import settings
+from app.utils.fast_json import dump_task, dump_task_list
+
+Row = namedtuple("Row", "id task date")
+
+TRICKY_TASKS = [
+    Row(1, "plain", date(2025, 1, 1)),
+    Row(2, 'quotes " and \\ backslashes', date(1999, 12, 31)),
+    Row(3, "control \x00\x1f\t\n\r chars", date(2025, 2, 28)),
+    Row(4, "unicode é ü 中文 \U0001f680 \u2028 \u2029 \ud7ff", date(2024, 2, 29)),
+    Row(5, "", date(1, 1, 1)),
+]
+
+
+def test_task_list_is_byte_identical_to_the_models():
+    page = dict(total=42, page=3, page_size=5, total_pages=9, next_cursor="abc")
+    fast = dump_task_list(TRICKY_TASKS, **page)
+
+    model = TaskListResponse(success=True, tasks=[TaskElement.model_validate(t) for t in TRICKY_TASKS], **page)
+    assert fast == model.model_dump_json().encode()
+    # What FastAPI renders for a route returning the model
+    assert fast == JSONResponse(content=jsonable_encoder(model)).body
+
+    empty = TaskListResponse(success=True, tasks=[])
+    assert dump_task_list([]) == empty.model_dump_json().encode()
+
+
+def test_task_is_byte_identical_to_the_model():
+    for task in TRICKY_TASKS:
+        model = TaskResponse(success=True, task=TaskElement.model_validate(task))
+        assert dump_task(task) == model.model_dump_json().encode()
+        assert dump_task(task) == JSONResponse(content=jsonable_encoder(model)).body
+
+
+async def test_routes_match_with_and_without_fast_json(async_client, create_user_with_task, access_token_user, monkeypatch):
+    user, task = await create_user_with_task(task_desc='tricky "ünïcode" \\ 🚀')
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    urls = ["/tasks/?page_size=5", f"/tasks/{task.id}", "/tasks/search?q=tricky"]
+
+    bodies = {}
+    for fast in (True, False):
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", fast)
+        response_cache.clear()
+        for url in urls:
+            response = await async_client.get(url, headers=headers)
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/json"
+            bodies[fast, url] = response.content
+    for url in urls:
+        assert bodies[True, url] == bodies[False, url]
+    assert task.task.encode()[:6] in bodies[True, "/tasks/search?q=tricky"]
@@ -0,0 +1,60 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import magika
+
+from app.core.file_detection import FileTypeDetector
+
+
+def test_app_import_does_not_load_magika():
+    code = "import sys, server.app; assert 'magika' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1])
+
+
+async def test_model_is_loaded_once_by_warm_up_or_first_use(tmp_path, monkeypatch):
+    detector = FileTypeDetector(max_concurrency=2)
+    loads = []
+
+    class CountingMagika(magika.Magika):
+        def __init__(self):
+            loads.append(threading.current_thread().name)
+            super().__init__()
+
+    monkeypatch.setattr(magika, "Magika", CountingMagika)
+    path = tmp_path / "data.csv"
+    path.write_text("id,name,amount\n" + "".join(f"{i},customer {i},{i * 1.5:.2f}\n" for i in range(200)))
+
+    detector.warm_up()
+    assert not detector.loaded  # Still loading in the background
+    results = await asyncio.gather(*(detector.identify_path(path) for _ in range(3)))
+    assert [r.output.mime_type for r in results] == ["text/csv"] * 3
+    assert detector.loaded
+    assert len(loads) == 1 and loads[0].startswith("magika")
+    assert detector.metrics()["completed"] == 3
+    await detector.stop()
+
+
+async def test_detections_are_capped(monkeypatch):
+    detector = FileTypeDetector(max_concurrency=2)
+    running = peak = 0
+    lock = threading.Lock()
+
+    def slow_identify(path):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return path
+
+    monkeypatch.setattr(detector, "_identify_path", slow_identify)
+    assert await asyncio.gather(*(detector.identify_path(i) for i in range(6))) == list(range(6))
+    assert peak == 2
+    assert not detector.loaded
+    await detector.stop()
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.core.hashing import PasswordHashingService
+
+
+async def test_hash_and_verify_on_pool():
+    service = PasswordHashingService(max_workers=1, max_queue=1)
+    try:
+        hashed = await service.hash("TestPassword123!")
+        assert await service.verify("TestPassword123!", hashed)
+        assert not await service.verify("WrongPassword", hashed)
+        metrics = service.metrics()
+        assert metrics["completed"] == 3
+        assert metrics["in_flight"] == 0
+    finally:
+        service.shutdown()
+
+
+async def test_reject_policy_returns_503_when_saturated():
+    service = PasswordHashingService(max_workers=1, max_queue=0, backpressure="reject")
+    try:
+        results = await asyncio.gather(
+            service.hash("TestPassword123!"),
+            service.hash("TestPassword123!"),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, HTTPException)]
+        assert len(errors) == 1
+        assert errors[0].status_code == 503
+        assert service.metrics()["rejected"] == 1
+    finally:
+        service.shutdown()
+
+
+async def test_wait_policy_queues_until_slot_frees():
+    service = PasswordHashingService(max_workers=1, max_queue=0, backpressure="wait", wait_timeout=30)
+    try:
+        results = await asyncio.gather(*(service.hash("TestPassword123!") for _ in range(3)))
+        assert len(results) == 3
+        assert service.metrics()["rejected"] == 0
+        assert service.metrics()["peak_in_flight"] == 1
+    finally:
+        service.shutdown()
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        PasswordHashingService(backpressure="drop")
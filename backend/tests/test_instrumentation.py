@@ -0,0 +1,43 @@
+from loguru import logger
+
+from app.core.settings import settings
+from app.db.instrumentation import normalize_sql
+
+
+def test_normalize_sql_groups_statements_by_shape():
+    statement = """SELECT tasks.id FROM tasks
+        WHERE tasks.user_id = 42 AND tasks.task = 'it''s' AND tasks.id IN (?, ?, ?) LIMIT ? OFFSET 10"""
+    assert normalize_sql(statement) == (
+        "SELECT tasks.id FROM tasks WHERE tasks.user_id = ? AND tasks.task = ? "
+        "AND tasks.id IN (?, ...) LIMIT ? OFFSET ?"
+    )
+    # Digits inside identifiers are kept
+    assert normalize_sql("SELECT bm25(tasks_fts, 1.0, 0.0) FROM t2") == "SELECT bm25(tasks_fts, ?, ?) FROM t2"
+
+
+async def test_server_timing_reports_request_statements(async_client, create_user_with_task, access_token_user, sql_statements):
+    user, task = await create_user_with_task()
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    await async_client.get("/auth/me", headers=headers)
+
+    sql_statements.clear()
+    response = await async_client.get(f"/tasks/{task.id}", headers=headers)
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert f'desc="{len(sql_statements)} queries"' in timing
+    assert ", app;dur=" in timing
+
+
+async def test_slow_statements_are_logged(async_client, create_user_with_task, access_token_user, monkeypatch):
+    user, task = await create_user_with_task()
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(settings, "SQL_REQUEST_QUERY_WARNING", 0)
+    messages = []
+    sink = logger.add(messages.append, level="WARNING", format="{message}")
+    try:
+        await async_client.get(f"/tasks/{task.id}", headers=headers)
+    finally:
+        logger.remove(sink)
+    assert any(m.startswith("Slow query") and "WHERE tasks.id = ?" in m for m in messages)
+    assert any(f"GET /tasks/{task.id} issued" in m for m in messages)
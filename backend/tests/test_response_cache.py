@@ -0,0 +1,41 @@
+from app.core.response_cache import MemoryResponseCache, ResponseCache, create_response_cache
+
+
+def test_memory_cache_is_bounded_by_bytes():
+    cache = MemoryResponseCache(max_bytes=10)
+    cache.set(1, "a", b"1234")
+    cache.set(1, "b", b"1234")
+    assert cache.get(1, "a") == b"1234"  # "b" is now least recently used
+    cache.set(2, "c", b"1234")
+
+    assert cache.get(1, "b") is None
+    assert cache.get(1, "a") == b"1234"
+    metrics = cache.metrics()
+    assert metrics["bytes"] == 8
+    assert metrics["evictions"] == 1
+
+    # Bodies larger than the whole cache are not stored
+    cache.set(3, "d", b"x" * 11)
+    assert cache.get(3, "d") is None
+    assert cache.metrics()["entries"] == 2
+
+
+def test_memory_cache_invalidates_one_user():
+    cache = MemoryResponseCache(max_bytes=1024)
+    cache.set(1, "a", b"one")
+    cache.set(1, "b", b"one")
+    cache.set(2, "a", b"two")
+
+    cache.invalidate_user(1)
+
+    assert cache.get(1, "a") is None
+    assert cache.get(1, "b") is None
+    assert cache.get(2, "a") == b"two"
+    assert cache.metrics()["bytes"] == 3
+
+
+def test_null_backend_caches_nothing():
+    cache = create_response_cache("none", 1024)
+    assert type(cache) is ResponseCache
+    cache.set(1, "a", b"x")
+    assert cache.get(1, "a") is None
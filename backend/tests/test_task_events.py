@@ -0,0 +1,135 @@
+import asyncio
+
+from app.core.task_events import RESET, TaskEvent, TaskEventHub
+
+
+async def next_event(hub, subscription, heartbeat_seconds=1.0):
+    return await anext(hub.events(subscription, heartbeat_seconds))
+
+
+async def test_hub_fans_out_per_user():
+    hub = TaskEventHub()
+    mine = await hub.subscribe(1)
+    also_mine = await hub.subscribe(1)
+    theirs = await hub.subscribe(2)
+
+    await hub.publish(1, TaskEvent(id=1, type="created", tasks=[{"id": 10}]))
+
+    assert (await next_event(hub, mine)).tasks == [{"id": 10}]
+    assert (await next_event(hub, also_mine)).id == 1
+    assert theirs.queue.empty()
+    # Nothing pending: a heartbeat
+    assert await next_event(hub, theirs, heartbeat_seconds=0.01) is None
+
+    hub.unsubscribe(mine)
+    assert hub.metrics()["connections"] == 2
+
+
+async def test_hub_resumes_from_last_event_id():
+    hub = TaskEventHub(history_size=3)
+    for version in range(1, 6):
+        await hub.publish(1, TaskEvent(id=version, type="updated"))
+
+    # Events 4 and 5 are still in the history
+    subscription = await hub.subscribe(1, last_event_id=3)
+    assert [subscription.queue.get_nowait().id for _ in range(2)] == [4, 5]
+    assert subscription.queue.empty()
+
+    # Event 2 has been dropped from the history: reset instead of a partial replay
+    subscription = await hub.subscribe(1, last_event_id=1)
+    event = subscription.queue.get_nowait()
+    assert (event.type, event.id) == (RESET, 5)
+
+    # A hub without history (e.g. restarted) still notices the client is behind
+    subscription = await TaskEventHub().subscribe(1, last_event_id=1, current_id=5)
+    assert subscription.queue.get_nowait().type == RESET
+    subscription = await TaskEventHub().subscribe(1, last_event_id=5, current_id=5)
+    assert subscription.queue.empty()
+
+
+async def test_slow_consumer_is_reset_not_buffered():
+    hub = TaskEventHub(max_queue=2)
+    slow = await hub.subscribe(1)
+    for version in range(1, 6):
+        await hub.publish(1, TaskEvent(id=version, type="updated"))
+
+    assert slow.queue.qsize() == 2
+    events = [event async for event in hub.events(slow, heartbeat_seconds=1.0)]
+    # The queued events, then a reset carrying the latest id; the stream ends
+    assert [(e.type, e.id) for e in events] == [("updated", 1), ("updated", 2), (RESET, 5)]
+    assert hub.metrics()["overflows"] == 1
+
+
+async def test_task_writes_publish_events(async_client, create_user_with_task, access_token_user):
+    from app.api.routes.task import sse_stream
+    from app.core.task_events import task_events
+
+    user, task = await create_user_with_task()
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    subscription = await task_events.subscribe(user.id)
+    try:
+        created = (await async_client.post("/tasks/", json={"desc": "new", "date": "2025-01-01"}, headers=headers)).json()["task"]
+        await async_client.put(f"/tasks/{created['id']}", json={"desc": "edited", "date": "2025-01-02"}, headers=headers)
+        await async_client.post("/tasks/bulk/delete", json=[created["id"], task.id], headers=headers)
+
+        events = [subscription.queue.get_nowait() for _ in range(3)]
+        assert [e.type for e in events] == ["created", "updated", "deleted"]
+        assert events[0].tasks == [{"id": created["id"], "task": "new", "date": "2025-01-01"}]
+        assert events[1].tasks[0]["task"] == "edited"
+        assert sorted(t["id"] for t in events[2].tasks) == sorted([created["id"], task.id])
+        # Ids are the collection versions, which the ETag carries too
+        etag = (await async_client.get("/tasks/", headers=headers)).headers["etag"]
+        assert etag == f'"{user.id}-{events[2].id}"'
+    finally:
+        task_events.unsubscribe(subscription)
+
+    # The SSE stream replays what a reconnecting client missed
+    stream = sse_stream(user.id, last_event_id=events[0].id, current_version=events[2].id)
+    chunks = [await anext(stream) for _ in range(3)]
+    await stream.aclose()
+    assert chunks[0].startswith(f"id: {events[0].id}\nevent: ready\n".encode())
+    assert chunks[1].startswith(f"id: {events[1].id}\nevent: updated\n".encode())
+    assert chunks[2].startswith(f"id: {events[2].id}\nevent: deleted\n".encode())
+    assert task_events.metrics()["connections"] == 0
+
+    # A fresh client also gets the writes committed after its version was read
+    stream = sse_stream(user.id, last_event_id=None, current_version=events[1].id)
+    chunks = [await anext(stream) for _ in range(2)]
+    await stream.aclose()
+    assert chunks[0].startswith(f"id: {events[1].id}\nevent: ready\n".encode())
+    assert chunks[1].startswith(f"id: {events[2].id}\nevent: deleted\n".encode())
+
+
+async def test_database_backend_shares_events_between_hubs(db_session):
+    from contextlib import asynccontextmanager
+    from app.core.task_events import DatabaseTaskEventBackend
+
+    @asynccontextmanager
+    async def session():
+        yield db_session
+
+    # Two workers' hubs; polled by hand instead of on a timer
+    writer = TaskEventHub(backend=DatabaseTaskEventBackend(session_factory=session, poll_interval=60))
+    reader_backend = DatabaseTaskEventBackend(session_factory=session, poll_interval=60)
+    reader = TaskEventHub(backend=reader_backend)
+    await writer.start()
+    await reader.start()
+    try:
+        subscription = await reader.subscribe(1)
+        await writer.publish(1, TaskEvent(id=7, type="created", tasks=[{"id": 10, "task": "café"}]))
+        await writer.publish(2, TaskEvent(id=3, type="deleted", tasks=[{"id": 11}]))
+        assert subscription.queue.empty()
+
+        assert await reader_backend.poll() == 2
+        event = subscription.queue.get_nowait()
+        assert (event.id, event.type, event.tasks) == (7, "created", [{"id": 10, "task": "café"}])
+        assert subscription.queue.empty()
+        assert await reader_backend.poll() == 0
+        # The other user's event is kept for resume
+        assert (await reader.subscribe(2, last_event_id=2)).queue.get_nowait().id == 3
+
+        reader_backend.retention_seconds = -1
+        assert await reader_backend.purge() == 2
+    finally:
+        await reader.stop()
+        await writer.stop()
@@ -63,4 +63,463 @@ async def test_get_task_with_token(
     data = response.json()
     assert data["task"]["task"] == task.task
     assert data["task"]["id"] == task.id
-    assert data["task"]["date"] == str(task.date)
\ No newline at end of file
+    assert data["task"]["date"] == str(task.date)
+
+async def test_cursor_pagination_walks_all_tasks(async_client, create_user_with_task, access_token_user, db_session):
+    from datetime import date
+    from app.models.task import Task as TaskModel
+
+    user, task = await create_user_with_task(task_date=date(2025, 1, 2))
+    # Same date on several rows exercises the id tie-breaker
+    db_session.add_all(
+        TaskModel(task=f"task {i}", date=date(2025, 1, 1 + i % 3), user_id=user.id) for i in range(6)
+    )
+    await db_session.flush()
+    token = await access_token_user(user.username)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    offset_ids = []
+    for page in (1, 2, 3):
+        response = await async_client.get("/tasks/", params={"page": page, "page_size": 3}, headers=headers)
+        offset_ids += [t["id"] for t in response.json()["tasks"]]
+
+    cursor_ids = []
+    cursor = None
+    while True:
+        params = {"page_size": 3}
+        if cursor:
+            params["cursor"] = cursor
+        data = (await async_client.get("/tasks/", params=params, headers=headers)).json()
+        assert data["success"]
+        cursor_ids += [t["id"] for t in data["tasks"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(cursor_ids) == 7
+    assert cursor_ids == offset_ids
+
+
+async def test_invalid_cursor_is_rejected(async_client, create_user_with_task, access_token_user):
+    user, task = await create_user_with_task()
+    token = await access_token_user(user.username)
+    response = await async_client.get(
+        "/tasks/", params={"cursor": "not a cursor"}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 400
+
+
+async def test_task_counter_follows_writes(async_client, create_user_with_task, access_token_user, db_session):
+    from app.db.task_stats import verify_task_counts, repair_task_counts
+
+    user, task = await create_user_with_task()
+    token = await access_token_user(user.username)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    created = []
+    for i in range(3):
+        response = await async_client.post("/tasks/", json={"desc": f"task {i}", "date": "2025-02-01"}, headers=headers)
+        created.append(response.json()["task"]["id"])
+    await async_client.delete(f"/tasks/{created[0]}", headers=headers)
+
+    data = (await async_client.get("/tasks/", params={"page_size": 2}, headers=headers)).json()
+    assert data["total"] == 3
+    assert data["total_pages"] == 2
+    assert all(user_id != user.id for user_id, _, _ in await verify_task_counts(db_session))
+
+    await repair_task_counts(db_session)
+    assert await verify_task_counts(db_session) == []
+
+
+async def test_bulk_create_update_delete(async_client, create_user_with_task, access_token_user):
+    user, task = await create_user_with_task()
+    other, other_task = await create_user_with_task(username="otheruser")
+    token = await access_token_user(user.username)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.post(
+        "/tasks/bulk",
+        json=[{"desc": f"bulk {i}", "date": f"2025-03-0{i + 1}"} for i in range(3)],
+        headers=headers,
+    )
+    data = response.json()
+    assert data["success"]
+    created = [r["task"]["id"] for r in data["results"]]
+    assert [r["task"]["task"] for r in data["results"]] == ["bulk 0", "bulk 1", "bulk 2"]
+
+    response = await async_client.put(
+        "/tasks/bulk",
+        json=[
+            {"id": created[0], "desc": "edited", "date": "2025-04-01"},
+            {"id": other_task.id, "desc": "hijack", "date": "2025-04-01"},
+            {"id": 999999, "desc": "missing", "date": "2025-04-01"},
+        ],
+        headers=headers,
+    )
+    results = response.json()["results"]
+    assert [r["success"] for r in results] == [True, False, False]
+    assert results[1]["error"] == "This item does not belong to this user"
+    assert results[2]["error"] == "This item does not exist"
+
+    response = await async_client.get(f"/tasks/{created[0]}", headers=headers)
+    assert response.json()["task"]["task"] == "edited"
+
+    response = await async_client.post(
+        "/tasks/bulk/delete", json=created[:2] + [other_task.id], headers=headers
+    )
+    assert [r["success"] for r in response.json()["results"]] == [True, True, False]
+
+    data = (await async_client.get("/tasks/", headers=headers)).json()
+    assert data["total"] == 2
+    assert sorted(t["id"] for t in data["tasks"]) == sorted([task.id, created[2]])
+
+
+async def test_bulk_create_with_a_session_expiring_on_commit(expiring_client, create_user_with_task, access_token_user):
+    user, task = await create_user_with_task()
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+
+    response = await expiring_client.post("/tasks/bulk", json=[{"desc": "new", "date": "2025-03-01"}], headers=headers)
+    data = response.json()
+    assert data["success"]
+    assert data["results"][0]["task"]["task"] == "new"
+    assert (await expiring_client.get("/tasks/", headers=headers)).json()["total"] == 2
+
+
+async def test_bulk_writes_only_report_rows_they_changed(create_user_with_task, db_session):
+    from app.api.schema.task import TaskPut
+    from app.core.task_events import task_events
+    from app.db.task import delete_tasks, put_tasks
+    from app.db.task_stats import get_task_version
+
+    user, task = await create_user_with_task()
+    other, other_task = await create_user_with_task(username="otheruser")
+    version = await get_task_version(db_session, user.id)
+    subscription = await task_events.subscribe(user.id)
+    try:
+        # Ids gone (or never owned) by the time the statement runs
+        assert await delete_tasks(db_session, user.id, [999999, other_task.id]) == []
+        assert await put_tasks(db_session, user.id, [TaskPut(id=999999, desc="x", date="2025-01-01")]) == []
+        assert await get_task_version(db_session, user.id) == version
+        assert subscription.queue.empty()
+
+        updated = await put_tasks(db_session, user.id, [
+            TaskPut(id=task.id, desc="edited", date="2025-01-02"),
+            TaskPut(id=other_task.id, desc="hijack", date="2025-01-02"),
+        ])
+        assert [(row.id, row.task) for row in updated] == [(task.id, "edited")]
+        assert subscription.queue.get_nowait().tasks == [{"id": task.id, "task": "edited", "date": "2025-01-02"}]
+    finally:
+        task_events.unsubscribe(subscription)
+
+
+async def test_task_mutations_are_single_statements(async_client, create_user_with_task, access_token_user, sql_statements):
+    user, task = await create_user_with_task()
+    other, other_task = await create_user_with_task(username="otheruser")
+    token = await access_token_user(user.username)
+    headers = {"Authorization": f"Bearer {token}"}
+    # Warm the principal cache so only task statements are counted
+    await async_client.get("/auth/me", headers=headers)
+
+    sql_statements.clear()
+    response = await async_client.get(f"/tasks/{task.id}", headers=headers)
+    assert response.status_code == 200
+    # The collection version for the ETag plus the task itself
+    assert len(sql_statements) == 2
+
+    sql_statements.clear()
+    response = await async_client.put(f"/tasks/{task.id}", json={"desc": "edited", "date": "2025-05-01"}, headers=headers)
+    assert response.json()["task"] == {"id": task.id, "task": "edited", "date": "2025-05-01"}
+    # The update itself plus the collection version bump
+    assert [s.split()[0] for s in sql_statements] == ["UPDATE", "INSERT"]
+
+    sql_statements.clear()
+    response = await async_client.delete(f"/tasks/{task.id}", headers=headers)
+    assert response.json()["task"]["id"] == task.id
+    # The delete itself, its tombstone and the task counter upsert
+    assert [s.split()[0] for s in sql_statements] == ["DELETE", "INSERT", "INSERT"]
+
+    response = await async_client.put(f"/tasks/{other_task.id}", json={"desc": "x", "date": "2025-05-01"}, headers=headers)
+    assert response.status_code == 403
+    response = await async_client.delete(f"/tasks/{other_task.id}", headers=headers)
+    assert response.status_code == 403
+    response = await async_client.delete(f"/tasks/{task.id}", headers=headers)
+    assert response.status_code == 404
+
+
+async def test_task_etag_conditional_get(async_client, create_user_with_task, access_token_user, sql_statements):
+    user, task = await create_user_with_task()
+    token = await access_token_user(user.username)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get("/tasks/", headers=headers)
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert (await async_client.get(f"/tasks/{task.id}", headers=headers)).headers["etag"] == etag
+
+    sql_statements.clear()
+    response = await async_client.get("/tasks/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    # Only the version lookup ran: no count, no list query
+    assert len(sql_statements) == 1
+    response = await async_client.get(f"/tasks/{task.id}", headers={**headers, "If-None-Match": f'"x", W/{etag}'})
+    assert response.status_code == 304
+
+    # Every kind of write changes the ETag
+    seen = {etag}
+    writes = [
+        lambda: async_client.post("/tasks/", json={"desc": "new", "date": "2025-01-01"}, headers=headers),
+        lambda: async_client.put(f"/tasks/{task.id}", json={"desc": "edited", "date": "2025-01-02"}, headers=headers),
+        lambda: async_client.put("/tasks/bulk", json=[{"id": task.id, "desc": "bulk", "date": "2025-01-03"}], headers=headers),
+        lambda: async_client.post("/tasks/bulk", json=[{"desc": "b", "date": "2025-01-04"}], headers=headers),
+        lambda: async_client.delete(f"/tasks/{task.id}", headers=headers),
+    ]
+    for write in writes:
+        assert (await write()).status_code == 200
+        response = await async_client.get("/tasks/", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert etag not in seen
+        seen.add(etag)
+
+
+async def test_task_list_response_cache(async_client, create_user_with_task, access_token_user, sql_statements):
+    from app.core.response_cache import response_cache
+
+    user, task = await create_user_with_task()
+    other, _ = await create_user_with_task(username="otheruser")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    other_headers = {"Authorization": f"Bearer {await access_token_user(other.username)}"}
+    await async_client.get("/tasks/", headers=other_headers)
+
+    first = await async_client.get("/tasks/?page_size=5", headers=headers)
+    sql_statements.clear()
+    second = await async_client.get("/tasks/?page_size=5", headers=headers)
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-type"] == "application/json"
+    # Served from the cache: only the version lookup ran
+    assert len(sql_statements) == 1
+    assert response_cache.metrics()["hits"] >= 1
+
+    await async_client.put(f"/tasks/{task.id}", json={"desc": "edited", "date": "2025-05-01"}, headers=headers)
+    # Only this user's pages were dropped
+    assert response_cache.metrics()["users"] == 1
+    response = await async_client.get("/tasks/?page_size=5", headers=headers)
+    assert response.json()["tasks"][0]["task"] == "edited"
+
+
+async def test_export_tasks_streams_ndjson_and_csv(async_client, create_user_with_task, access_token_user):
+    import csv
+    import io
+    import json
+
+    user, task = await create_user_with_task()
+    await create_user_with_task(username="otheruser")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    await async_client.post("/tasks/bulk", json=[
+        {"desc": 'quoted "x", and\nnewline', "date": "2024-06-01"},
+        {"desc": "later", "date": "2030-01-01"},
+    ], headers=headers)
+
+    response = await async_client.get("/tasks/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+    assert len(rows) == 3
+    assert rows[0]["task"] == 'quoted "x", and\nnewline'
+
+    response = await async_client.get("/tasks/export?format=csv", headers=headers)
+    assert response.headers["content-disposition"] == 'attachment; filename="tasks.csv"'
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["task"] for r in records] == [row["task"] for row in rows]
+    assert [int(r["id"]) for r in records] == [row["id"] for row in rows]
+
+    response = await async_client.get("/tasks/export?format=xml", headers=headers)
+    assert response.status_code == 422
+
+
+async def test_search_tasks(async_client, create_user_with_task, access_token_user):
+    user, task = await create_user_with_task()
+    other, _ = await create_user_with_task(username="otheruser")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    other_headers = {"Authorization": f"Bearer {await access_token_user(other.username)}"}
+    created = (await async_client.post("/tasks/bulk", json=[
+        {"desc": "buy groceries", "date": "2025-01-01"},
+        {"desc": "groceries groceries list", "date": "2025-01-02"},
+        {"desc": "call the plumber", "date": "2025-01-03"},
+    ], headers=headers)).json()["results"]
+    await async_client.post("/tasks/", json={"desc": "groceries for other", "date": "2025-01-01"}, headers=other_headers)
+
+    data = (await async_client.get("/tasks/search", params={"q": "groceries"}, headers=headers)).json()
+    assert data["total"] == 2
+    # bm25 ranks the task mentioning the term twice first
+    assert [t["id"] for t in data["tasks"]] == [created[1]["id"], created[0]["id"]]
+
+    data = (await async_client.get("/tasks/search", params={"q": "gro*", "page_size": 1, "page": 2}, headers=headers)).json()
+    assert data["total"] == 2 and data["total_pages"] == 2 and len(data["tasks"]) == 1
+
+    # The index follows updates and deletes
+    await async_client.put(f"/tasks/{created[2]['id']}", json={"desc": "call the electrician", "date": "2025-01-03"}, headers=headers)
+    assert (await async_client.get("/tasks/search", params={"q": "plumber"}, headers=headers)).json()["total"] == 0
+    assert (await async_client.get("/tasks/search", params={"q": "electrician"}, headers=headers)).json()["total"] == 1
+    await async_client.delete(f"/tasks/{created[0]['id']}", headers=headers)
+    assert (await async_client.get("/tasks/search", params={"q": "groceries"}, headers=headers)).json()["total"] == 1
+
+    # FTS5 syntax in the input is treated as plain words
+    response = await async_client.get("/tasks/search", params={"q": 'groceries OR "NEAR(x'}, headers=headers)
+    assert response.status_code == 200
+    response = await async_client.get("/tasks/search", params={"q": "***"}, headers=headers)
+    assert response.status_code == 400
+
+
+async def test_date_range_filter_and_calendar(async_client, create_user_with_task, access_token_user):
+    from datetime import date
+
+    # Outside every range queried below
+    user, task = await create_user_with_task(task_date=date(2020, 1, 1))
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    # 2024-12-30 is a Monday and 2025-01-05 the Sunday of the same ISO week
+    dates = ["2024-12-30", "2025-01-05", "2025-01-06", "2025-01-31", "2025-02-01"]
+    await async_client.post("/tasks/bulk", json=[{"desc": f"t{i}", "date": d} for i, d in enumerate(dates)], headers=headers)
+
+    params = {"date_from": "2025-01-01", "date_to": "2025-01-31", "page_size": 2}
+    data = (await async_client.get("/tasks/", params=params, headers=headers)).json()
+    assert data["total"] == 3
+    assert [t["date"] for t in data["tasks"]] == ["2025-01-05", "2025-01-06"]
+    data = (await async_client.get("/tasks/", params={**params, "cursor": data["next_cursor"]}, headers=headers)).json()
+    assert [t["date"] for t in data["tasks"]] == ["2025-01-31"]
+    assert data["next_cursor"] is None
+
+    response = await async_client.get("/tasks/", params={"date_from": "2025-02-01", "date_to": "2025-01-01"}, headers=headers)
+    assert response.status_code == 400
+
+    async def calendar(**params):
+        data = (await async_client.get("/tasks/calendar", params={**params, "date_from": "2024-12-01"}, headers=headers)).json()
+        return [(b["start"], b["count"]) for b in data["buckets"]]
+
+    assert await calendar(granularity="day") == [(d, 1) for d in dates]
+    assert await calendar(granularity="week") == [("2024-12-30", 2), ("2025-01-06", 1), ("2025-01-27", 2)]
+    assert await calendar(granularity="month") == [("2024-12-01", 1), ("2025-01-01", 3), ("2025-02-01", 1)]
+    assert (await async_client.get("/tasks/calendar?granularity=year", headers=headers)).status_code == 422
+
+
+async def test_delta_sync(async_client, create_user_with_task, access_token_user, db_session, monkeypatch):
+    from app.core.settings import settings
+
+    user, task = await create_user_with_task()
+    other, other_task = await create_user_with_task(username="otheruser")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    other_headers = {"Authorization": f"Bearer {await access_token_user(other.username)}"}
+
+    # Initial full sync
+    data = (await async_client.get("/tasks/changes", headers=headers)).json()
+    assert [t["id"] for t in data["tasks"]] == [task.id]
+    assert data["deleted"] == [] and data["next_cursor"] is None
+    since = data["version"]
+
+    created = [r["id"] for r in (await async_client.post("/tasks/bulk", json=[
+        {"desc": f"t{i}", "date": "2025-02-01"} for i in range(3)], headers=headers)).json()["results"]]
+    await async_client.put(f"/tasks/{created[0]}", json={"desc": "edited", "date": "2025-02-02"}, headers=headers)
+    await async_client.delete(f"/tasks/{task.id}", headers=headers)
+    await async_client.delete(f"/tasks/{other_task.id}", headers=other_headers)
+
+    # Only the churn comes back, in change order, paginated
+    monkeypatch.setattr(settings, "TASK_CHANGES_MAX_ITEMS", 2)
+    pages = []
+    cursor = None
+    while True:
+        params = {"since": since, **({"cursor": cursor} if cursor else {})}
+        page = (await async_client.get("/tasks/changes", params=params, headers=headers)).json()
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [len(p["tasks"]) + len(p["deleted"]) for p in pages] == [2, 2]
+    assert [t["id"] for p in pages for t in p["tasks"]] == [created[1], created[2], created[0]]
+    assert [d for p in pages for d in p["deleted"]] == [task.id]
+    assert pages[-1]["tasks"][0]["task"] == "edited"
+
+    # Nothing changed since the last version
+    data = (await async_client.get("/tasks/changes", params={"since": pages[-1]["version"]}, headers=headers)).json()
+    assert data["tasks"] == [] and data["deleted"] == []
+    # A version this database never issued
+    response = await async_client.get("/tasks/changes", params={"since": pages[-1]["version"] + 100}, headers=headers)
+    assert response.status_code == 410
+
+
+async def test_purged_tombstones_force_full_resync(async_client, create_user_with_task, access_token_user, db_session):
+    from sqlalchemy import update
+    from app.core.maintenance import purge_task_tombstones
+    from app.models.task import TaskTombstone
+    from datetime import datetime, timezone
+
+    user, task = await create_user_with_task()
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    await async_client.post("/tasks/", json={"desc": "kept", "date": "2025-01-01"}, headers=headers)
+    since = (await async_client.get("/tasks/changes", headers=headers)).json()["version"]
+    await async_client.delete(f"/tasks/{task.id}", headers=headers)
+    latest = (await async_client.get("/tasks/changes", params={"since": since}, headers=headers)).json()
+    assert latest["deleted"] == [task.id]
+
+    await db_session.execute(update(TaskTombstone).values(deleted_at=datetime(2000, 1, 1, tzinfo=timezone.utc)))
+    assert await purge_task_tombstones(db_session, days=30, chunk_size=1) == 1
+
+    response = await async_client.get("/tasks/changes", params={"since": since}, headers=headers)
+    assert response.status_code == 410
+    # Clients that already saw the deletion are unaffected
+    response = await async_client.get("/tasks/changes", params={"since": latest["version"]}, headers=headers)
+    assert response.status_code == 200
+
+
+async def test_deleted_task_ids_are_not_reused(async_client, create_user_with_task, access_token_user):
+    user, task = await create_user_with_task()
+    other, other_task = await create_user_with_task(username="otheruser")
+    headers = {"Authorization": f"Bearer {await access_token_user(user.username)}"}
+    other_headers = {"Authorization": f"Bearer {await access_token_user(other.username)}"}
+
+    since = (await async_client.get("/tasks/changes", headers=headers)).json()["version"]
+    newest = (await async_client.post("/tasks/", json={"desc": "newest", "date": "2025-01-01"}, headers=headers)).json()["task"]["id"]
+    await async_client.delete(f"/tasks/{newest}", headers=headers)
+    # The next task, whoever owns it, gets a new id; deleting it leaves the first tombstone alone
+    reused = (await async_client.post("/tasks/", json={"desc": "next", "date": "2025-01-01"}, headers=other_headers)).json()["task"]["id"]
+    assert reused > newest
+    await async_client.delete(f"/tasks/{reused}", headers=other_headers)
+
+    data = (await async_client.get("/tasks/changes", params={"since": since}, headers=headers)).json()
+    assert data["deleted"] == [newest]
+    assert newest not in [t["id"] for t in data["tasks"]]
+
+
+async def test_tasks_table_is_rebuilt_with_autoincrement(tmp_path):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db.db import Base
+    from app.models.task import ensure_task_autoincrement, ensure_task_fts
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # The table as created before AUTOINCREMENT
+            for statement in (
+                "DROP TABLE tasks",
+                "CREATE TABLE tasks (id INTEGER NOT NULL PRIMARY KEY, task VARCHAR NOT NULL, date DATE NOT NULL, "
+                "user_id INTEGER NOT NULL REFERENCES users (id), change_seq INTEGER DEFAULT '0' NOT NULL)",
+                "INSERT INTO tasks (id, task, date, user_id) VALUES (1, 'buy milk', '2025-01-01', 1), (2, 'walk', '2025-01-02', 1)",
+                "INSERT INTO task_tombstones (task_id, user_id, change_seq, deleted_at) VALUES (5, 1, 3, '2025-01-01')",
+            ):
+                await conn.exec_driver_sql(statement)
+            await conn.run_sync(ensure_task_fts)
+            await conn.run_sync(ensure_task_autoincrement)
+            await conn.run_sync(ensure_task_autoincrement)  # Already done: nothing to do
+
+            assert "AUTOINCREMENT" in (await conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'tasks'")).scalar()
+            await conn.exec_driver_sql("INSERT INTO tasks (task, date, user_id) VALUES ('buy bread', '2025-01-03', 1)")
+            rows = (await conn.exec_driver_sql("SELECT id, task FROM tasks ORDER BY id")).all()
+            assert [tuple(row) for row in rows] == [(1, "buy milk"), (2, "walk"), (6, "buy bread")]
+            hits = (await conn.exec_driver_sql("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'buy' ORDER BY rowid")).all()
+            assert [row[0] for row in hits] == [1, 6]
+    finally:
+        await engine.dispose()
@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.settings import settings
+
+CSV = ("id,name,notes,amount\n" + "".join(f"{i},customer {i},note about row {i},{i * 1.5:.2f}\n" for i in range(2000))).encode()
+
+
+@pytest.fixture
+async def admin_headers(create_user_with_task, access_token_user, tmp_path, monkeypatch):
+    from app.api.routes import admin
+
+    monkeypatch.setattr(admin, "UPLOAD_DIR", tmp_path)
+    user, _ = await create_user_with_task(role="admin")
+    return {"Authorization": f"Bearer {await access_token_user(user.username, role='admin')}"}
+
+
+async def test_upload_is_streamed_in_chunks_and_renamed_into_place(async_client, admin_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4096)
+    response = await async_client.post(
+        "/admin/upload",
+        headers=admin_headers,
+        data={"comment": "ignored"},
+        files={"file": ("report.csv", CSV, "text/csv")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["original_filename"] == "report.csv"
+    assert body["mime_type"] == "text/csv"
+    assert body["status"] == "saved"
+    assert (tmp_path / body["saved_as"]).read_bytes() == CSV
+    # The temporary file was renamed, and the columnar cache built in the background
+    assert sorted(p.name for p in tmp_path.iterdir()) == [body["saved_as"], body["saved_as"] + ".cols"]
+
+
+async def test_upload_over_the_limit_is_rejected(async_client, admin_headers, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", len(CSV) - 1)
+    response = await async_client.post("/admin/upload", headers=admin_headers, files={"file": ("report.csv", CSV, "text/csv")})
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_rejected_type_leaves_nothing_behind(async_client, admin_headers, tmp_path):
+    response = await async_client.post(
+        "/admin/upload", headers=admin_headers, files={"file": ("script.csv", b"import os\nprint(os.getcwd())\n" * 50, "text/csv")}
+    )
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_upload_without_the_file_field(async_client, admin_headers, tmp_path):
+    response = await async_client.post("/admin/upload", headers=admin_headers, files={"other": ("report.csv", CSV, "text/csv")})
+    assert response.status_code == 422
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_failed_detection_leaves_nothing_behind(async_client, admin_headers, tmp_path, monkeypatch):
+    from app.core.file_detection import file_type_detector
+
+    async def broken(path):
+        raise RuntimeError("model failed to load")
+
+    monkeypatch.setattr(file_type_detector, "identify_path", broken)
+    response = await async_client.post("/admin/upload", headers=admin_headers, files={"file": ("report.csv", CSV, "text/csv")})
+    assert response.status_code == 500
+    assert list(tmp_path.iterdir()) == []